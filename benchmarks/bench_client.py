@@ -0,0 +1,77 @@
+"""
+Compare upstream latency with a per-call `httpx.AsyncClient` against the
+shared keep-alive client in `utils.eagle_api`.
+
+Usage:
+    uv run python -m benchmarks.bench_client --requests 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.fake_eagle import FakeEagleServer
+from utils import eagle_api
+
+
+async def per_call_client(endpoint: str) -> dict:
+    # 共有クライアント導入前の実装と同じく、呼び出し毎にクライアントを生成する
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{eagle_api.EAGLE_API_BASE_URL}{endpoint}")
+        response.raise_for_status()
+        return response.json()
+
+
+async def shared_client(endpoint: str) -> dict:
+    return await eagle_api.request_to_eagle_api("GET", endpoint)
+
+
+async def run(call, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call("/api/application/info")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    print(
+        f"{name:<12} n={len(latencies)} "
+        f"rps={len(latencies) / elapsed:8.1f} "
+        f"p50={percentile(latencies, 50) * 1000:7.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:7.2f}ms"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    for name, call in (("per-call", per_call_client), ("shared", shared_client)):
+        await eagle_api.open_client()
+        started = time.perf_counter()
+        latencies = await run(call, requests, concurrency)
+        report(name, latencies, time.perf_counter() - started)
+        await eagle_api.close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with FakeEagleServer(latency_ms=args.latency_ms) as server:
+        eagle_api.EAGLE_API_BASE_URL = server.base_url
+        asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,72 @@
+"""
+Measure the CPU time spent per MB of upstream JSON on each response path:
+decoding with the standard library and re-encoding through FastAPI, the
+`utils.fastjson` codec (orjson when installed), streaming, and forwarding
+the raw bytes.
+
+Usage:
+    uv run python -m benchmarks.bench_json --items 5000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.fake_eagle import make_item
+from utils import fastjson
+from utils.fastjson import RawJSON
+from utils.projection import iter_json
+
+
+def stdlib_path(content: bytes) -> int:
+    result = json.loads(content)
+    return len(json.dumps(jsonable_encoder(result)).encode())
+
+
+def fastjson_path(content: bytes) -> int:
+    return len(fastjson.dumps(fastjson.loads(content)))
+
+
+def stream_path(content: bytes) -> int:
+    return sum(len(chunk) for chunk in iter_json(fastjson.loads(content)))
+
+
+def raw_path(content: bytes) -> int:
+    body = RawJSON(content)
+    return len(body.content) if body.is_success() else 0
+
+
+PATHS = {
+    "stdlib": stdlib_path,
+    "fastjson": fastjson_path,
+    "stream": stream_path,
+    "raw": raw_path,
+}
+
+
+def main(items: int, rounds: int) -> None:
+    content = json.dumps(
+        {"status": "success", "data": [make_item(index) for index in range(items)]}
+    ).encode()
+    megabytes = len(content) / 1024 / 1024
+    backend = "orjson" if fastjson.orjson is not None else "json"
+    print(f"payload={megabytes:.2f}MB items={items} backend={backend}")
+
+    for name, path in PATHS.items():
+        started = time.process_time()
+        for _ in range(rounds):
+            path(content)
+        elapsed = (time.process_time() - started) / rounds
+        print(
+            f"{name:<8} cpu={elapsed * 1000:8.2f}ms ({elapsed * 1000 / megabytes:7.2f}ms/MB)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.items, args.rounds)
@@ -0,0 +1,52 @@
+"""
+Measure how long the direct library reader takes to scan a library on disk,
+cold and warm (unchanged files are skipped by mtime).
+
+Usage:
+    uv run python -m benchmarks.bench_library_reader --items 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.fake_eagle import make_item
+from utils.library_reader import LibraryReader
+
+
+def make_library(path: str, items: int) -> None:
+    """
+    Write a library with `items` items in Eagle's on-disk layout.
+    """
+    for index in range(items):
+        item = make_item(index)
+        info_path = os.path.join(path, "images", f"{item['id']}.info")
+        os.makedirs(info_path, exist_ok=True)
+        with open(os.path.join(info_path, "metadata.json"), "w") as f:
+            json.dump(item, f)
+
+
+async def main(items: int, workers: int) -> None:
+    with tempfile.TemporaryDirectory(suffix=".library") as path:
+        make_library(path, items)
+        reader = LibraryReader(path, workers=workers)
+
+        for name in ("cold", "warm"):
+            started = time.perf_counter()
+            changed, _ = await reader.refresh()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name:<5} items={len(reader.items())} changed={len(changed)} "
+                f"elapsed={elapsed * 1000:8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.workers))
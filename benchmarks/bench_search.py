@@ -0,0 +1,65 @@
+"""
+Measure building the full-text search index and the latency of typical
+queries (common and rare words, prefixes, typos) against a scan of item
+names, which is what a substring `keyword` filter costs.
+
+Usage:
+    uv run python -m benchmarks.bench_search --items 100000
+"""
+
+import argparse
+import time
+
+from benchmarks.fake_eagle import make_item
+from utils.item_index import item_index
+from utils.search import search_index
+
+WORDS = ["sunset", "beach", "mountain", "portrait", "neon", "city", "forest"]
+
+QUERIES = {
+    "common": "sunset",
+    "two words": "sunset beach",
+    "rare": "item 5123",
+    "prefix": "mount",
+    "typo": "portrat",
+}
+
+
+def make_items(count: int) -> list[dict]:
+    items = []
+    for index in range(count):
+        item = make_item(index)
+        words = [WORDS[(index + offset * 2) % len(WORDS)] for offset in range(3)]
+        item["annotation"] = f"{' '.join(words)} photo {index % 997}"
+        items.append(item)
+    return items
+
+
+def main(items: int, rounds: int, limit: int) -> None:
+    item_index.upsert(make_items(items))
+    started = time.perf_counter()
+    search_index.apply_pending()
+    print(f"items={items} build={time.perf_counter() - started:.2f}s")
+
+    for name, query in QUERIES.items():
+        search_index.search(query, limit)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            results, total = search_index.search(query, limit)
+        elapsed = (time.perf_counter() - started) / rounds
+        print(f"{name:<10} {elapsed * 1000:8.2f}ms matches={total}")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        [r for r in item_index.records.values() if "sunset" in r.annotation.lower()]
+    elapsed = (time.perf_counter() - started) / rounds
+    print(f"{'scan':<10} {elapsed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    main(args.items, args.rounds, args.limit)
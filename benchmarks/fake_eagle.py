@@ -0,0 +1,221 @@
+"""
+A local stand-in for the Eagle API, used by the benchmarks.
+
+Usage:
+    uv run python -m benchmarks.fake_eagle --port 41596 --latency-ms 2 --items 10000
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+LIBRARY_PATH = "/tmp/Fake.library"
+TAGS = ["Design", "Poster", "Logo", "Photo", "UI", "Icon", "Texture", "Font"]
+EXTS = ["jpg", "png", "webp", "svg", "gif"]
+FOLDERS = 50
+# A PNG signature padded to the size of a typical library icon
+ICON = b"\x89PNG\r\n\x1a\n" + bytes(64 * 1024)
+
+
+def make_item(index: int) -> dict:
+    rng = random.Random(index)
+    return {
+        "id": f"ITEM{index:09d}",
+        "name": f"item-{index}",
+        "size": rng.randint(1_000, 5_000_000),
+        "btime": 1_700_000_000_000 + index,
+        "mtime": 1_700_000_000_000 + index,
+        "ext": rng.choice(EXTS),
+        "tags": rng.sample(TAGS, rng.randint(0, 3)),
+        "folders": [f"FOLDER{rng.randrange(FOLDERS):04d}"],
+        "isDeleted": False,
+        "url": f"https://example.com/{index}",
+        "annotation": "",
+        "modificationTime": 1_700_000_000_000 + index,
+        "height": rng.randint(64, 4096),
+        "width": rng.randint(64, 4096),
+        "lastModified": 1_700_000_000_000 + index,
+        "palettes": [
+            {"color": [rng.randint(0, 255) for _ in range(3)], "ratio": 20}
+            for _ in range(5)
+        ],
+        "star": rng.randint(0, 5),
+    }
+
+
+def make_folders() -> list[dict]:
+    folders = []
+    for index in range(FOLDERS):
+        folder = {
+            "id": f"FOLDER{index:04d}",
+            "name": f"folder-{index}",
+            "description": "",
+            "children": [],
+            "modificationTime": 1_700_000_000_000,
+            "tags": [],
+            "imageCount": 0,
+        }
+        # NOTE: 10個ごとに、先頭のフォルダの子にする
+        if index % 10:
+            folders[-1]["children"].append(folder)
+        else:
+            folders.append(folder)
+    return folders
+
+
+def create_app(latency_ms: float = 0.0, items: int = 1000) -> FastAPI:
+    app = FastAPI(title="Fake Eagle API")
+    delay = latency_ms / 1000
+    library = [make_item(index) for index in range(items)]
+    by_id = {item["id"]: item for item in library}
+    folders = make_folders()
+
+    @app.middleware("http")
+    async def add_latency(request: Request, call_next):
+        if delay:
+            await asyncio.sleep(delay)
+        return await call_next(request)
+
+    @app.get("/api/application/info")
+    async def application_info():
+        return {
+            "status": "success",
+            "data": {"version": "4.0.0", "platform": "darwin"},
+        }
+
+    @app.get("/api/library/info")
+    async def library_info():
+        return {
+            "status": "success",
+            "data": {
+                "folders": folders,
+                "smartFolders": [],
+                "quickAccess": [],
+                "tagsGroups": [{"id": "G", "name": "All", "tags": TAGS}],
+                "modificationTime": 1_700_000_000_000,
+                "applicationVersion": "4.0.0",
+                "library": {"path": LIBRARY_PATH, "name": "Fake"},
+            },
+        }
+
+    @app.get("/api/folder/list")
+    async def folder_list():
+        return {"status": "success", "data": folders}
+
+    @app.get("/api/item/info")
+    async def item_info(id: str):
+        item = by_id.get(id)
+        if item is None:
+            return {"status": "error", "message": "Item not found"}
+        return {"status": "success", "data": item}
+
+    @app.get("/api/item/thumbnail")
+    async def item_thumbnail(id: str):
+        item = by_id.get(id)
+        if item is None:
+            return {"status": "error", "message": "Item not found"}
+        return {
+            "status": "success",
+            "data": f"{LIBRARY_PATH}/images/{id}.info/{item['name']}_thumbnail.png",
+        }
+
+    @app.get("/api/library/icon")
+    async def library_icon(libraryPath: str):
+        return Response(ICON, media_type="image/png")
+
+    @app.get("/api/item/list")
+    async def item_list(
+        limit: int = 200,
+        offset: int = 0,
+        keyword: str | None = None,
+        ext: str | None = None,
+        tags: str | None = None,
+        folders: str | None = None,
+    ):
+        matches = library
+        if keyword:
+            matches = [item for item in matches if keyword in item["name"]]
+        if ext:
+            matches = [item for item in matches if item["ext"] == ext]
+        if tags:
+            wanted = {tag.strip() for tag in tags.split(",")}
+            matches = [item for item in matches if wanted.issubset(item["tags"])]
+        if folders:
+            wanted = {folder.strip() for folder in folders.split(",")}
+            matches = [
+                item for item in matches if not wanted.isdisjoint(item["folders"])
+            ]
+        # NOTE: Eagleと同様に `offset` はページ番号
+        return {
+            "status": "success",
+            "data": matches[offset * limit : (offset + 1) * limit],
+        }
+
+    @app.post("/api/item/update")
+    async def item_update(request: Request):
+        payload = await request.json()
+        item = by_id.get(payload.get("id"))
+        if item is None:
+            return {"status": "error", "message": "Item not found"}
+        item.update({key: value for key, value in payload.items() if key != "id"})
+        item["lastModified"] += 1
+        return {"status": "success", "data": item}
+
+    return app
+
+
+class FakeEagleServer:
+    """
+    Runs the fake Eagle API with uvicorn in a background thread.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, items: int = 1000, port: int = 0):
+        self.port = port or free_port()
+        config = uvicorn.Config(
+            create_app(latency_ms, items),
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "FakeEagleServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=41596)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency_ms, args.items),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+    )
@@ -0,0 +1,371 @@
+"""
+Load test of the MCP server against a local stand-in for the Eagle API.
+
+The fake Eagle API and the MCP server run as subprocesses. Workers send a
+weighted mix of tool calls, either through the MCP endpoint (`/mcp`) or
+directly to the HTTP routes, and the throughput, latency percentiles and
+memory of the MCP server are reported.
+
+Usage:
+    uv run python -m benchmarks.load_test --transport mcp --duration 30
+    uv run python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    uv run python -m benchmarks.load_test --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import httpx
+
+from benchmarks.fake_eagle import FOLDERS, free_port
+
+MCP_HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+@dataclass
+class Operation:
+    name: str
+    weight: int
+    method: str
+    path: str
+    arguments: Callable[[random.Random, int], dict]
+
+
+def item_id(rng: random.Random, items: int) -> str:
+    return f"ITEM{rng.randrange(items):09d}"
+
+
+OPERATIONS = [
+    Operation(
+        "get_item_info",
+        40,
+        "POST",
+        "/api/item/info",
+        lambda rng, items: {"id": item_id(rng, items)},
+    ),
+    Operation(
+        "get_item_list",
+        15,
+        "POST",
+        "/api/item/list",
+        lambda rng, items: {"limit": 50, "tags": "Design"},
+    ),
+    Operation(
+        "get_item_source",
+        15,
+        "POST",
+        "/api/item/source",
+        lambda rng, items: {"id": item_id(rng, items)},
+    ),
+    Operation(
+        "get_library_info", 10, "GET", "/api/library/info", lambda rng, items: {}
+    ),
+    Operation("get_folder_list", 10, "GET", "/api/folder/list", lambda rng, items: {}),
+    Operation(
+        "query_items",
+        10,
+        "POST",
+        "/api/item/query",
+        lambda rng, items: {
+            "folders": [f"FOLDER{rng.randrange(FOLDERS):04d}"],
+            "starMin": 3,
+            "limit": 20,
+        },
+    ),
+]
+
+
+@dataclass
+class Result:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+
+def spawn(args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args], env={**os.environ, **env}, cwd=os.getcwd()
+    )
+
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+def read_memory(pid: int) -> dict[str, float]:
+    """
+    Current and peak RSS (MB) of `pid`. Only available on Linux.
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return {"rssMb": memory.get("VmRSS"), "peakRssMb": memory.get("VmHWM")}
+
+
+async def open_mcp_session(client: httpx.AsyncClient) -> dict:
+    response = await client.post(
+        "/mcp",
+        headers=MCP_HEADERS,
+        json={
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-03-26",
+                "capabilities": {},
+                "clientInfo": {"name": "load-test", "version": "0.1.0"},
+            },
+        },
+    )
+    response.raise_for_status()
+    headers = {**MCP_HEADERS, "mcp-session-id": response.headers["mcp-session-id"]}
+    await client.post(
+        "/mcp",
+        headers=headers,
+        json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+    )
+    return headers
+
+
+async def call(
+    client: httpx.AsyncClient,
+    transport: str,
+    operation: Operation,
+    arguments: dict,
+    headers: dict,
+    request_id: int,
+) -> bool:
+    if transport == "mcp":
+        response = await client.post(
+            "/mcp",
+            headers=headers,
+            json={
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {"name": operation.name, "arguments": arguments},
+            },
+        )
+        body = response.json()
+        return "error" not in body and not body["result"].get("isError")
+
+    if operation.method == "GET":
+        response = await client.get(operation.path, params=arguments)
+    else:
+        response = await client.post(operation.path, json=arguments)
+    return response.status_code == 200 and response.json().get("status") == "success"
+
+
+async def worker(
+    base_url: str,
+    transport: str,
+    items: int,
+    deadline: float,
+    result: Result,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    weights = [operation.weight for operation in OPERATIONS]
+    request_ids = itertools.count(1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        headers = await open_mcp_session(client) if transport == "mcp" else {}
+        while time.monotonic() < deadline:
+            operation = rng.choices(OPERATIONS, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = await call(
+                    client,
+                    transport,
+                    operation,
+                    operation.arguments(rng, items),
+                    headers,
+                    next(request_ids),
+                )
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - started
+            result.latencies.setdefault(operation.name, []).append(elapsed)
+            if not ok:
+                result.errors[operation.name] = result.errors.get(operation.name, 0) + 1
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(result: Result, elapsed: float, memory: dict) -> dict:
+    every = [value for values in result.latencies.values() for value in values]
+    return {
+        "requests": len(every),
+        "errors": sum(result.errors.values()),
+        "throughput": len(every) / elapsed,
+        "p50Ms": percentile(every, 50) * 1000,
+        "p99Ms": percentile(every, 99) * 1000,
+        **memory,
+        "operations": {
+            name: {
+                "requests": len(values),
+                "errors": result.errors.get(name, 0),
+                "p50Ms": percentile(values, 50) * 1000,
+                "p99Ms": percentile(values, 99) * 1000,
+            }
+            for name, values in sorted(result.latencies.items())
+        },
+    }
+
+
+def print_summary(summary: dict) -> None:
+    print(
+        f"requests={summary['requests']} errors={summary['errors']} "
+        f"throughput={summary['throughput']:.1f}/s "
+        f"p50={summary['p50Ms']:.2f}ms p99={summary['p99Ms']:.2f}ms "
+        f"rss={summary['rssMb']}MB peak={summary['peakRssMb']}MB"
+    )
+    for name, operation in summary["operations"].items():
+        print(
+            f"  {name:<18} n={operation['requests']:<6} "
+            f"errors={operation['errors']:<4} "
+            f"p50={operation['p50Ms']:8.2f}ms p99={operation['p99Ms']:8.2f}ms"
+        )
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Print the change against `baseline`; False if it regressed by more than
+    `tolerance`.
+    """
+    if baseline.get("config") != summary.get("config"):
+        print(f"warning: the baseline was run with {baseline.get('config')}")
+
+    ok = True
+    checks = [
+        ("throughput", summary["throughput"], baseline["throughput"], False),
+        ("p50Ms", summary["p50Ms"], baseline["p50Ms"], True),
+        ("p99Ms", summary["p99Ms"], baseline["p99Ms"], True),
+    ]
+    for name, current, previous, lower_is_better in checks:
+        change = (current - previous) / previous if previous else 0.0
+        regressed = change > tolerance if lower_is_better else change < -tolerance
+        ok = ok and not regressed
+        print(
+            f"{name:<10} {previous:10.2f} -> {current:10.2f} ({change:+.1%})"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+async def run(args: argparse.Namespace, base_url: str) -> Result:
+    result = Result()
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(
+        *(
+            worker(base_url, args.transport, args.items, deadline, result, seed)
+            for seed in range(args.concurrency)
+        )
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transport", choices=["mcp", "http"], default="mcp")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    eagle_port, server_port = free_port(), free_port()
+    eagle = spawn(
+        [
+            "-m",
+            "benchmarks.fake_eagle",
+            "--port",
+            str(eagle_port),
+            "--latency-ms",
+            str(args.latency_ms),
+            "--items",
+            str(args.items),
+        ],
+        {},
+    )
+    server = spawn(
+        [
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(server_port),
+            "--log-level",
+            "warning",
+        ],
+        {
+            "EAGLE_API_BASE_URL": f"http://127.0.0.1:{eagle_port}",
+            "EAGLE_SNAPSHOT_PATH": "",
+        },
+    )
+    base_url = f"http://127.0.0.1:{server_port}"
+    try:
+        wait_until_ready(f"http://127.0.0.1:{eagle_port}/api/application/info")
+        wait_until_ready(f"{base_url}/api/connect")
+
+        if args.warmup:
+            warmup = argparse.Namespace(**{**vars(args), "duration": args.warmup})
+            asyncio.run(run(warmup, base_url))
+
+        started = time.monotonic()
+        result = asyncio.run(run(args, base_url))
+        summary = summarize(result, time.monotonic() - started, read_memory(server.pid))
+    finally:
+        server.terminate()
+        eagle.terminate()
+        server.wait()
+        eagle.wait()
+
+    summary["config"] = {
+        key: getattr(args, key)
+        for key in ("transport", "concurrency", "items", "latency_ms")
+    }
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(summary, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
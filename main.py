@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+import os
+import httpx
 from fastapi import FastAPI
 from fastapi_mcp import FastApiMCP
 from routes import (
@@ -6,10 +9,37 @@ from routes import (
     folder_router,
     item_router,
     library_router,
+    metrics_router,
+    tag_router,
 )
+from utils.eagle_api import open_client, close_client
+from utils.mcp_transport import mount_stateless_http
+from utils.metrics import MetricsMiddleware
+from utils.preview import shutdown_executor
+from utils.scheduler import UpstreamSessionMiddleware
+from utils.snapshot import snapshot_sync
+from utils.watcher import library_watcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_client()
+    if snapshot_sync is not None:
+        snapshot_sync.start()
+    library_watcher.start()
+    try:
+        yield
+    finally:
+        await library_watcher.stop()
+        if snapshot_sync is not None:
+            await snapshot_sync.stop()
+        shutdown_executor()
+        await close_client()
+
 
 app = FastAPI(
     title="Eagle MCP API",
+    lifespan=lifespan,
 )
 
 # Register routers
@@ -18,17 +48,41 @@ app.include_router(application_router)
 app.include_router(folder_router)
 app.include_router(item_router)
 app.include_router(library_router)
+app.include_router(tag_router)
+app.include_router(metrics_router)
+
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(UpstreamSessionMiddleware)
+
+# NOTE: ライブラリ全体を走査するツールがあるため、fastapi-mcpの既定 (10秒) より長くする
+MCP_TOOL_TIMEOUT = float(os.environ.get("EAGLE_MCP_TOOL_TIMEOUT", "300"))
+MCP_WORKERS = int(os.environ.get("EAGLE_MCP_WORKERS", "1"))
 
 mcp = FastApiMCP(
     app,
     name="Eagle MCP Server",
     description="An MCP server for Eagle",
     exclude_tags=["Disabled"],
+    # NOTE: 上流リクエストをセッション単位で公平に割り当てるため、セッションIDも転送する
+    headers=["authorization", "mcp-session-id"],
+    http_client=httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://apiserver",
+        timeout=MCP_TOOL_TIMEOUT,
+    ),
 )
 
-mcp.mount_http()
+if MCP_WORKERS > 1:
+    # NOTE: セッションは作成したワーカーにしか存在しないため、複数ワーカーではセッションを持たない
+    mount_stateless_http(mcp, app)
+else:
+    mcp.mount_http()
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if MCP_WORKERS > 1:
+        # NOTE: 各ワーカーがアプリを読み込めるよう、インポート文字列で渡す
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=MCP_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
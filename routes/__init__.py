@@ -4,6 +4,8 @@ __all__ = [
     "item_router",
     "mcp_router",
     "library_router",
+    "metrics_router",
+    "tag_router",
 ]
 
 from .application import router as application_router
@@ -11,3 +13,5 @@ from .folder import router as folder_router
 from .item import router as item_router
 from .mcp import router as mcp_router
 from .library import router as library_router
+from .metrics import router as metrics_router
+from .tag import router as tag_router
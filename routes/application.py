@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from utils.eagle_api import eagle_api_get
+from utils.eagle_api import eagle_api_get_raw
+from utils.fastjson import json_response
 
 router = APIRouter(tags=["Application"])
 
@@ -15,4 +16,4 @@ async def get_application_info():
     """
     reference: https://api.eagle.cool/application/info
     """
-    return await eagle_api_get("/api/application/info")
+    return json_response(await eagle_api_get_raw("/api/application/info"))
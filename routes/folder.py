@@ -1,6 +1,24 @@
 from fastapi import APIRouter
-from schemas.folder import CreateFolderRequest, RenameFolderRequest, UpdateFolderRequest
-from utils.eagle_api import eagle_api_get, eagle_api_post
+from schemas.api import ErrorResponse
+from schemas.folder import (
+    CreateFolderRequest,
+    RenameFolderRequest,
+    UpdateFolderRequest,
+    ResolveFoldersRequest,
+    ResolveFoldersResponse,
+    ResolveFoldersSuccessResponse,
+    ExpandFoldersRequest,
+    ExpandFoldersResponse,
+    ExpandFoldersSuccessResponse,
+)
+from utils.eagle_api import (
+    eagle_api_get,
+    eagle_api_get_raw,
+    eagle_api_post,
+    invalidate_cache,
+)
+from utils.fastjson import json_response
+from utils.folder_index import folder_index
 
 router = APIRouter(tags=["Folder"])
 
@@ -17,7 +35,9 @@ async def create_folder(data: CreateFolderRequest):
     reference: https://api.eagle.cool/folder/create
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/folder/create", payload)
+    result = await eagle_api_post("/api/folder/create", payload)
+    invalidate_folders()
+    return result
 
 
 @router.post(
@@ -31,7 +51,9 @@ async def rename_folder(data: RenameFolderRequest):
     reference: https://api.eagle.cool/folder/rename
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/folder/rename", payload)
+    result = await eagle_api_post("/api/folder/rename", payload)
+    invalidate_folders()
+    return result
 
 
 @router.post(
@@ -44,7 +66,9 @@ async def update_folder(data: UpdateFolderRequest):
     reference: https://api.eagle.cool/folder/update
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/folder/update", payload)
+    result = await eagle_api_post("/api/folder/update", payload)
+    invalidate_folders()
+    return result
 
 
 @router.get(
@@ -56,7 +80,70 @@ async def get_folder_list():
     """
     reference: https://api.eagle.cool/folder/list
     """
-    return await eagle_api_get("/api/folder/list")
+    return json_response(await eagle_api_get_raw("/api/folder/list"))
+
+
+@router.post(
+    "/api/folder/resolve",
+    operation_id="resolve_folders",
+    response_model=ResolveFoldersResponse,
+    description=(
+        "Find folder IDs by path (e.g. `Design/Logos`) or by name, without walking the folder list. Use the IDs in the `folders` filter of other tools."
+    ),
+)
+async def resolve_folders(data: ResolveFoldersRequest) -> ResolveFoldersResponse:
+    tree = await folder_index.get()
+    if tree is None:
+        return ErrorResponse(message="Failed to fetch folder list")
+    return ResolveFoldersSuccessResponse(
+        data={
+            path: [node.to_dict() for node in tree.resolve(path)] for path in data.paths
+        }
+    )
+
+
+@router.post(
+    "/api/folder/expand",
+    operation_id="expand_folders",
+    response_model=ExpandFoldersResponse,
+    description=(
+        "Get the IDs of all subfolders of the given folders (by ID or path), at any depth. To list the items of a folder and its subfolders, `get_item_list` and `query_items` also accept `recursive`."
+    ),
+)
+async def expand_folders(data: ExpandFoldersRequest) -> ExpandFoldersResponse:
+    tree = await folder_index.get()
+    if tree is None:
+        return ErrorResponse(message="Failed to fetch folder list")
+
+    folder_ids = []
+    not_found = []
+    for folder_id in data.folderIds or []:
+        if folder_id in tree.nodes:
+            folder_ids.append(folder_id)
+        else:
+            not_found.append(folder_id)
+    for path in data.paths or []:
+        nodes = tree.resolve(path)
+        if nodes:
+            folder_ids.extend(node.id for node in nodes)
+        else:
+            not_found.append(path)
+
+    expanded = tree.expand(folder_ids)
+    if not data.includeSelf:
+        # NOTE: 他の指定フォルダの子孫でもある指定フォルダは、その部分木として残す
+        subfolders = tree.expand(
+            child
+            for folder_id in folder_ids
+            for child in tree.nodes[folder_id].children
+        )
+        expanded -= set(folder_ids) - subfolders
+    return ExpandFoldersSuccessResponse(
+        data={
+            "folderIds": sorted(expanded, key=lambda f: tree.nodes[f].path),
+            "notFound": not_found,
+        }
+    )
 
 
 @router.get(
@@ -70,3 +157,9 @@ async def get_folder_list_recent():
     reference: https://api.eagle.cool/folder/list-recent
     """
     return await eagle_api_get("/api/folder/listRecent")
+
+
+def invalidate_folders() -> None:
+    invalidate_cache("/api/folder/list")
+    folder_index.invalidate()
+    invalidate_cache("/api/library/info")
@@ -1,6 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from schemas.api import ErrorResponse
 from schemas.item import (
+    ItemListFilter,
     AddItemFromURLRequest,
     AddItemsFromURLsRequest,
     AddItemFromPathRequest,
@@ -16,10 +18,83 @@ from schemas.item import (
     UpdateItemRequest,
     GetItemSourceResponse,
     GetItemSourceSuccessResponse,
+    GetItemsSourceRequest,
+    GetItemsSourceResponse,
+    GetItemsSourceSuccessResponse,
+    GetItemsInfoRequest,
+    GetItemsInfoResponse,
+    GetItemsInfoSuccessResponse,
+    StreamItemListRequest,
+    ScanItemListRequest,
+    ScanItemListResponse,
+    ScanItemListSuccessResponse,
+    QueryItemsRequest,
+    QueryItemsResponse,
+    QueryItemsSuccessResponse,
+    UpdateItemsRequest,
+    UpdateItemsMatchingRequest,
+    UpdateItemsResponse,
+    UpdateItemsSuccessResponse,
+    ImportItemsRequest,
+    GetImportJobRequest,
+    ImportJobResponse,
+    ImportJobSuccessResponse,
+    GetItemPreviewRequest,
+    GetItemPreviewResponse,
+    GetItemPreviewSuccessResponse,
+    GetContactSheetRequest,
+    GetContactSheetResponse,
+    GetContactSheetSuccessResponse,
+    FindDuplicateItemsRequest,
+    FindDuplicateItemsResponse,
+    FindDuplicateItemsSuccessResponse,
+    SearchItemsRequest,
+    SearchItemsResponse,
+    SearchItemsSuccessResponse,
+    SearchItemsByColorRequest,
+    SearchItemsByColorResponse,
+    SearchItemsByColorSuccessResponse,
 )
-from utils.eagle_api import eagle_api_get, eagle_api_post
+from utils.batch import map_bounded
+from utils.duplicates import phash_index
+from utils.eagle_api import (
+    eagle_api_get,
+    eagle_api_get_raw,
+    eagle_api_post,
+    get_cached,
+    invalidate_cache,
+    is_success,
+)
+from utils.fastjson import dumps, json_response
+from utils.file_response import file_etag, file_response
+from utils.folder_index import folder_index
+from utils.importer import ImportJob, get_import_job, start_import
+from utils.item_index import item_index
+from utils.library import get_library_path
+from utils.library_reader import get_library_reader
+from utils.pagination import ScanError, iter_item_pages, iter_items
+from utils.palette_index import NUMPY_MISSING, np, palette_index, parse_color
+from utils.preview import (
+    MIME_TYPES,
+    PILLOW_MISSING,
+    image_candidates,
+    image_ops,
+    read_image,
+    render_contact_sheet,
+    render_item_preview,
+    sheet_columns,
+)
+from utils.projection import compact_item, project, stream_json
+from utils.scheduler import bulk_priority
+from utils.search import search_index
+from collections import Counter
+from typing import Annotated
+from urllib.parse import unquote
+import asyncio
 import os
 
+FOLDER_LIST_ERROR = "Failed to fetch folder list"
+
 router = APIRouter(tags=["Item"])
 
 
@@ -36,7 +111,7 @@ async def add_item_from_url(data: AddItemFromURLRequest):
     reference: https://api.eagle.cool/item/add-from-url
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/addFromURL", payload)
+    return sync_item_index(await eagle_api_post("/api/item/addFromURL", payload))
 
 
 @router.post(
@@ -51,7 +126,7 @@ async def add_items_from_urls(data: AddItemsFromURLsRequest):
     """
     payload = data.model_dump(exclude_none=True)
     payload["items"] = [item.model_dump(exclude_none=True) for item in data.items]
-    return await eagle_api_post("/api/item/addFromURLs", payload)
+    return sync_item_index(await eagle_api_post("/api/item/addFromURLs", payload))
 
 
 @router.post(
@@ -66,7 +141,7 @@ async def add_item_from_path(data: AddItemFromPathRequest):
     reference: https://api.eagle.cool/item/add-from-path
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/addFromPath", payload)
+    return sync_item_index(await eagle_api_post("/api/item/addFromPath", payload))
 
 
 @router.post(
@@ -81,7 +156,45 @@ async def add_items_from_paths(data: AddItemsFromPathsRequest):
     """
     payload = data.model_dump(exclude_none=True)
     payload["items"] = [item.model_dump(exclude_none=True) for item in data.items]
-    return await eagle_api_post("/api/item/addFromPaths", payload)
+    return sync_item_index(await eagle_api_post("/api/item/addFromPaths", payload))
+
+
+@router.post(
+    "/api/item/import",
+    operation_id="import_items",
+    response_model=ImportJobResponse,
+    description=(
+        "Import all files of a local directory into Eagle App in the background. Files already in the library are skipped, and the rest are added in batches. Use `get_import_job` to follow the progress."
+    ),
+)
+async def import_items(data: ImportItemsRequest) -> ImportJobResponse:
+    if not os.path.isdir(data.path):
+        return ErrorResponse(message=f"Directory not found: {data.path}")
+
+    job = start_import(
+        ImportJob(
+            data.path,
+            data.pattern,
+            data.recursive,
+            data.folderId,
+            data.tags,
+            data.skipExisting,
+        )
+    )
+    return ImportJobSuccessResponse(data=job.to_dict())
+
+
+@router.post(
+    "/api/item/import/status",
+    operation_id="get_import_job",
+    response_model=ImportJobResponse,
+    description=("Get the progress of an import job started by `import_items`."),
+)
+async def get_import_job_status(data: GetImportJobRequest) -> ImportJobResponse:
+    job = get_import_job(data.id)
+    if job is None:
+        return ErrorResponse(message=f"Import job not found: {data.id}")
+    return ImportJobSuccessResponse(data=job)
 
 
 @router.post(
@@ -95,7 +208,7 @@ async def add_bookmark(data: AddBookmarkRequest):
     reference: https://api.eagle.cool/item/add-bookmark
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/addBookmark", payload)
+    return sync_item_index(await eagle_api_post("/api/item/addBookmark", payload))
 
 
 @router.post(
@@ -110,7 +223,70 @@ async def get_item_info(data: GetItemInfoRequest):
     reference: https://api.eagle.cool/item/info
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_get("/api/item/info", payload)
+
+    reader = await get_library_reader()
+    if reader is not None:
+        item = await reader.get_item(data.id)
+        if item is not None:
+            return {"status": "success", "data": item}
+
+    return json_response(await eagle_api_get_raw("/api/item/info", payload))
+
+
+@router.post(
+    "/api/item/infos",
+    operation_id="get_items_info",
+    response_model=GetItemsInfoResponse,
+    description=(
+        "Get Properties of multiple files specified, keyed by ID. Use this instead of calling `get_item_info` in a row. Files that could not be fetched are listed in `errors`."
+    ),
+)
+async def get_items_info(data: GetItemsInfoRequest) -> GetItemsInfoResponse:
+    item_ids = list(dict.fromkeys(data.ids))
+    items: dict[str, dict] = {}
+
+    reader = await get_library_reader()
+    if reader is not None:
+        found = await asyncio.gather(
+            *(reader.get_item(item_id) for item_id in item_ids)
+        )
+        for item_id, item in zip(item_ids, found):
+            if item is not None:
+                items[item_id] = item
+
+    # NOTE: キャッシュ済みのアイテムは同時実行数の枠を使わずに返す
+    for item_id in item_ids:
+        if item_id not in items:
+            cached = get_cached("/api/item/info", {"id": item_id})
+            if is_success(cached):
+                items[item_id] = cached["data"]
+
+    # NOTE: 同じアイテムの取得が実行中であれば、他のセッションからの呼び出しとも合流する
+    missing = [item_id for item_id in item_ids if item_id not in items]
+    results = await map_bounded(
+        lambda item_id: eagle_api_get("/api/item/info", {"id": item_id}), missing
+    )
+    errors: dict[str, str] = {}
+    for item_id, result in zip(missing, results):
+        if is_success(result):
+            items[item_id] = result["data"]
+        elif isinstance(result, dict):
+            errors[item_id] = result.get("message") or "Failed to fetch item info"
+        elif isinstance(result, BaseException):
+            errors[item_id] = f"Failed to fetch item info: {result}"
+        else:
+            errors[item_id] = "Failed to fetch item info"
+
+    return GetItemsInfoSuccessResponse(
+        data={
+            "items": {
+                item_id: project(items[item_id], data.fields)
+                for item_id in item_ids
+                if item_id in items
+            },
+            "errors": errors,
+        }
+    )
 
 
 @router.post(
@@ -129,6 +305,35 @@ async def get_item_thumbnail(data: GetItemThumbnailRequest):
     return await eagle_api_get("/api/item/thumbnail", payload)
 
 
+@router.get(
+    "/api/item/thumbnail/file",
+    operation_id="get_item_thumbnail_file",
+    description=(
+        "Get the thumbnail image of the file specified. Supports `ETag`/`If-None-Match` and `Range` requests."
+    ),
+    tags=["Disabled"],
+)
+async def get_item_thumbnail_file(
+    data: Annotated[GetItemThumbnailRequest, Query()], request: Request
+):
+    payload = data.model_dump(exclude_none=True)
+    for _ in range(2):
+        result = await eagle_api_get("/api/item/thumbnail", payload)
+        if not is_success(result):
+            return result
+        path = result["data"]
+        # NOTE: Eagleはパスをパーセントエンコードして返すことがある
+        for candidate in (path, unquote(path)):
+            if os.path.isfile(candidate):
+                return file_response(request, candidate, file_etag(candidate, data.id))
+        # NOTE: リネーム等でキャッシュ済みのパスが古くなっている場合は取り直す
+        invalidate_cache("/api/item/thumbnail", payload)
+    return {
+        "status": "error",
+        "message": f"Thumbnail not found on this host: {path}",
+    }
+
+
 @router.post(
     "/api/item/list",
     operation_id="get_item_list",
@@ -138,8 +343,300 @@ async def get_item_list(data: GetItemListRequest):
     """
     reference: https://api.eagle.cool/item/list
     """
-    payload = data.model_dump(exclude_none=True)
-    return await eagle_api_get("/api/item/list", payload)
+    payload = await expand_folder_filter(
+        data.model_dump(exclude_none=True, exclude={"fields"})
+    )
+    if payload is None:
+        return ErrorResponse(message=FOLDER_LIST_ERROR)
+
+    reader = await get_library_reader()
+    if reader is not None:
+        result = {"status": "success", "data": await reader.list_items(payload)}
+    else:
+        result = await eagle_api_get("/api/item/list", payload)
+
+    if is_success(result) and isinstance(result.get("data"), list):
+        result = {
+            **result,
+            "data": [compact_item(item, data.fields) for item in result["data"]],
+        }
+    return stream_json(result)
+
+
+@router.post(
+    "/api/item/list/stream",
+    operation_id="stream_item_list",
+    description=(
+        "Stream all items that match the filter condition as NDJSON, one item per line. Pages are fetched ahead while the stream is consumed."
+    ),
+    tags=["Disabled"],
+)
+async def stream_item_list(data: StreamItemListRequest):
+    filters = await expand_folder_filter(
+        data.model_dump(exclude_none=True, exclude={"fields", "maxItems"})
+    )
+    if filters is None:
+        return ErrorResponse(message=FOLDER_LIST_ERROR)
+
+    async def generate():
+        remaining = data.maxItems
+        try:
+            async for page in iter_item_pages(filters):
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+                yield b"".join(
+                    dumps(project(item, data.fields)) + b"\n" for item in page
+                )
+                if remaining is not None and remaining <= 0:
+                    break
+        except ScanError as exc:
+            yield dumps({"status": "error", "message": str(exc)}) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/api/item/list/scan",
+    operation_id="scan_item_list",
+    response_model=ScanItemListResponse,
+    description=(
+        "Walk all items that match the filter condition without paging manually. Returns the total count, counts per `groupBy` field and the first `maxItems` items reduced to `fields`."
+    ),
+)
+async def scan_item_list(data: ScanItemListRequest) -> ScanItemListResponse:
+    filters = await expand_folder_filter(
+        data.model_dump(exclude_none=True, exclude={"groupBy", "fields", "maxItems"})
+    )
+    if filters is None:
+        return ErrorResponse(message=FOLDER_LIST_ERROR)
+    group_by = data.groupBy or []
+    counts = {field: Counter() for field in group_by}
+    items = []
+    total = 0
+
+    try:
+        async for item in iter_items(filters):
+            total += 1
+            for field in group_by:
+                value = item.get(field)
+                if isinstance(value, list):
+                    counts[field].update(str(v) for v in value)
+                elif value is not None:
+                    counts[field][str(value)] += 1
+            if len(items) < data.maxItems:
+                items.append(project(item, data.fields))
+    except ScanError as exc:
+        return ErrorResponse(message=str(exc))
+
+    return ScanItemListSuccessResponse(
+        data={
+            "total": total,
+            "counts": {
+                field: dict(counter.most_common()) for field, counter in counts.items()
+            },
+            "items": items,
+        }
+    )
+
+
+@router.post(
+    "/api/item/query",
+    operation_id="query_items",
+    response_model=QueryItemsResponse,
+    description=(
+        "Query items from a local index of the library. Supports filters that `get_item_list` does not: multiple tags with AND/OR, rating and size ranges, and sorting by any indexed field. The index is built on first use and kept in sync in the background."
+    ),
+)
+async def query_items(data: QueryItemsRequest) -> QueryItemsResponse:
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    folders = data.folders
+    if data.recursive and folders:
+        tree = await folder_index.get()
+        if tree is None:
+            return ErrorResponse(message=FOLDER_LIST_ERROR)
+        folders = list(tree.expand(folders))
+
+    records = item_index.query(
+        tags=data.tags,
+        tags_mode=data.tagsMode,
+        folders=folders,
+        ext=data.ext,
+        star_min=data.starMin,
+        star_max=data.starMax,
+        width_min=data.widthMin,
+        width_max=data.widthMax,
+        height_min=data.heightMin,
+        height_max=data.heightMax,
+        keyword=data.keyword,
+        order_by=data.orderBy,
+    )
+    page = records[data.offset : data.offset + data.limit]
+    return QueryItemsSuccessResponse(
+        data={
+            "total": len(records),
+            "items": [project(record.to_dict(), data.fields) for record in page],
+        }
+    )
+
+
+@router.post(
+    "/api/item/search",
+    operation_id="search_items",
+    response_model=SearchItemsResponse,
+    description=(
+        "Search items by words in their name, tags, annotation, URL and folder names, ranked by relevance. Words also match longer words they start with and, with `fuzzy`, misspelled words. Uses a local index of the library, kept in sync in the background."
+    ),
+)
+async def search_items(data: SearchItemsRequest) -> SearchItemsResponse:
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    tree = await folder_index.get()
+    if tree is not None:
+        search_index.set_folders(tree)
+
+    candidates = None
+    if data.tags or data.folders or data.ext:
+        candidates = [
+            record.id
+            for record in item_index.query(
+                tags=data.tags, folders=data.folders, ext=data.ext
+            )
+        ]
+    results, total = search_index.search(
+        data.query,
+        data.offset + data.limit,
+        candidates,
+        prefix=data.prefix,
+        fuzzy=data.fuzzy,
+    )
+    return SearchItemsSuccessResponse(
+        data={
+            "total": total,
+            "items": [
+                {
+                    **project(item_index.records[item_id].to_dict(), data.fields),
+                    "score": round(score, 4),
+                }
+                for item_id, score in results[data.offset :]
+            ],
+        }
+    )
+
+
+@router.post(
+    "/api/item/searchByColor",
+    operation_id="search_items_by_color",
+    response_model=SearchItemsByColorResponse,
+    description=(
+        "Find items whose color palette is closest to a color scheme, given as colors with their ratios or as an example item (`itemId`). Useful to collect items for a moodboard."
+    ),
+)
+async def search_items_by_color(
+    data: SearchItemsByColorRequest,
+) -> SearchItemsByColorResponse:
+    if np is None:
+        return ErrorResponse(message=NUMPY_MISSING)
+    if not data.colors and not data.itemId:
+        return ErrorResponse(message="Either `colors` or `itemId` is required")
+
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    exclude = []
+    if data.colors:
+        query = palette_index.embed(
+            [[(parse_color(entry.color), entry.ratio) for entry in data.colors]]
+        )[0]
+    else:
+        query = palette_index.vector_of(data.itemId)
+        if query is None:
+            return ErrorResponse(message=f"Item has no palette: {data.itemId}")
+        exclude.append(data.itemId)
+
+    candidates = None
+    if data.tags or data.folders or data.ext:
+        candidates = [
+            record.id
+            for record in item_index.query(
+                tags=data.tags, folders=data.folders, ext=data.ext
+            )
+        ]
+    results = palette_index.nearest(query, data.limit, candidates, exclude)
+    return SearchItemsByColorSuccessResponse(
+        data={
+            "items": [
+                {
+                    **project(item_index.records[item_id].to_dict(), data.fields),
+                    "similarity": round(similarity, 4),
+                }
+                for item_id, similarity in results
+                if item_id in item_index.records
+            ]
+        }
+    )
+
+
+@router.post(
+    "/api/item/duplicates",
+    operation_id="find_duplicate_items",
+    response_model=FindDuplicateItemsResponse,
+    description=(
+        "Find groups of visually near-duplicate items using perceptual hashes of their images. Hashes are computed once per item version and reused. Review the groups before passing IDs to `move_item_to_trash`."
+    ),
+)
+async def find_duplicate_items(
+    data: FindDuplicateItemsRequest,
+) -> FindDuplicateItemsResponse:
+    if image_ops is None:
+        return ErrorResponse(message=PILLOW_MISSING)
+
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+    library_path = await get_library_path()
+    if library_path is None:
+        return ErrorResponse(message="Failed to fetch eagle info")
+
+    records = item_index.query(folders=data.folders, ext=data.ext)
+    try:
+        complete = await phash_index.ensure(library_path, records, data.wait)
+    except Exception as exc:
+        return ErrorResponse(message=f"Failed to hash items: {exc}")
+
+    groups = phash_index.find_groups(records, data.maxDistance)
+    return FindDuplicateItemsSuccessResponse(
+        data={
+            "groups": [
+                [
+                    {
+                        "id": record.id,
+                        "name": record.name,
+                        "ext": record.ext,
+                        "size": record.size,
+                        "width": record.width,
+                        "height": record.height,
+                        "distance": distance,
+                    }
+                    for record, distance in group
+                ]
+                for group in groups[: data.limit]
+            ],
+            "totalGroups": len(groups),
+            "hashed": len(records) - len(phash_index.stale(records)),
+            "complete": complete,
+        }
+    )
 
 
 @router.post(
@@ -152,7 +649,12 @@ async def move_item_to_trash(data: MoveItemToTrashRequest):
     reference: https://api.eagle.cool/item/api-item-movetotrash
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/moveToTrash", payload)
+    result = await eagle_api_post("/api/item/moveToTrash", payload)
+    invalidate_items(data.itemIds)
+    if is_success(result):
+        item_index.remove(data.itemIds)
+    invalidate_cache("/api/folder/list")
+    return result
 
 
 @router.post(
@@ -168,7 +670,9 @@ async def refresh_item_palette(data: RefreshItemPaletteRequest):
     reference: https://api.eagle.cool/item/refresh-palette
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/refreshPalette", payload)
+    result = await eagle_api_post("/api/item/refreshPalette", payload)
+    invalidate_items([data.id])
+    return sync_item_index(result)
 
 
 @router.post(
@@ -184,7 +688,9 @@ async def refresh_item_thumbnail(data: RefreshItemThumbnailRequest):
     reference: https://api.eagle.cool/item/refresh-thumbnail
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/refreshThumbnail", payload)
+    result = await eagle_api_post("/api/item/refreshThumbnail", payload)
+    invalidate_items([data.id])
+    return sync_item_index(result)
 
 
 @router.post(
@@ -197,7 +703,91 @@ async def update_item(data: UpdateItemRequest):
     reference: https://api.eagle.cool/item/update
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/item/update", payload)
+    return await apply_item_update(payload)
+
+
+@router.post(
+    "/api/item/updateMany",
+    operation_id="update_items",
+    response_model=UpdateItemsResponse,
+    description=(
+        "Modify data of specified fields of multiple items in one call. Use this instead of calling `update_item` in a row. Failures are reported per item."
+    ),
+)
+async def update_items(data: UpdateItemsRequest) -> UpdateItemsResponse:
+    payloads = [item.model_dump(exclude_none=True) for item in data.items]
+    results = await map_bounded(apply_item_update, payloads, rate=data.rateLimit)
+    return collect_update_results(payloads, results)
+
+
+@router.post(
+    "/api/item/updateMatching",
+    operation_id="update_items_matching",
+    response_model=UpdateItemsResponse,
+    description=(
+        "Modify all items that match the filter condition, e.g. add a tag to every item in a folder. Tags are added to or removed from the existing tags of each item. Use `dryRun` to check which items would be changed."
+    ),
+)
+async def update_items_matching(
+    data: UpdateItemsMatchingRequest,
+) -> UpdateItemsResponse:
+    filters = await expand_folder_filter(
+        data.model_dump(exclude_none=True, include=set(ItemListFilter.model_fields))
+    )
+    if filters is None:
+        return ErrorResponse(message=FOLDER_LIST_ERROR)
+    changes = data.model_dump(exclude_none=True, include={"annotation", "url", "star"})
+    add_tags = data.addTags or []
+    remove_tags = set(data.removeTags or [])
+
+    payloads = []
+    try:
+        async for item in iter_items(filters):
+            payload = {
+                key: value for key, value in changes.items() if item.get(key) != value
+            }
+            if add_tags or remove_tags:
+                tags = item.get("tags") or []
+                new_tags = [tag for tag in tags if tag not in remove_tags]
+                new_tags += [tag for tag in add_tags if tag not in new_tags]
+                if new_tags != tags:
+                    payload["tags"] = new_tags
+            if payload:
+                payloads.append({"id": item["id"], **payload})
+    except ScanError as exc:
+        return ErrorResponse(message=str(exc))
+
+    if data.dryRun:
+        return UpdateItemsSuccessResponse(
+            data={"updated": [payload["id"] for payload in payloads], "errors": {}}
+        )
+
+    with bulk_priority():
+        results = await map_bounded(apply_item_update, payloads, rate=data.rateLimit)
+    return collect_update_results(payloads, results)
+
+
+async def apply_item_update(payload: dict) -> dict:
+    result = await eagle_api_post("/api/item/update", payload)
+    invalidate_items([payload["id"]])
+    if is_success(result):
+        item_index.apply_write([result["data"]])
+    return result
+
+
+def collect_update_results(
+    payloads: list[dict], results: list
+) -> UpdateItemsSuccessResponse:
+    updated: list[str] = []
+    errors: dict[str, str] = {}
+    for payload, result in zip(payloads, results):
+        if is_success(result):
+            updated.append(payload["id"])
+        elif isinstance(result, dict):
+            errors[payload["id"]] = result.get("message") or "Failed to update item"
+        else:
+            errors[payload["id"]] = "Failed to update item"
+    return UpdateItemsSuccessResponse(data={"updated": updated, "errors": errors})
 
 
 @router.post(
@@ -212,24 +802,183 @@ async def get_item_source(
     payload = data.model_dump(exclude_none=True)
 
     # `/api/item/info` APIのレスポンスに ファイルパス が含まれるように機能リクエスト済: 2025/04/29
-    library = await eagle_api_get("/api/library/info")
-    if library.get("status") != "success":
+    library_path, item = await asyncio.gather(
+        get_library_path(), eagle_api_get("/api/item/info", payload)
+    )
+    if library_path is None:
         return ErrorResponse(message="Failed to fetch eagle info")
 
-    item = await eagle_api_get("/api/item/info", payload)
-    if item.get("status") != "success":
+    if not is_success(item):
         return ErrorResponse(message="Failed to fetch item info")
 
-    source_path = construct_source_path(library, item)
+    source_path = construct_source_path(library_path, item)
     if source_path is None:
         return ErrorResponse(message="Failed to fetch source path")
 
     return GetItemSourceSuccessResponse(data={"source": source_path})
 
 
-def construct_source_path(library: dict, item: dict) -> str | None:
+@router.post(
+    "/api/item/sources",
+    operation_id="get_items_source",
+    response_model=GetItemsSourceResponse,
+    description=(
+        "Get the source paths of multiple files specified. Use this instead of calling `get_item_source` in a row."
+    ),
+)
+async def get_items_source(
+    data: GetItemsSourceRequest,
+) -> GetItemsSourceResponse:
+    library_path = await get_library_path()
+    if library_path is None:
+        return ErrorResponse(message="Failed to fetch eagle info")
+
+    item_ids = list(dict.fromkeys(data.ids))
+    items = await map_bounded(
+        lambda item_id: eagle_api_get("/api/item/info", {"id": item_id}), item_ids
+    )
+
+    sources: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    for item_id, item in zip(item_ids, items):
+        if not is_success(item):
+            errors[item_id] = "Failed to fetch item info"
+            continue
+        source_path = construct_source_path(library_path, item)
+        if source_path is None:
+            errors[item_id] = "Failed to fetch source path"
+            continue
+        sources[item_id] = source_path
+
+    return GetItemsSourceSuccessResponse(data={"sources": sources, "errors": errors})
+
+
+async def render_preview_file(data: GetItemPreviewRequest) -> str | ErrorResponse:
+    if image_ops is None:
+        return ErrorResponse(message=PILLOW_MISSING)
+
+    library_path, item = await asyncio.gather(
+        get_library_path(), eagle_api_get("/api/item/info", {"id": data.id})
+    )
+    if library_path is None:
+        return ErrorResponse(message="Failed to fetch eagle info")
+    if not is_success(item):
+        return ErrorResponse(message="Failed to fetch item info")
+
+    try:
+        return await render_item_preview(
+            library_path, item["data"], data.maxSize, data.format, data.quality
+        )
+    except Exception as exc:
+        return ErrorResponse(message=f"Failed to render preview: {exc}")
+
+
+@router.post(
+    "/api/item/preview",
+    operation_id="get_item_preview",
+    response_model=GetItemPreviewResponse,
+    description=(
+        "Get a downscaled preview image of the file specified, encoded as base64. Use this to look at an image instead of reading the original file."
+    ),
+)
+async def get_item_preview(data: GetItemPreviewRequest) -> GetItemPreviewResponse:
+    path = await render_preview_file(data)
+    if isinstance(path, ErrorResponse):
+        return path
+
+    image, width, height = await read_image(path)
+    return GetItemPreviewSuccessResponse(
+        data={
+            "id": data.id,
+            "mimeType": MIME_TYPES[data.format],
+            "width": width,
+            "height": height,
+            "image": image,
+        }
+    )
+
+
+@router.get(
+    "/api/item/preview/file",
+    operation_id="get_item_preview_file",
+    description=(
+        "Get a downscaled preview image of the file specified. Supports `ETag`/`If-None-Match` and `Range` requests."
+    ),
+    tags=["Disabled"],
+)
+async def get_item_preview_file(
+    data: Annotated[GetItemPreviewRequest, Query()], request: Request
+):
+    path = await render_preview_file(data)
+    if isinstance(path, ErrorResponse):
+        return path
+    return file_response(
+        request, path, file_etag(path, data.id), MIME_TYPES[data.format]
+    )
+
+
+@router.post(
+    "/api/item/contactSheet",
+    operation_id="get_contact_sheet",
+    response_model=GetContactSheetResponse,
+    description=(
+        "Tile the previews of multiple files into one image (a contact sheet), encoded as base64. Use this to look at many images in one call. `tiles` tells which file is at which row and column."
+    ),
+)
+async def get_contact_sheet(data: GetContactSheetRequest) -> GetContactSheetResponse:
+    if image_ops is None:
+        return ErrorResponse(message=PILLOW_MISSING)
+
+    library_path = await get_library_path()
+    if library_path is None:
+        return ErrorResponse(message="Failed to fetch eagle info")
+
+    item_ids = list(dict.fromkeys(data.ids))
+    results = await map_bounded(
+        lambda item_id: eagle_api_get("/api/item/info", {"id": item_id}), item_ids
+    )
+
+    items: list[dict] = []
+    errors: dict[str, str] = {}
+    for item_id, result in zip(item_ids, results):
+        if not is_success(result):
+            errors[item_id] = "Failed to fetch item info"
+        elif not any(
+            os.path.isfile(path)
+            for path in image_candidates(library_path, result["data"])
+        ):
+            errors[item_id] = "Image file not found"
+        else:
+            items.append(result["data"])
+    if not items:
+        return ErrorResponse(message="No images to tile")
+
+    columns = sheet_columns(len(items), data.columns)
+    try:
+        path = await render_contact_sheet(
+            library_path, items, data.tileSize, columns, data.format, data.quality
+        )
+    except Exception as exc:
+        return ErrorResponse(message=f"Failed to render contact sheet: {exc}")
+
+    image, width, height = await read_image(path)
+    return GetContactSheetSuccessResponse(
+        data={
+            "mimeType": MIME_TYPES[data.format],
+            "width": width,
+            "height": height,
+            "image": image,
+            "tiles": [
+                {"id": item["id"], "row": index // columns, "column": index % columns}
+                for index, item in enumerate(items)
+            ],
+            "errors": errors,
+        }
+    )
+
+
+def construct_source_path(library_path: str, item: dict) -> str | None:
     try:
-        library_path = library["data"]["library"]["path"]
         item_id = item["data"]["id"]
         item_name = item["data"]["name"]
         item_ext = item["data"]["ext"]
@@ -239,3 +988,30 @@ def construct_source_path(library: dict, item: dict) -> str | None:
         )
     except KeyError:
         return None
+
+
+async def expand_folder_filter(filters: dict) -> dict | None:
+    """
+    Replace the `folders` filter with the folders and all of their subfolders
+    when `recursive` is set. Returns None if the folder list is unavailable.
+    """
+    if filters.pop("recursive", False) and filters.get("folders"):
+        tree = await folder_index.get()
+        if tree is None:
+            return None
+        folder_ids = [f.strip() for f in filters["folders"].split(",") if f.strip()]
+        filters["folders"] = ",".join(sorted(tree.expand(folder_ids)))
+    return filters
+
+
+def sync_item_index(result: dict) -> dict:
+    # NOTE: 追加や色の再解析の結果は返らないため、構築済みのインデックスを再同期する
+    if is_success(result) and item_index.synced_at is not None:
+        item_index.start_sync()
+    return result
+
+
+def invalidate_items(item_ids: list[str]) -> None:
+    for item_id in item_ids:
+        invalidate_cache("/api/item/info", {"id": item_id})
+        invalidate_cache("/api/item/thumbnail", {"id": item_id})
@@ -1,6 +1,26 @@
-from fastapi import APIRouter, Response
-from schemas.library import SwitchLibraryRequest, GetLibraryIconRequest
-from utils.eagle_api import eagle_api_get, eagle_api_post
+from fastapi import APIRouter, Query, Request
+from schemas.library import (
+    GetLibraryInfoRequest,
+    SwitchLibraryRequest,
+    GetLibraryIconRequest,
+)
+from typing import Annotated
+import httpx
+import os
+from utils.eagle_api import (
+    eagle_api_get,
+    eagle_api_get_raw,
+    eagle_api_post,
+    is_success,
+    stream_from_eagle_api,
+)
+from utils.disk_cache import binary_cache
+from utils.fastjson import json_response
+from utils.file_response import file_etag, file_response
+from utils.projection import project, prune_tree, stream_json
+from utils.watcher import forget_library
+
+LIBRARY_ICON_MAX_AGE = float(os.environ.get("EAGLE_LIBRARY_ICON_MAX_AGE", "3600"))
 
 router = APIRouter(tags=["Library"])
 
@@ -9,14 +29,32 @@ router = APIRouter(tags=["Library"])
     "/api/library/info",
     operation_id="get_library_info",
     description=(
-        "Get detailed information of the library currently running. The function can be used to obtain details such as `All Folders`, `All Smart Folders`, `All Tag Groups`, `Quick Access` and etc."
+        "Get detailed information of the library currently running. The function can be used to obtain details such as `All Folders`, `All Smart Folders`, `All Tag Groups`, `Quick Access` and etc. Use `fields` and `depth` to keep the response small."
     ),
 )
-async def get_library_info():
+async def get_library_info(data: Annotated[GetLibraryInfoRequest, Query()]):
     """
     reference: https://api.eagle.cool/library/info
     """
-    return await eagle_api_get("/api/library/info")
+    if data.fields is None and data.depth is None:
+        # NOTE: 加工が不要な場合はEagleのレスポンスをそのまま返す
+        return json_response(await eagle_api_get_raw("/api/library/info"))
+
+    result = await eagle_api_get("/api/library/info")
+    if not is_success(result) or not isinstance(result.get("data"), dict):
+        return result
+
+    library = project(result["data"], data.fields)
+    if data.depth is not None:
+        library = {
+            key: (
+                prune_tree(value, data.depth)
+                if key in ("folders", "smartFolders") and isinstance(value, list)
+                else value
+            )
+            for key, value in library.items()
+        }
+    return stream_json({**result, "data": library})
 
 
 @router.get(
@@ -43,7 +81,9 @@ async def switch_library(data: SwitchLibraryRequest):
     reference: https://api.eagle.cool/library/switch
     """
     payload = data.model_dump(exclude_none=True)
-    return await eagle_api_post("/api/library/switch", payload)
+    result = await eagle_api_post("/api/library/switch", payload)
+    forget_library()
+    return result
 
 
 @router.post(
@@ -53,15 +93,17 @@ async def switch_library(data: SwitchLibraryRequest):
     tags=["Disabled"],
     deprecated=True,
 )
-async def get_library_icon(data: GetLibraryIconRequest):
+async def get_library_icon(data: GetLibraryIconRequest, request: Request):
     """
     reference: https://api.eagle.cool/library/icon
     """
     payload = data.model_dump(exclude_none=True)
-    result = await eagle_api_get("/api/library/icon", payload, is_binary=True)
-
-    if isinstance(result, dict) and result.get("status") == "error":
-        return result
-
-    content, content_type = result
-    return Response(content=content, media_type=content_type)
+    try:
+        path = await binary_cache.get_or_fill(
+            f"library-icon:{data.libraryPath}",
+            lambda: stream_from_eagle_api("/api/library/icon", payload),
+            max_age=LIBRARY_ICON_MAX_AGE,
+        )
+    except httpx.HTTPError as exc:
+        return {"status": "error", "message": f"Failed to get the icon: {exc}"}
+    return file_response(request, path, file_etag(path, "library-icon"))
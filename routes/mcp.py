@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from schemas.mcp import ConnectResponse, ConnectSuccessResponse
+from utils.eagle_api import circuit_breaker
 
 router = APIRouter(tags=["MCP"])
 
@@ -11,4 +12,4 @@ router = APIRouter(tags=["MCP"])
     tags=["Disabled"],
 )
 async def connect() -> ConnectResponse:
-    return ConnectSuccessResponse(message="Connected!")
+    return ConnectSuccessResponse(message="Connected!", eagle=circuit_breaker.to_dict())
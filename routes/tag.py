@@ -0,0 +1,114 @@
+from fastapi import APIRouter
+from schemas.api import ErrorResponse
+from schemas.tag import (
+    GetTagStatsRequest,
+    GetTagStatsResponse,
+    GetTagStatsSuccessResponse,
+    SuggestTagsRequest,
+    SuggestTagsResponse,
+    SuggestTagsSuccessResponse,
+    FindTagCleanupCandidatesRequest,
+    FindTagCleanupCandidatesResponse,
+    FindTagCleanupCandidatesSuccessResponse,
+)
+from utils.folder_index import folder_index
+from utils.item_index import item_index
+from utils.pagination import ScanError
+from utils.tag_index import tag_index
+
+router = APIRouter(tags=["Tag"])
+
+
+@router.post(
+    "/api/tag/stats",
+    operation_id="get_tag_stats",
+    response_model=GetTagStatsResponse,
+    description=(
+        "Count how many items carry each tag, in the whole library or in some folders. Answered from a local index of the library, without paging through items."
+    ),
+)
+async def get_tag_stats(data: GetTagStatsRequest) -> GetTagStatsResponse:
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    folders = data.folders
+    if data.recursive and folders:
+        tree = await folder_index.get()
+        if tree is None:
+            return ErrorResponse(message="Failed to fetch folder list")
+        folders = tree.expand(folders)
+
+    tags, total = tag_index.top_tags(data.limit, folders)
+    return GetTagStatsSuccessResponse(
+        data={
+            "totalTags": total,
+            "tags": [{"name": tag, "count": count} for tag, count in tags],
+        }
+    )
+
+
+@router.post(
+    "/api/tag/suggest",
+    operation_id="suggest_tags",
+    response_model=SuggestTagsResponse,
+    description=(
+        "Suggest tags that often appear together with the given tags, or with the tags of an item. Useful to complete the tags of a new item consistently with the library."
+    ),
+)
+async def suggest_tags(data: SuggestTagsRequest) -> SuggestTagsResponse:
+    if not data.tags and not data.itemId:
+        return ErrorResponse(message="Either `tags` or `itemId` is required")
+
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    tags = data.tags
+    if not tags:
+        record = item_index.records.get(data.itemId)
+        if record is None:
+            return ErrorResponse(message=f"Item not found: {data.itemId}")
+        tags = record.tags
+
+    return SuggestTagsSuccessResponse(
+        data=[
+            {"name": tag, "count": count, "score": round(score, 4)}
+            for tag, score, count in tag_index.suggest(tags, data.limit)
+        ]
+    )
+
+
+@router.post(
+    "/api/tag/cleanup",
+    operation_id="find_tag_cleanup_candidates",
+    response_model=FindTagCleanupCandidatesResponse,
+    description=(
+        "Find tags that may need cleaning up: rarely used tags, and groups of tags spelled alike (e.g. `Web Design` and `web-design`, or typos). Review the results before merging tags with `update_items_matching`."
+    ),
+)
+async def find_tag_cleanup_candidates(
+    data: FindTagCleanupCandidatesRequest,
+) -> FindTagCleanupCandidatesResponse:
+    try:
+        await item_index.ensure_ready()
+    except ScanError as exc:
+        return ErrorResponse(message=f"Failed to build item index: {exc}")
+
+    rare = tag_index.rare_tags(data.maxCount)
+    similar = tag_index.similar_spellings()
+    return FindTagCleanupCandidatesSuccessResponse(
+        data={
+            "rare": [
+                {"name": tag, "count": count} for tag, count in rare[: data.limit]
+            ],
+            "totalRare": len(rare),
+            "similar": [
+                [{"name": tag, "count": count} for tag, count in group]
+                for group in similar[: data.limit]
+            ],
+            "totalSimilar": len(similar),
+        }
+    )
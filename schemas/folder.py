@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Annotated, Optional
+from typing import Annotated, Dict, List, Optional, Union
 from enum import Enum
+from schemas.api import SuccessResponse, ErrorResponse
 
 
 class FolderColor(str, Enum):
@@ -51,3 +52,68 @@ class UpdateFolderRequest(BaseModel):
             description='"red","orange","green","yellow","aqua","blue","purple","pink"',
         ),
     ]
+
+
+class ResolveFoldersRequest(BaseModel):
+    paths: Annotated[
+        List[str],
+        Field(
+            ...,
+            min_length=1,
+            max_length=100,
+            description='Folder paths separated by `/`, e.g.: `["Design/Logos"]`, or folder names. Case-insensitive.',
+        ),
+    ]
+
+
+class FolderInfo(BaseModel):
+    id: Annotated[str, Field(..., description="The folder's ID")]
+    name: Annotated[str, Field(...)]
+    path: Annotated[str, Field(..., description="Names from the root, joined by `/`")]
+    parent: Annotated[Optional[str], Field(None, description="ID of the parent folder")]
+    depth: Annotated[int, Field(..., description="`0` for top-level folders")]
+    childCount: Annotated[int, Field(...)]
+
+
+class ResolveFoldersSuccessResponse(SuccessResponse):
+    data: Annotated[
+        Dict[str, List[FolderInfo]],
+        Field(
+            ...,
+            description="Matching folders for each path. A bare name can match several folders; an unknown path matches none.",
+        ),
+    ]
+
+
+ResolveFoldersResponse = Union[ResolveFoldersSuccessResponse, ErrorResponse]
+
+
+class ExpandFoldersRequest(BaseModel):
+    folderIds: Annotated[
+        Optional[List[str]], Field(None, description="IDs of the folders to expand")
+    ]
+    paths: Annotated[
+        Optional[List[str]],
+        Field(None, description="Paths or names of the folders to expand"),
+    ]
+    includeSelf: Annotated[
+        bool,
+        Field(True, description="Include the given folders themselves"),
+    ]
+
+
+class ExpandFoldersData(BaseModel):
+    folderIds: Annotated[
+        List[str],
+        Field(..., description="IDs of the folders and all of their subfolders"),
+    ]
+    notFound: Annotated[
+        List[str], Field(..., description="Given IDs or paths that do not exist")
+    ]
+
+
+class ExpandFoldersSuccessResponse(SuccessResponse):
+    data: Annotated[ExpandFoldersData, Field(...)]
+
+
+ExpandFoldersResponse = Union[ExpandFoldersSuccessResponse, ErrorResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Annotated, Dict, Optional, List, Literal, Union
+from typing import Annotated, Any, Dict, Optional, List, Literal, Union
 from schemas.api import SuccessResponse, ErrorResponse
 
 
@@ -210,6 +210,210 @@ class GetItemListRequest(BaseModel):
             description="Filter by Folders. Use `,` to divide folder IDs. E.g.: `KAY6NTU6UYI5Q,KBJ8Z60O88VMG`",
         ),
     ]
+    recursive: Annotated[
+        Optional[bool],
+        Field(
+            None,
+            description="Also include items in the subfolders of `folders`. Sent to Eagle as a single request.",
+        ),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. If omitted, all fields except the bulky ones (`palettes`) are included.",
+        ),
+    ]
+
+
+class ItemListFilter(BaseModel):
+    orderBy: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="The sorting order. `CREATEDATE`, `FILESIZE`, `NAME`, `RESOLUTION`, add a minus sign for descending order: `-FILESIZE`",
+        ),
+    ]
+    keyword: Annotated[Optional[str], Field(None, description="Filter by the keyword")]
+    ext: Annotated[
+        Optional[str],
+        Field(None, description="Filter by the extension type, e.g.: `jpg`, `png`"),
+    ]
+    tags: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="Filter by tags. Use `,` to divide different tags. E.g.: `Design, Poster`",
+        ),
+    ]
+    folders: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="Filter by Folders. Use `,` to divide folder IDs. E.g.: `KAY6NTU6UYI5Q,KBJ8Z60O88VMG`",
+        ),
+    ]
+    recursive: Annotated[
+        Optional[bool],
+        Field(
+            None,
+            description="Also include items in the subfolders of `folders`. Sent to Eagle as a single request.",
+        ),
+    ]
+
+
+class StreamItemListRequest(ItemListFilter):
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. All fields are included if omitted.",
+        ),
+    ]
+    maxItems: Annotated[
+        Optional[int],
+        Field(None, ge=0, description="Stop after this number of items"),
+    ]
+
+
+class ScanItemListRequest(ItemListFilter):
+    groupBy: Annotated[
+        Optional[List[Literal["ext", "tags", "folders", "star"]]],
+        Field(
+            None,
+            description="Count the matching items per value of these fields",
+        ),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            ["id", "name", "ext"],
+            description="Item fields to include in `items`",
+        ),
+    ]
+    maxItems: Annotated[
+        int,
+        Field(
+            100,
+            ge=0,
+            description="The number of items to be returned in `items`. All matching items are still counted",
+        ),
+    ]
+
+
+class ScanItemListData(BaseModel):
+    total: Annotated[int, Field(..., description="Number of matching items")]
+    counts: Annotated[
+        Dict[str, Dict[str, int]],
+        Field(..., description="Item counts per value of each `groupBy` field"),
+    ]
+    items: Annotated[List[Dict[str, Any]], Field(...)]
+
+
+class ScanItemListSuccessResponse(SuccessResponse):
+    data: Annotated[ScanItemListData, Field(...)]
+
+
+ScanItemListResponse = Union[ScanItemListSuccessResponse, ErrorResponse]
+
+
+class QueryItemsRequest(BaseModel):
+    tags: Annotated[
+        Optional[List[str]],
+        Field(None, description='Filter by tags, e.g.: `["Design", "Poster"]`'),
+    ]
+    tagsMode: Annotated[
+        Literal["and", "or"],
+        Field(
+            "and",
+            description="`and`: items must have all `tags`. `or`: items must have any of `tags`",
+        ),
+    ]
+    folders: Annotated[
+        Optional[List[str]],
+        Field(
+            None, description="Filter by folder IDs. Items in any of the folders match"
+        ),
+    ]
+    recursive: Annotated[
+        bool,
+        Field(False, description="Also match items in the subfolders of `folders`"),
+    ]
+    ext: Annotated[
+        Optional[List[str]],
+        Field(None, description='Filter by extension types, e.g.: `["jpg", "png"]`'),
+    ]
+    starMin: Annotated[
+        Optional[int], Field(None, ge=0, le=5, description="Minimum rating")
+    ]
+    starMax: Annotated[
+        Optional[int], Field(None, ge=0, le=5, description="Maximum rating")
+    ]
+    widthMin: Annotated[Optional[int], Field(None, ge=0, description="Minimum width")]
+    widthMax: Annotated[Optional[int], Field(None, ge=0, description="Maximum width")]
+    heightMin: Annotated[Optional[int], Field(None, ge=0, description="Minimum height")]
+    heightMax: Annotated[Optional[int], Field(None, ge=0, description="Maximum height")]
+    keyword: Annotated[
+        Optional[str], Field(None, description="Filter by a keyword in the name")
+    ]
+    orderBy: Annotated[
+        Optional[
+            Literal[
+                "name",
+                "-name",
+                "ext",
+                "-ext",
+                "size",
+                "-size",
+                "width",
+                "-width",
+                "height",
+                "-height",
+                "star",
+                "-star",
+                "modificationTime",
+                "-modificationTime",
+                "lastModified",
+                "-lastModified",
+            ]
+        ],
+        Field(
+            None,
+            description="The sorting order. Add a minus sign for descending order: `-size`",
+        ),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. All indexed fields are included if omitted.",
+        ),
+    ]
+    limit: Annotated[
+        int,
+        Field(
+            100,
+            ge=1,
+            le=1000,
+            description="The number of items to be returned. the default number is `100`",
+        ),
+    ]
+    offset: Annotated[
+        int,
+        Field(0, ge=0, description="The number of matching items to skip"),
+    ]
+
+
+class QueryItemsData(BaseModel):
+    total: Annotated[int, Field(..., description="Number of matching items")]
+    items: Annotated[List[Dict[str, Any]], Field(...)]
+
+
+class QueryItemsSuccessResponse(SuccessResponse):
+    data: Annotated[QueryItemsData, Field(...)]
+
+
+QueryItemsResponse = Union[QueryItemsSuccessResponse, ErrorResponse]
 
 
 class MoveItemToTrashRequest(BaseModel):
@@ -281,3 +485,523 @@ class GetItemSourceSuccessResponse(SuccessResponse):
 
 
 GetItemSourceResponse = Union[GetItemSourceSuccessResponse, ErrorResponse]
+
+
+class GetItemsSourceRequest(BaseModel):
+    ids: Annotated[
+        List[str],
+        Field(
+            ...,
+            min_length=1,
+            max_length=1000,
+            description="IDs of the files",
+        ),
+    ]
+
+
+class GetItemsSourceData(BaseModel):
+    sources: Annotated[
+        Dict[str, str],
+        Field(..., description="Source paths keyed by item ID"),
+    ]
+    errors: Annotated[
+        Dict[str, str],
+        Field(..., description="Error messages keyed by item ID"),
+    ]
+
+
+class GetItemsSourceSuccessResponse(SuccessResponse):
+    data: Annotated[
+        GetItemsSourceData,
+        Field(...),
+    ]
+
+
+GetItemsSourceResponse = Union[GetItemsSourceSuccessResponse, ErrorResponse]
+
+
+class GetItemsInfoRequest(BaseModel):
+    ids: Annotated[
+        List[str],
+        Field(
+            ...,
+            min_length=1,
+            max_length=1000,
+            description="IDs of the files",
+        ),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. All fields are included if omitted.",
+        ),
+    ]
+
+
+class GetItemsInfoData(BaseModel):
+    items: Annotated[
+        Dict[str, Dict[str, Any]],
+        Field(..., description="Item properties keyed by item ID"),
+    ]
+    errors: Annotated[
+        Dict[str, str],
+        Field(..., description="Error messages keyed by item ID"),
+    ]
+
+
+class GetItemsInfoSuccessResponse(SuccessResponse):
+    data: Annotated[
+        GetItemsInfoData,
+        Field(...),
+    ]
+
+
+GetItemsInfoResponse = Union[GetItemsInfoSuccessResponse, ErrorResponse]
+
+
+class UpdateItemsRequest(BaseModel):
+    items: Annotated[
+        List[UpdateItemRequest],
+        Field(
+            ...,
+            min_length=1,
+            max_length=1000,
+            description="The changes to apply, one per item",
+        ),
+    ]
+    rateLimit: Annotated[
+        Optional[float],
+        Field(None, gt=0, description="Maximum number of updates per second"),
+    ]
+
+
+class UpdateItemsMatchingRequest(ItemListFilter):
+    addTags: Annotated[
+        Optional[List[str]], Field(None, description="Tags to add to each item")
+    ]
+    removeTags: Annotated[
+        Optional[List[str]], Field(None, description="Tags to remove from each item")
+    ]
+    annotation: Annotated[
+        Optional[str], Field(None, description="Optional, annotations")
+    ]
+    url: Annotated[Optional[str], Field(None, description="Optional, the source url")]
+    star: Annotated[
+        Optional[int], Field(None, ge=0, le=5, description="Optional, ratings")
+    ]
+    dryRun: Annotated[
+        bool,
+        Field(
+            False,
+            description="Only return the IDs of the items that would be changed",
+        ),
+    ]
+    rateLimit: Annotated[
+        Optional[float],
+        Field(None, gt=0, description="Maximum number of updates per second"),
+    ]
+
+
+class UpdateItemsData(BaseModel):
+    updated: Annotated[
+        List[str],
+        Field(..., description="IDs of the items that were (or would be) updated"),
+    ]
+    errors: Annotated[
+        Dict[str, str],
+        Field(..., description="Error messages keyed by item ID"),
+    ]
+
+
+class UpdateItemsSuccessResponse(SuccessResponse):
+    data: Annotated[UpdateItemsData, Field(...)]
+
+
+UpdateItemsResponse = Union[UpdateItemsSuccessResponse, ErrorResponse]
+
+
+class ImportItemsRequest(BaseModel):
+    path: Annotated[
+        str, Field(..., description="Required, the local directory to import")
+    ]
+    pattern: Annotated[
+        str,
+        Field(
+            "*",
+            description="Only import files whose name matches this glob pattern, e.g.: `*.png`",
+        ),
+    ]
+    recursive: Annotated[
+        bool, Field(True, description="Also import files in subdirectories")
+    ]
+    tags: Annotated[
+        Optional[List[str]], Field(None, description="Tags for the imported items")
+    ]
+    folderId: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="If this parameter is defined, the images will be added to the corresponding folder.",
+        ),
+    ]
+    skipExisting: Annotated[
+        bool,
+        Field(
+            True,
+            description="Skip files whose size and content match an item already in the library",
+        ),
+    ]
+
+
+class GetImportJobRequest(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the import job")]
+
+
+class ImportJobData(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the import job")]
+    status: Annotated[Literal["running", "completed", "failed"], Field(...)]
+    path: Annotated[str, Field(...)]
+    scanned: Annotated[int, Field(..., description="Number of files found")]
+    skipped: Annotated[
+        int, Field(..., description="Number of files skipped as already imported")
+    ]
+    submitted: Annotated[int, Field(..., description="Number of files sent to Eagle")]
+    imported: Annotated[
+        int,
+        Field(
+            ...,
+            description="Number of files added. Eagle reports the result per batch, so these are the files of the batches it accepted",
+        ),
+    ]
+    failed: Annotated[
+        int, Field(..., description="Number of files in the batches that failed")
+    ]
+    batches: Annotated[int, Field(..., description="Number of finished batches")]
+    failedBatches: Annotated[
+        int, Field(..., description="Number of batches that failed")
+    ]
+    errors: Annotated[List[str], Field(..., description="The latest errors")]
+    startedAt: Annotated[float, Field(...)]
+    finishedAt: Annotated[Optional[float], Field(None)]
+
+
+class ImportJobSuccessResponse(SuccessResponse):
+    data: Annotated[ImportJobData, Field(...)]
+
+
+ImportJobResponse = Union[ImportJobSuccessResponse, ErrorResponse]
+
+
+PreviewFormat = Literal["jpeg", "webp"]
+
+
+class GetItemPreviewRequest(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the file")]
+    maxSize: Annotated[
+        int,
+        Field(
+            512,
+            ge=32,
+            le=2048,
+            description="Maximum width and height (pixels) of the preview",
+        ),
+    ]
+    format: Annotated[PreviewFormat, Field("jpeg", description="Image format")]
+    quality: Annotated[
+        int, Field(80, ge=1, le=95, description="Encoding quality of the preview")
+    ]
+
+
+class ItemPreviewData(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the file")]
+    mimeType: Annotated[str, Field(...)]
+    width: Annotated[int, Field(...)]
+    height: Annotated[int, Field(...)]
+    image: Annotated[str, Field(..., description="Base64-encoded image")]
+
+
+class GetItemPreviewSuccessResponse(SuccessResponse):
+    data: Annotated[ItemPreviewData, Field(...)]
+
+
+GetItemPreviewResponse = Union[GetItemPreviewSuccessResponse, ErrorResponse]
+
+
+class GetContactSheetRequest(BaseModel):
+    ids: Annotated[
+        List[str],
+        Field(
+            ...,
+            min_length=1,
+            max_length=64,
+            description="IDs of the files to tile, in order",
+        ),
+    ]
+    tileSize: Annotated[
+        int,
+        Field(192, ge=32, le=512, description="Width and height (pixels) of each tile"),
+    ]
+    columns: Annotated[
+        Optional[int],
+        Field(
+            None,
+            ge=1,
+            le=16,
+            description="Number of columns. Chosen to make the sheet about square if omitted.",
+        ),
+    ]
+    format: Annotated[PreviewFormat, Field("jpeg", description="Image format")]
+    quality: Annotated[
+        int, Field(75, ge=1, le=95, description="Encoding quality of the sheet")
+    ]
+
+
+class ContactSheetTile(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the file")]
+    row: Annotated[int, Field(...)]
+    column: Annotated[int, Field(...)]
+
+
+class ContactSheetData(BaseModel):
+    mimeType: Annotated[str, Field(...)]
+    width: Annotated[int, Field(...)]
+    height: Annotated[int, Field(...)]
+    image: Annotated[str, Field(..., description="Base64-encoded image")]
+    tiles: Annotated[
+        List[ContactSheetTile],
+        Field(..., description="Position of each file on the sheet"),
+    ]
+    errors: Annotated[
+        Dict[str, str],
+        Field(..., description="Error messages of files that could not be tiled"),
+    ]
+
+
+class GetContactSheetSuccessResponse(SuccessResponse):
+    data: Annotated[ContactSheetData, Field(...)]
+
+
+GetContactSheetResponse = Union[GetContactSheetSuccessResponse, ErrorResponse]
+
+
+class SearchItemsRequest(BaseModel):
+    query: Annotated[
+        str,
+        Field(
+            ...,
+            min_length=1,
+            description="Words to search for in the name, tags, annotation, URL and folder names of items",
+        ),
+    ]
+    tags: Annotated[
+        Optional[List[str]],
+        Field(None, description="Only search items that have all of these tags"),
+    ]
+    folders: Annotated[
+        Optional[List[str]],
+        Field(
+            None, description="Only search items in any of these folders (folder IDs)"
+        ),
+    ]
+    ext: Annotated[
+        Optional[List[str]],
+        Field(None, description='Only search these extension types, e.g.: `["jpg"]`'),
+    ]
+    prefix: Annotated[
+        bool,
+        Field(True, description="Also match words that start with a query word"),
+    ]
+    fuzzy: Annotated[
+        bool,
+        Field(True, description="Also match words that are spelled similarly (typos)"),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. All indexed fields are included if omitted.",
+        ),
+    ]
+    limit: Annotated[
+        int,
+        Field(
+            20,
+            ge=1,
+            le=1000,
+            description="The number of items to be returned. the default number is `20`",
+        ),
+    ]
+    offset: Annotated[
+        int,
+        Field(0, ge=0, description="The number of matching items to skip"),
+    ]
+
+
+class SearchItemsData(BaseModel):
+    total: Annotated[int, Field(..., description="Number of matching items")]
+    items: Annotated[
+        List[Dict[str, Any]],
+        Field(..., description="Matching items, best first, each with its `score`"),
+    ]
+
+
+class SearchItemsSuccessResponse(SuccessResponse):
+    data: Annotated[SearchItemsData, Field(...)]
+
+
+SearchItemsResponse = Union[SearchItemsSuccessResponse, ErrorResponse]
+
+
+class PaletteColor(BaseModel):
+    color: Annotated[
+        str,
+        Field(
+            ...,
+            pattern=r"^#?[0-9a-fA-F]{6}$",
+            description="Color in hex, e.g.: `#1e90ff`",
+        ),
+    ]
+    ratio: Annotated[
+        float,
+        Field(
+            1,
+            gt=0,
+            description="Share of the color in the palette. Ratios are relative to each other.",
+        ),
+    ]
+
+
+class SearchItemsByColorRequest(BaseModel):
+    colors: Annotated[
+        Optional[List[PaletteColor]],
+        Field(
+            None,
+            min_length=1,
+            max_length=16,
+            description='Color scheme to look for, e.g.: `[{"color": "#1e90ff", "ratio": 60}, {"color": "#ffffff", "ratio": 40}]`',
+        ),
+    ]
+    itemId: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="Look for items with a color scheme like this item. Used when `colors` is omitted.",
+        ),
+    ]
+    tags: Annotated[
+        Optional[List[str]],
+        Field(None, description="Only search items that have all of these tags"),
+    ]
+    folders: Annotated[
+        Optional[List[str]],
+        Field(
+            None, description="Only search items in any of these folders (folder IDs)"
+        ),
+    ]
+    ext: Annotated[
+        Optional[List[str]],
+        Field(None, description='Only search these extension types, e.g.: `["jpg"]`'),
+    ]
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Item fields to include, e.g.: `id`, `name`, `tags`. All indexed fields are included if omitted.",
+        ),
+    ]
+    limit: Annotated[
+        int,
+        Field(
+            20,
+            ge=1,
+            le=200,
+            description="The number of items to be returned. the default number is `20`",
+        ),
+    ]
+
+
+class SearchItemsByColorData(BaseModel):
+    items: Annotated[
+        List[Dict[str, Any]],
+        Field(
+            ...,
+            description="Most similar items first, each with its `similarity` (0 to 1)",
+        ),
+    ]
+
+
+class SearchItemsByColorSuccessResponse(SuccessResponse):
+    data: Annotated[SearchItemsByColorData, Field(...)]
+
+
+SearchItemsByColorResponse = Union[SearchItemsByColorSuccessResponse, ErrorResponse]
+
+
+class FindDuplicateItemsRequest(BaseModel):
+    maxDistance: Annotated[
+        int,
+        Field(
+            4,
+            ge=0,
+            le=16,
+            description="Maximum number of differing bits (out of 64) between the perceptual hashes of near-duplicates. `0` only finds visually identical images.",
+        ),
+    ]
+    folders: Annotated[
+        Optional[List[str]],
+        Field(
+            None, description="Only look at items in any of these folders (folder IDs)"
+        ),
+    ]
+    ext: Annotated[
+        Optional[List[str]],
+        Field(None, description='Only look at these extension types, e.g.: `["jpg"]`'),
+    ]
+    limit: Annotated[
+        int, Field(50, ge=1, le=500, description="Maximum number of groups returned")
+    ]
+    wait: Annotated[
+        float,
+        Field(
+            60,
+            ge=0,
+            le=240,
+            description="Seconds to wait for items to be hashed. Hashing continues in the background; call again for complete results.",
+        ),
+    ]
+
+
+class DuplicateItem(BaseModel):
+    id: Annotated[str, Field(..., description="ID of the file")]
+    name: Annotated[str, Field(...)]
+    ext: Annotated[str, Field(...)]
+    size: Annotated[int, Field(...)]
+    width: Annotated[int, Field(...)]
+    height: Annotated[int, Field(...)]
+    distance: Annotated[
+        int, Field(..., description="Distance to the first item of the group")
+    ]
+
+
+class FindDuplicateItemsData(BaseModel):
+    groups: Annotated[
+        List[List[DuplicateItem]],
+        Field(
+            ...,
+            description="Groups of near-duplicates. The first item of each group has the highest resolution.",
+        ),
+    ]
+    totalGroups: Annotated[int, Field(..., description="Number of groups found")]
+    hashed: Annotated[int, Field(..., description="Number of items compared")]
+    complete: Annotated[
+        bool,
+        Field(..., description="`false` if some items are still being hashed"),
+    ]
+
+
+class FindDuplicateItemsSuccessResponse(SuccessResponse):
+    data: Annotated[FindDuplicateItemsData, Field(...)]
+
+
+FindDuplicateItemsResponse = Union[FindDuplicateItemsSuccessResponse, ErrorResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Annotated
+from typing import Annotated, List, Optional
 
 
 class SwitchLibraryRequest(BaseModel):
@@ -8,3 +8,21 @@ class SwitchLibraryRequest(BaseModel):
 
 class GetLibraryIconRequest(BaseModel):
     libraryPath: Annotated[str, Field(..., description="The path of the library")]
+
+
+class GetLibraryInfoRequest(BaseModel):
+    fields: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Fields of the library info to include, e.g.: `folders`, `tagsGroups`. All fields are included if omitted.",
+        ),
+    ]
+    depth: Annotated[
+        Optional[int],
+        Field(
+            None,
+            ge=0,
+            description="Maximum nesting depth of `folders` and `smartFolders`. `0` returns only the top-level folders. Cut folders report the number of their children in `childCount`.",
+        ),
+    ]
@@ -1,10 +1,30 @@
-from pydantic import Field
-from typing import Annotated, Union
+from pydantic import BaseModel, Field
+from typing import Annotated, Literal, Union
 from schemas.api import SuccessResponse, ErrorResponse
 
 
+class CircuitBreakerState(BaseModel):
+    state: Annotated[
+        Literal["closed", "open", "half_open"],
+        Field(
+            ...,
+            description="`open` while requests to Eagle are rejected without being sent",
+        ),
+    ]
+    failures: Annotated[
+        int, Field(..., description="Consecutive failed requests to Eagle")
+    ]
+    retryIn: Annotated[
+        float, Field(..., description="Seconds until Eagle is probed again")
+    ]
+
+
 class ConnectSuccessResponse(SuccessResponse):
     message: Annotated[str, Field(...)]
+    eagle: Annotated[
+        CircuitBreakerState,
+        Field(..., description="State of the circuit breaker of the Eagle API"),
+    ]
 
 
 ConnectResponse = Union[ConnectSuccessResponse, ErrorResponse]
@@ -0,0 +1,122 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Union
+from schemas.api import SuccessResponse, ErrorResponse
+
+
+class TagCount(BaseModel):
+    name: Annotated[str, Field(..., description="The tag")]
+    count: Annotated[int, Field(..., description="Number of items with the tag")]
+
+
+class GetTagStatsRequest(BaseModel):
+    folders: Annotated[
+        Optional[List[str]],
+        Field(
+            None,
+            description="Only count items in any of these folders (folder IDs). The whole library is counted if omitted.",
+        ),
+    ]
+    recursive: Annotated[
+        bool,
+        Field(False, description="Also count items in the subfolders of `folders`"),
+    ]
+    limit: Annotated[
+        int,
+        Field(
+            100,
+            ge=1,
+            le=10000,
+            description="The number of tags to be returned, most used first",
+        ),
+    ]
+
+
+class TagStatsData(BaseModel):
+    totalTags: Annotated[int, Field(..., description="Number of distinct tags")]
+    tags: Annotated[List[TagCount], Field(...)]
+
+
+class GetTagStatsSuccessResponse(SuccessResponse):
+    data: Annotated[TagStatsData, Field(...)]
+
+
+GetTagStatsResponse = Union[GetTagStatsSuccessResponse, ErrorResponse]
+
+
+class SuggestTagsRequest(BaseModel):
+    tags: Annotated[
+        Optional[List[str]],
+        Field(None, description="Tags to find related tags for"),
+    ]
+    itemId: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="Find tags related to the tags of this item. Used when `tags` is omitted.",
+        ),
+    ]
+    limit: Annotated[
+        int,
+        Field(10, ge=1, le=100, description="The number of tags to be returned"),
+    ]
+
+
+class TagSuggestion(TagCount):
+    score: Annotated[
+        float,
+        Field(
+            ...,
+            description="Share of the items with the given tags that also have this tag (0 to 1)",
+        ),
+    ]
+
+
+class SuggestTagsSuccessResponse(SuccessResponse):
+    data: Annotated[List[TagSuggestion], Field(...)]
+
+
+SuggestTagsResponse = Union[SuggestTagsSuccessResponse, ErrorResponse]
+
+
+class FindTagCleanupCandidatesRequest(BaseModel):
+    maxCount: Annotated[
+        int,
+        Field(
+            1,
+            ge=0,
+            description="Tags used by at most this many items are reported as rare",
+        ),
+    ]
+    limit: Annotated[
+        int,
+        Field(
+            100,
+            ge=1,
+            le=1000,
+            description="The number of rare tags and of similar groups to be returned",
+        ),
+    ]
+
+
+class TagCleanupData(BaseModel):
+    rare: Annotated[
+        List[TagCount], Field(..., description="Rarely used tags, least used first")
+    ]
+    totalRare: Annotated[int, Field(...)]
+    similar: Annotated[
+        List[List[TagCount]],
+        Field(
+            ...,
+            description="Groups of tags spelled alike (case, width, separators or one typo), most used tag of each group first",
+        ),
+    ]
+    totalSimilar: Annotated[int, Field(...)]
+
+
+class FindTagCleanupCandidatesSuccessResponse(SuccessResponse):
+    data: Annotated[TagCleanupData, Field(...)]
+
+
+FindTagCleanupCandidatesResponse = Union[
+    FindTagCleanupCandidatesSuccessResponse, ErrorResponse
+]
@@ -0,0 +1,46 @@
+import asyncio
+from routes import folder
+from schemas.folder import ExpandFoldersRequest
+from utils.folder_index import FolderTree
+
+TREE = FolderTree(
+    [
+        {
+            "id": "A",
+            "name": "Design",
+            "children": [
+                {
+                    "id": "B",
+                    "name": "Posters",
+                    "children": [{"id": "C", "name": "Print", "children": []}],
+                }
+            ],
+        },
+        {"id": "D", "name": "Photos", "children": []},
+    ]
+)
+
+
+def expand(monkeypatch, **request) -> list[str]:
+    async def get():
+        return TREE
+
+    monkeypatch.setattr(folder.folder_index, "get", get)
+    response = asyncio.run(folder.expand_folders(ExpandFoldersRequest(**request)))
+    return response.data.folderIds
+
+
+def test_expand_includes_the_given_folders(monkeypatch):
+    assert expand(monkeypatch, folderIds=["B", "D"]) == ["B", "C", "D"]
+
+
+def test_expand_without_the_given_folders(monkeypatch):
+    assert expand(monkeypatch, folderIds=["B", "D"], includeSelf=False) == ["C"]
+
+
+def test_expand_nested_folders_without_the_given_folders(monkeypatch):
+    # B is in the subtree of A, so only A itself is left out
+    assert expand(monkeypatch, folderIds=["A", "B"], includeSelf=False) == ["B", "C"]
+    assert expand(
+        monkeypatch, paths=["Design", "Design/Posters/Print"], includeSelf=False
+    ) == ["B", "C"]
@@ -0,0 +1,72 @@
+import os
+from utils.importer import ImportJob, SharedJobStore
+
+
+def make_job() -> ImportJob:
+    return ImportJob(
+        root="",
+        pattern="*",
+        recursive=True,
+        folder_id=None,
+        tags=None,
+        skip_existing=True,
+    )
+
+
+def scan(path: str) -> os.DirEntry:
+    with os.scandir(os.path.dirname(path)) as entries:
+        return next(entry for entry in entries if entry.path == path)
+
+
+def test_same_content_is_imported(tmp_path):
+    source = tmp_path / "source.png"
+    source.write_bytes(b"image")
+    incoming = tmp_path / "incoming.png"
+    incoming.write_bytes(b"image")
+    job = make_job()
+    job._existing = {5: [str(source)]}
+    assert job._is_imported(scan(str(incoming)), 5)
+
+
+def test_other_content_is_not_imported(tmp_path):
+    source = tmp_path / "source.png"
+    source.write_bytes(b"image")
+    incoming = tmp_path / "incoming.png"
+    incoming.write_bytes(b"other")
+    job = make_job()
+    job._existing = {5: [str(source)]}
+    assert not job._is_imported(scan(str(incoming)), 5)
+
+
+def test_unreadable_files_are_not_imported(tmp_path):
+    # An item whose source file is missing from the library
+    missing = tmp_path / "images" / "ITEM.info" / "missing.png"
+    # An incoming file that cannot be read (a directory fails on open)
+    incoming = tmp_path / "incoming.png"
+    incoming.mkdir()
+    job = make_job()
+    job._existing = {5: [str(missing)]}
+    assert not job._is_imported(scan(str(incoming)), 5)
+
+    readable = tmp_path / "readable.png"
+    readable.write_bytes(b"image")
+    assert not job._is_imported(scan(str(readable)), 5)
+
+
+def test_shared_job_store(tmp_path):
+    store = SharedJobStore(str(tmp_path / "responses.sqlite3"))
+    jobs = [make_job() for _ in range(3)]
+    for number, job in enumerate(jobs):
+        job.started_at = number
+        store.put(job)
+    jobs[2].scanned = 10
+    store.put(jobs[2])
+
+    # Another worker opens the same file
+    other = SharedJobStore(store.path)
+    assert other.get(jobs[2].id) == jobs[2].to_dict()
+    assert other.get("missing") is None
+
+    other.prune(2)
+    assert store.get(jobs[0].id) is None
+    assert store.get(jobs[1].id) is not None
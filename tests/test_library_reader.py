@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+from utils.library_reader import LibraryReader
+
+
+def write_item(library, item_id: str, mtime: int = 1, **metadata) -> str:
+    path = library / "images" / f"{item_id}.info" / "metadata.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"id": item_id, "ext": "jpg", **metadata}))
+    os.utime(path, ns=(mtime, mtime))
+    return str(path)
+
+
+def make_library(tmp_path) -> LibraryReader:
+    write_item(tmp_path, "A", name="Red poster", tags=["print"], folders=["F1"])
+    write_item(tmp_path, "B", name="Logo", tags=["brand", "print"], folders=["F2"])
+    write_item(tmp_path, "C", name="Photo", annotation="A poster on a wall")
+    write_item(tmp_path, "D", name="Shot", url="https://example.com/poster")
+    write_item(tmp_path, "E", name="Poster", isDeleted=True)
+    return LibraryReader(str(tmp_path), workers=2)
+
+
+def list_ids(reader: LibraryReader, **params) -> list[str]:
+    items = asyncio.run(reader.list_items({"orderBy": "NAME", **params}))
+    return [item["id"] for item in items]
+
+
+def test_unchanged_files_are_reused(tmp_path):
+    reader = make_library(tmp_path)
+    changed, removed = asyncio.run(reader.refresh())
+    assert sorted(item["id"] for item in changed) == ["A", "B", "C", "D", "E"]
+    assert removed == []
+
+    write_item(tmp_path, "A", mtime=2, name="Blue poster")
+    os.remove(reader.metadata_path("B"))
+    changed, removed = asyncio.run(reader.refresh())
+    assert [item["name"] for item in changed] == ["Blue poster"]
+    assert removed == ["B"]
+
+
+def test_corrupt_metadata_keeps_previous_entry(tmp_path):
+    reader = make_library(tmp_path)
+    asyncio.run(reader.refresh())
+
+    path = reader.metadata_path("A")
+    with open(path, "w") as f:
+        f.write('{"id": "A", "na')
+    os.utime(path, ns=(2, 2))
+    changed, removed = asyncio.run(reader.refresh())
+    assert changed == [] and removed == []
+    assert asyncio.run(reader.get_item("A"))["name"] == "Red poster"
+
+
+def test_filters(tmp_path):
+    reader = make_library(tmp_path)
+    assert list_ids(reader, keyword="POSTER") == ["C", "A", "D"]
+    assert list_ids(reader, keyword="print") == ["B", "A"]
+    assert list_ids(reader, tags="print,brand") == ["B"]
+    assert list_ids(reader, folders="F1, F2") == ["B", "A"]
+    assert list_ids(reader, ext="png") == []
+
+
+def test_offset_is_a_page_number(tmp_path):
+    reader = make_library(tmp_path)
+    assert list_ids(reader, limit=2) == ["B", "C"]
+    assert list_ids(reader, limit=2, offset=1) == ["A", "D"]
+    assert list_ids(reader, limit=2, offset=2) == []
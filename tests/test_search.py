@@ -0,0 +1,69 @@
+import random
+from utils.item_index import item_index
+from utils.search import SearchIndex
+
+WORDS = [
+    "poster",
+    "posters",
+    "post",
+    "postcard",
+    "logo",
+    "logotype",
+    "font",
+    "fonts",
+    "ui",
+    "uikit",
+    "icon",
+    "icons",
+    "photo",
+    "photography",
+    "banner",
+]
+
+
+def build_index(seed: int, count: int) -> SearchIndex:
+    rng = random.Random(seed)
+    item_index.clear()
+    index = SearchIndex()
+    item_index.upsert(
+        {
+            "id": f"ITEM{number:09d}",
+            "name": " ".join(rng.choices(WORDS, k=rng.randint(1, 6))),
+            "tags": rng.sample(WORDS, rng.randint(0, 3)),
+            "annotation": "",
+            "url": "",
+            "folders": [],
+            "ext": "jpg",
+            "lastModified": 0,
+        }
+        for number in range(count)
+    )
+    return index
+
+
+def test_top_k_matches_brute_force():
+    for seed in range(5):
+        index = build_index(seed, 3000)
+        rng = random.Random(seed)
+        for _ in range(20):
+            query = " ".join(
+                word[: rng.randint(2, len(word))]
+                for word in rng.sample(WORDS, rng.randint(1, 3))
+            )
+            for limit in (1, 5, 20):
+                results, total = index.search(query, limit)
+                everything, _ = index.search(query, total or 1)
+                expected = sorted(everything, key=lambda entry: (-entry[1], entry[0]))
+                assert [round(value, 9) for _, value in results] == [
+                    round(value, 9) for _, value in expected[:limit]
+                ], query
+
+
+def test_items_missing_from_item_index_are_not_counted():
+    index = build_index(0, 200)
+    results, total = index.search("poster", 200)
+    # An item the index has not been told about yet
+    del item_index.records[results[0][0]]
+    rest, rest_total = index.search("poster", 200)
+    assert rest_total == total - 1
+    assert rest == results[1:]
@@ -0,0 +1,53 @@
+from typing import Awaitable, Callable, Iterable, TypeVar
+import asyncio
+import os
+import time
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_CONCURRENCY = int(os.environ.get("EAGLE_API_BATCH_CONCURRENCY", "8"))
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly so that at most `rate` calls start per second.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                await asyncio.sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + self.interval
+
+
+async def map_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    limit: int = BATCH_CONCURRENCY,
+    rate: float | None = None,
+) -> list[R | BaseException]:
+    """
+    Run `func` over `items` with at most `limit` calls in flight and, if
+    `rate` is given, at most `rate` calls started per second.
+
+    Results keep the order of `items`. Exceptions are returned in place of
+    the result instead of cancelling the remaining calls.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    limiter = RateLimiter(rate) if rate else None
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            if limiter is not None:
+                await limiter.wait()
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
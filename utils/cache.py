@@ -0,0 +1,329 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from utils.fastjson import RawJSON, dumps
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, str]
+
+CACHE_BACKEND = os.environ.get("EAGLE_CACHE_BACKEND") or (
+    # NOTE: 複数ワーカーではキャッシュを共有しないと、各ワーカーが個別に温まる
+    "sqlite"
+    if int(os.environ.get("EAGLE_MCP_WORKERS", "1")) > 1
+    else "memory"
+)
+CACHE_PATH = os.environ.get(
+    "EAGLE_CACHE_PATH",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+        "eagle-mcp-server",
+        "responses.sqlite3",
+    ),
+)
+
+
+def make_cache_key(endpoint: str, params: dict | None = None) -> CacheKey:
+    return endpoint, json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+class MemoryCacheStore:
+    """
+    In-process store of cached values with per-entry TTL and LRU eviction.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+
+    def delete_endpoint(self, endpoint: str) -> None:
+        for key in [key for key in self._entries if key[0] == endpoint]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCacheStore:
+    """
+    Store of cached responses in a SQLite file, shared by every worker
+    process of the server (and kept across restarts until they expire).
+
+    Values are stored as JSON bytes and read back as `RawJSON`. The decoded
+    value of each entry is kept in memory along with the version of the row
+    it was read from, so a hit only reads the version and returns the same
+    object until another process replaces the entry.
+
+    The store is used from the event loop, so a locked database is never
+    waited on for more than `busy_timeout` seconds: a read that cannot get
+    the lock is a miss, a write is skipped, and a delete is retried before
+    the next read (which misses until then). Entries beyond `max_size`
+    (the ones expiring first) are deleted every `EVICT_INTERVAL` seconds
+    rather than on every write.
+    """
+
+    EVICT_INTERVAL = 5.0
+
+    def __init__(
+        self, path: str = CACHE_PATH, max_size: int = 1024, busy_timeout: float = 0.05
+    ):
+        self.path = path
+        self.max_size = max_size
+        self.busy_timeout = busy_timeout
+        self._connection: sqlite3.Connection | None = None
+        self._evicted_at = 0.0
+        # Deletes that failed on a locked database, retried before the next use
+        self._failed_deletes: list[tuple[str, tuple]] = []
+        # key -> (version, value) of the entries read or written by this process
+        self._decoded: OrderedDict[CacheKey, tuple[int, Any]] = OrderedDict()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, isolation_level=None, timeout=self.busy_timeout
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # NOTE: キャッシュなので、クラッシュ時に最新の書き込みが失われても構わない
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " endpoint TEXT NOT NULL,"
+                " params TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " version INTEGER NOT NULL,"
+                " value BLOB NOT NULL,"
+                " PRIMARY KEY (endpoint, params)"
+                ") WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor | None:
+        """
+        Run `sql`, or return None if the database is locked by another
+        process (or otherwise unusable), so the caller treats it as a miss.
+        """
+        try:
+            return self._connect().execute(sql, params)
+        except sqlite3.OperationalError as exc:
+            logger.debug(f"Response cache unavailable: {exc}")
+            return None
+
+    def __len__(self) -> int:
+        cursor = self._execute("SELECT COUNT(*) FROM responses")
+        return cursor.fetchone()[0] if cursor is not None else 0
+
+    def _remember(self, key: CacheKey, version: int, value: Any) -> None:
+        self._decoded[key] = (version, value)
+        self._decoded.move_to_end(key)
+        while len(self._decoded) > self.max_size:
+            self._decoded.popitem(last=False)
+
+    def _retry_deletes(self) -> bool:
+        while self._failed_deletes:
+            if self._execute(*self._failed_deletes[0]) is None:
+                return False
+            self._failed_deletes.pop(0)
+        return True
+
+    def _delete(self, sql: str, params: tuple) -> None:
+        if not self._retry_deletes() or self._execute(sql, params) is None:
+            self._failed_deletes.append((sql, params))
+
+    def get(self, key: CacheKey) -> Any | None:
+        # NOTE: 無効化が反映できていない間は、古い値を返さないようにすべて未ヒットとする
+        if not self._retry_deletes():
+            return None
+        cursor = self._execute(
+            "SELECT expires_at, version FROM responses"
+            " WHERE endpoint = ? AND params = ?",
+            key,
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None or row[0] < time.time():
+            self._decoded.pop(key, None)
+            return None
+        decoded = self._decoded.get(key)
+        if decoded is not None and decoded[0] == row[1]:
+            self._decoded.move_to_end(key)
+            return decoded[1]
+        cursor = self._execute(
+            "SELECT value FROM responses WHERE endpoint = ? AND params = ?", key
+        )
+        content = cursor.fetchone() if cursor is not None else None
+        if content is None:
+            return None
+        value = RawJSON(content[0])
+        self._remember(key, row[1], value)
+        return value
+
+    def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        if not self._retry_deletes():
+            return
+        content = value.content if isinstance(value, RawJSON) else dumps(value)
+        version = time.time_ns()
+        now = time.time()
+        cursor = self._execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (*key, now + ttl, version, content),
+        )
+        if cursor is None:
+            return
+        self._remember(key, version, value)
+        if time.monotonic() - self._evicted_at >= self.EVICT_INTERVAL:
+            self._evicted_at = time.monotonic()
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # NOTE: 期限切れのものから、期限の近い順に上限を超えた分を消す
+        self._execute(
+            "DELETE FROM responses WHERE (endpoint, params) IN ("
+            " SELECT endpoint, params FROM responses"
+            " ORDER BY expires_at < ? DESC, expires_at"
+            " LIMIT max(0, (SELECT COUNT(*) FROM responses) - ?))",
+            (now, self.max_size),
+        )
+
+    def delete(self, key: CacheKey) -> None:
+        self._delete("DELETE FROM responses WHERE endpoint = ? AND params = ?", key)
+        self._decoded.pop(key, None)
+
+    def delete_endpoint(self, endpoint: str) -> None:
+        self._delete("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+        for key in [key for key in self._decoded if key[0] == endpoint]:
+            del self._decoded[key]
+
+    def clear(self) -> None:
+        self._delete("DELETE FROM responses", ())
+        self._decoded.clear()
+
+
+def create_cache_store(max_size: int) -> MemoryCacheStore | SQLiteCacheStore:
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCacheStore(CACHE_PATH, max_size)
+    if CACHE_BACKEND != "memory":
+        raise ValueError(f"Unknown cache backend: {CACHE_BACKEND}")
+    return MemoryCacheStore(max_size)
+
+
+class ResponseCache:
+    """
+    Read-through cache with per-entry TTL, backed by a store that keeps the
+    values in memory or shares them between worker processes.
+
+    Concurrent misses for the same key share a single fetch. Invalidating an
+    endpoint while a fetch is in flight prevents that (possibly stale) result
+    from being stored.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        store: MemoryCacheStore | SQLiteCacheStore | None = None,
+    ):
+        self.max_size = max_size
+        self.store = store if store is not None else MemoryCacheStore(max_size)
+        self._inflight: dict[CacheKey, asyncio.Task] = {}
+        self._generations: dict[str, int] = {}
+        # Incremented by `clear`, which invalidates every endpoint
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get(self, key: CacheKey) -> Any | None:
+        if self.max_size <= 0:
+            return None
+        return self.store.get(key)
+
+    def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        if self.max_size <= 0:
+            return
+        self.store.set(key, value, ttl)
+
+    async def get_or_fetch(
+        self,
+        key: CacheKey,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        should_store: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        endpoint = key[0]
+        generation = (self._epoch, self._generations.get(endpoint, 0))
+
+        async def run() -> Any:
+            try:
+                result = await fetch()
+                if should_store(result) and generation == (
+                    self._epoch,
+                    self._generations.get(endpoint, 0),
+                ):
+                    self.set(key, result, ttl)
+                return result
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        # NOTE: 呼び出し元がキャンセルされても、合流した他の呼び出し元には結果を返す
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    def invalidate(self, endpoint: str, params: dict | None = None) -> None:
+        self._generations[endpoint] = self._generations.get(endpoint, 0) + 1
+        if params is not None:
+            key = make_cache_key(endpoint, params)
+            self.store.delete(key)
+            self._inflight.pop(key, None)
+            return
+        self.store.delete_endpoint(endpoint)
+        for key in [key for key in self._inflight if key[0] == endpoint]:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self.store.clear()
+        self._inflight.clear()
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+
+BINARY_CACHE_PATH = os.environ.get(
+    "EAGLE_BINARY_CACHE_PATH",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+        "eagle-mcp-server",
+        "binary",
+    ),
+)
+BINARY_CACHE_SIZE = int(os.environ.get("EAGLE_BINARY_CACHE_SIZE", str(256 * 1024**2)))
+
+
+class DiskCache:
+    """
+    Bounded LRU cache of binary files in a directory.
+
+    Entries are written to a temporary file chunk by chunk and renamed into
+    place, so readers never see partial files and nothing is held in memory.
+    Once the total size exceeds `max_bytes`, the least recently used files are
+    deleted. Worker processes can share the directory: files written or
+    deleted by another process are noticed on lookup.
+    """
+
+    def __init__(
+        self, path: str = BINARY_CACHE_PATH, max_bytes: int = BINARY_CACHE_SIZE
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        # file name -> size, least recently used first
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _load(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            os.makedirs(self.path, exist_ok=True)
+            files = []
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.startswith("."):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, entry.name, stat.st_size))
+            files.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in files)
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def _name(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str, max_age: float | None = None) -> str | None:
+        """
+        Return the path of the cached file of `key`, or None on a miss.
+        """
+        entries = self._load()
+        name = self._name(key)
+        path = os.path.join(self.path, name)
+        # NOTE: 他のワーカーが同じディレクトリに書き込んだ・削除したファイルも反映する
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._discard(name)
+            return None
+        if name not in entries:
+            entries[name] = stat.st_size
+            self._size += stat.st_size
+        if max_age is not None and time.time() - stat.st_mtime > max_age:
+            self._discard(name)
+            return None
+        entries.move_to_end(name)
+        return path
+
+    def _discard(self, name: str) -> None:
+        size = self._load().pop(name, None)
+        if size is None:
+            return
+        self._size -= size
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = self._load()
+        while self._size > self.max_bytes and len(entries) > 1:
+            self._discard(next(iter(entries)))
+
+    async def put(self, key: str, write: Callable[[str], Awaitable[None]]) -> str:
+        """
+        Create the entry of `key` with `write(path)`, which writes the file at
+        `path`, and return the path of the entry.
+        """
+        entries = self._load()
+        name = self._name(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.path, prefix=".")
+        os.close(fd)
+        try:
+            await write(temp_path)
+            size = os.path.getsize(temp_path)
+            path = os.path.join(self.path, name)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        self._size += size - entries.pop(name, 0)
+        entries[name] = size
+        self._evict()
+        return path
+
+    async def get_or_create(
+        self,
+        key: str,
+        write: Callable[[str], Awaitable[None]],
+        max_age: float | None = None,
+    ) -> str:
+        """
+        Return the path of `key`, creating it with `write(path)` on a miss.
+        Concurrent misses for the same key share a single `write`.
+        """
+        path = self.get(key, max_age)
+        if path is not None:
+            return path
+
+        name = self._name(key)
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self.put(key, write))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def get_or_fill(
+        self,
+        key: str,
+        fetch: Callable[[], AsyncIterator[bytes]],
+        max_age: float | None = None,
+    ) -> str:
+        """
+        Return the path of `key`, filling it from the chunks of `fetch()` on
+        a miss.
+        """
+
+        async def write(path: str) -> None:
+            async with aclosing(fetch()) as chunks:
+                with open(path, "wb") as f:
+                    async for chunk in chunks:
+                        await asyncio.to_thread(f.write, chunk)
+
+        return await self.get_or_create(key, write, max_age)
+
+    def invalidate(self, key: str) -> None:
+        self._discard(self._name(key))
+
+    def clear(self) -> None:
+        for name in list(self._load()):
+            self._discard(name)
+
+
+binary_cache = DiskCache()
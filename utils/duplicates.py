@@ -0,0 +1,236 @@
+from typing import Iterable
+import asyncio
+import logging
+import os
+import time
+from utils.batch import map_bounded
+from utils.item_index import ItemRecord, item_index
+from utils.preview import PREVIEW_WORKERS, get_executor, image_candidates, image_ops
+from utils.snapshot import MetadataSnapshot, snapshot_sync
+
+logger = logging.getLogger(__name__)
+
+HASH_BATCH_SIZE = int(os.environ.get("EAGLE_HASH_BATCH_SIZE", "64"))
+
+
+class BKTree:
+    """
+    BK-tree of 64-bit hashes under the Hamming distance. A search only
+    visits the subtrees whose distance to the node is within range of the
+    query, instead of comparing against every hash.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        # node: (hash, {distance to the node: child node})
+        self._root: tuple[int, dict] | None = None
+        for value in values:
+            self.add(value)
+
+    def add(self, value: int) -> None:
+        if self._root is None:
+            self._root = (value, {})
+            return
+        node = self._root
+        while True:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (value, {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """
+        Return `(hash, distance)` of every hash within `max_distance` of `value`.
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = (node[0] ^ value).bit_count()
+            if distance <= max_distance:
+                results.append((node[0], distance))
+            for child_distance, child in node[1].items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return results
+
+
+def record_version(record: ItemRecord) -> int:
+    return record.lastModified or record.modificationTime
+
+
+def group_hashes(hashes: dict[str, int], max_distance: int) -> list[list[str]]:
+    """
+    Group item IDs whose hashes are within `max_distance` of each other
+    (transitively). Only groups of two or more items are returned.
+    """
+    by_hash: dict[int, list[str]] = {}
+    for item_id, value in hashes.items():
+        by_hash.setdefault(value, []).append(item_id)
+
+    parents = {value: value for value in by_hash}
+
+    def find(value: int) -> int:
+        while parents[value] != value:
+            parents[value] = parents[parents[value]]
+            value = parents[value]
+        return value
+
+    if max_distance > 0:
+        tree = BKTree(by_hash)
+        for value in by_hash:
+            for neighbor, _ in tree.search(value, max_distance):
+                root, other = find(value), find(neighbor)
+                if root != other:
+                    parents[other] = root
+
+    groups: dict[int, list[str]] = {}
+    for value, item_ids in by_hash.items():
+        groups.setdefault(find(value), []).extend(item_ids)
+    return [item_ids for item_ids in groups.values() if len(item_ids) > 1]
+
+
+class PerceptualHashIndex:
+    """
+    dHash of each item, computed from its thumbnail (or original) in the
+    preview process pool. Hashes are kept per item version, so only new and
+    changed items are hashed again, and are persisted in the snapshot.
+    """
+
+    def __init__(self, snapshot: MetadataSnapshot | None):
+        self.snapshot = snapshot
+        self.library: str | None = None
+        # item ID -> (version, hash or None if the image could not be read)
+        self.hashes: dict[str, tuple[int, int | None]] = {}
+        self._task: asyncio.Task | None = None
+        # NOTE: 削除されたアイテムのハッシュは次の保存時にスナップショットから消す
+        self._removed: list[str] = []
+        item_index.add_listener(self._on_items_changed)
+
+    def _on_items_changed(self, upserted: list[dict], removed: list[str]) -> None:
+        for item_id in removed:
+            if self.hashes.pop(item_id, None) is not None:
+                self._removed.append(item_id)
+
+    async def _load(self, library_path: str) -> None:
+        if self.library == library_path:
+            return
+        self.hashes = {}
+        self._removed = []
+        if self.snapshot is not None:
+            stored = await asyncio.to_thread(self.snapshot.load_hashes, library_path)
+            self.hashes = {
+                item_id: entry
+                for item_id, entry in stored.items()
+                if item_id in item_index.records
+            }
+        self.library = library_path
+
+    def stale(self, records: Iterable[ItemRecord]) -> list[ItemRecord]:
+        return [
+            record
+            for record in records
+            if self.hashes.get(record.id, (None,))[0] != record_version(record)
+        ]
+
+    async def _hash_batch(self, library_path: str, batch: list[ItemRecord]) -> None:
+        candidates = [
+            image_candidates(library_path, {"id": r.id, "name": r.name, "ext": r.ext})
+            for r in batch
+        ]
+        values = await asyncio.get_running_loop().run_in_executor(
+            get_executor(), image_ops.dhash_many, candidates
+        )
+        entries = [
+            (record.id, record_version(record), value)
+            for record, value in zip(batch, values)
+        ]
+        # NOTE: 計算中にライブラリが切り替わった場合は結果を捨てる
+        if self.library != library_path:
+            return
+        for item_id, version, value in entries:
+            self.hashes[item_id] = (version, value)
+        if self.snapshot is not None:
+            removed, self._removed = self._removed, []
+            await asyncio.to_thread(
+                self.snapshot.save_hashes, library_path, entries, removed
+            )
+
+    async def _hash(self, library_path: str, records: list[ItemRecord]) -> None:
+        started = time.monotonic()
+        batches = [
+            records[index : index + HASH_BATCH_SIZE]
+            for index in range(0, len(records), HASH_BATCH_SIZE)
+        ]
+        results = await map_bounded(
+            lambda batch: self._hash_batch(library_path, batch),
+            batches,
+            PREVIEW_WORKERS,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        logger.info(f"Hashed {len(records)} items in {time.monotonic() - started:.1f}s")
+
+    async def ensure(
+        self, library_path: str, records: list[ItemRecord], wait: float
+    ) -> bool:
+        """
+        Hash the stale items of `records` in the background and wait up to
+        `wait` seconds. Returns whether every item of `records` is hashed.
+        """
+        await self._load(library_path)
+        deadline = time.monotonic() + wait
+        while True:
+            stale = self.stale(records)
+            if not stale:
+                return True
+            # NOTE: 実行中のハッシュ計算があれば、その完了を待ってから残りを計算する
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._hash(library_path, stale))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), remaining)
+            except TimeoutError:
+                return False
+
+    def find_groups(
+        self, records: list[ItemRecord], max_distance: int
+    ) -> list[list[tuple[ItemRecord, int]]]:
+        """
+        Groups of near-duplicate items among `records`, largest group first.
+        Items are ordered by resolution and file size (the likely original
+        first), each with its distance to the first item.
+        """
+        by_id = {record.id: record for record in records}
+        hashes = {}
+        for record in records:
+            entry = self.hashes.get(record.id)
+            if entry is not None and entry[1] is not None:
+                hashes[record.id] = entry[1]
+
+        groups = []
+        for item_ids in group_hashes(hashes, max_distance):
+            members = sorted(
+                (by_id[item_id] for item_id in item_ids),
+                key=lambda r: (-r.width * r.height, -r.size, r.id),
+            )
+            first = hashes[members[0].id]
+            groups.append(
+                [
+                    (record, (hashes[record.id] ^ first).bit_count())
+                    for record in members
+                ]
+            )
+        groups.sort(key=lambda group: (-len(group), group[0][0].id))
+        return groups
+
+
+phash_index = PerceptualHashIndex(
+    snapshot_sync.snapshot if snapshot_sync is not None else None
+)
@@ -1,12 +1,160 @@
-from typing import Literal, Union
+from typing import AsyncIterator, Literal, Union
+import asyncio
 import httpx
 import os
 import logging
-import json
+import time
+from utils import fastjson
+from utils.cache import ResponseCache, create_cache_store, make_cache_key
+from utils.fastjson import RawJSON
+from utils.metrics import (
+    CACHE_ENTRIES,
+    CACHE_EVENTS,
+    CIRCUIT_STATE,
+    UPSTREAM_ERRORS,
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_LATENCY,
+    UPSTREAM_QUEUED,
+    UPSTREAM_REQUEST_BYTES,
+    UPSTREAM_RESPONSE_BYTES,
+    UPSTREAM_RETRIES,
+    registry,
+)
+from utils.resilience import CircuitBreaker, backoff_delay
+from utils.scheduler import PRIORITIES, Priority, upstream_scheduler
 
 logger = logging.getLogger(__name__)
 
 EAGLE_API_BASE_URL = os.environ.get("EAGLE_API_BASE_URL", "http://localhost:41595")
+EAGLE_API_TIMEOUT = float(os.environ.get("EAGLE_API_TIMEOUT", "30"))
+EAGLE_API_CONNECT_TIMEOUT = float(os.environ.get("EAGLE_API_CONNECT_TIMEOUT", "5"))
+EAGLE_API_MAX_CONNECTIONS = int(os.environ.get("EAGLE_API_MAX_CONNECTIONS", "20"))
+EAGLE_API_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("EAGLE_API_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+EAGLE_API_KEEPALIVE_EXPIRY = float(os.environ.get("EAGLE_API_KEEPALIVE_EXPIRY", "30"))
+EAGLE_API_CACHE_SIZE = int(os.environ.get("EAGLE_API_CACHE_SIZE", "1024"))
+EAGLE_API_DEADLINE = float(os.environ.get("EAGLE_API_DEADLINE", "30"))
+EAGLE_API_RETRIES = int(os.environ.get("EAGLE_API_RETRIES", "2"))
+EAGLE_API_RETRY_BACKOFF = float(os.environ.get("EAGLE_API_RETRY_BACKOFF", "0.1"))
+EAGLE_API_RETRY_BACKOFF_MAX = float(os.environ.get("EAGLE_API_RETRY_BACKOFF_MAX", "2"))
+EAGLE_API_BREAKER_THRESHOLD = int(os.environ.get("EAGLE_API_BREAKER_THRESHOLD", "5"))
+EAGLE_API_BREAKER_RESET = float(os.environ.get("EAGLE_API_BREAKER_RESET", "10"))
+
+# Statuses of a GET that are worth retrying (Eagle busy or restarting)
+RETRY_STATUSES = frozenset({502, 503, 504})
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+# Seconds a successful GET response is served from the cache, per endpoint.
+# Endpoints that are not listed here are never cached.
+CACHE_TTLS: dict[str, float] = {
+    "/api/application/info": 300,
+    "/api/library/info": 60,
+    "/api/folder/list": 60,
+    "/api/item/info": 10,
+    "/api/item/thumbnail": 60,
+}
+# TTLs replacing those of `CACHE_TTLS` while the library watcher invalidates
+# the endpoint on change (see `utils/watcher.py`)
+cache_ttl_overrides: dict[str, float] = {}
+
+_client: httpx.AsyncClient | None = None
+response_cache = ResponseCache(
+    EAGLE_API_CACHE_SIZE, create_cache_store(EAGLE_API_CACHE_SIZE)
+)
+circuit_breaker = CircuitBreaker(EAGLE_API_BREAKER_THRESHOLD, EAGLE_API_BREAKER_RESET)
+
+
+class EagleUnavailableError(httpx.RequestError):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+
+
+def unavailable_message() -> str:
+    return (
+        "Eagle is not responding; requests are paused for "
+        f"{circuit_breaker.retry_in():.1f}s"
+    )
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=EAGLE_API_BASE_URL,
+        timeout=httpx.Timeout(EAGLE_API_TIMEOUT, connect=EAGLE_API_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=EAGLE_API_MAX_CONNECTIONS,
+            max_keepalive_connections=EAGLE_API_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=EAGLE_API_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def open_client() -> httpx.AsyncClient:
+    """
+    Create the shared keep-alive client. Called from the FastAPI lifespan.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # NOTE: lifespan外（スクリプトやテスト）から呼ばれた場合は遅延生成する
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    method: Literal["GET", "POST"],
+    endpoint: str,
+    params: dict | None,
+    payload: dict | None,
+    priority: Priority | None,
+    dispatched: list[int],
+) -> httpx.Response:
+    """
+    Send a request, retrying with jittered backoff. GETs are idempotent and
+    are retried on connection errors, timeouts and 502/503/504. POSTs are only
+    retried when the connection could not be established (nothing was sent).
+
+    Each attempt waits for a slot of the upstream scheduler; the slot is
+    released during the backoff. `dispatched` records the attempts sent.
+    """
+    attempts = EAGLE_API_RETRIES + 1
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            async with upstream_scheduler.slot(priority):
+                dispatched.append(attempt)
+                if method == "GET":
+                    response = await client.get(endpoint, params=params)
+                else:
+                    response = await client.post(endpoint, json=payload)
+        except httpx.ConnectError:
+            if last:
+                raise
+        except httpx.RequestError:
+            if last or method != "GET":
+                raise
+        else:
+            if last or method != "GET" or response.status_code not in RETRY_STATUSES:
+                return response
+        UPSTREAM_RETRIES.inc(endpoint)
+        await asyncio.sleep(
+            backoff_delay(attempt, EAGLE_API_RETRY_BACKOFF, EAGLE_API_RETRY_BACKOFF_MAX)
+        )
 
 
 async def request_to_eagle_api(
@@ -15,31 +163,72 @@ async def request_to_eagle_api(
     params: dict = None,
     payload: dict = None,
     is_binary: bool = False,
-) -> Union[dict, tuple[bytes, str]]:
-    url = f"{EAGLE_API_BASE_URL}{endpoint}"
+    raw: bool = False,
+    priority: Priority | None = None,
+) -> Union[dict, RawJSON, tuple[bytes, str]]:
+    """
+    Send a request to Eagle. With `raw`, a successful JSON body is returned
+    unparsed as `RawJSON`. `priority` overrides the scheduling class of the
+    current context.
+    """
+    if method not in ("GET", "POST"):
+        return {
+            "status": "error",
+            "message": f"Unsupported HTTP method: {method}",
+        }
+    if not circuit_breaker.allow():
+        UPSTREAM_ERRORS.inc(endpoint, "circuit_open")
+        return {"status": "error", "message": unavailable_message()}
+
+    client = get_client()
+    UPSTREAM_IN_FLIGHT.inc(endpoint)
+    started = time.perf_counter()
+    dispatched: list[int] = []
     try:
-        async with httpx.AsyncClient() as client:
-            if method == "GET":
-                response = await client.get(url, params=params)
-            elif method == "POST":
-                response = await client.post(url, json=payload)
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Unsupported HTTP method: {method}",
-                }
+        async with asyncio.timeout(EAGLE_API_DEADLINE):
+            response = await _send(
+                client, method, endpoint, params, payload, priority, dispatched
+            )
+        if response.status_code >= 500:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
 
-            response.raise_for_status()
+        UPSTREAM_REQUEST_BYTES.inc(endpoint, value=len(response.request.content))
+        UPSTREAM_RESPONSE_BYTES.inc(endpoint, value=len(response.content))
+        response.raise_for_status()
 
-            if is_binary:
-                content_type = response.headers.get("Content-Type", "image/png")
-                return response.content, content_type
+        if is_binary:
+            content_type = response.headers.get("Content-Type", "image/png")
+            return response.content, content_type
 
-            return response.json()
+        if raw:
+            body = RawJSON(response.content)
+            # NOTE: エラーレスポンスは通常どおりdictとして返す
+            return body if body.is_success() else body.data
+        return fastjson.loads(response.content)
+    except TimeoutError:
+        if not dispatched:
+            # NOTE: 送信前にキューで期限切れになった場合はEagleの障害として数えない
+            UPSTREAM_ERRORS.inc(endpoint, "queue_timeout")
+            return {
+                "status": "error",
+                "message": "Too many requests to Eagle are queued; try again later",
+            }
+        circuit_breaker.record_failure()
+        UPSTREAM_ERRORS.inc(endpoint, "deadline_exceeded")
+        logger.error(f"Request to {endpoint} exceeded {EAGLE_API_DEADLINE}s")
+        return {
+            "status": "error",
+            "message": f"Eagle did not respond within {EAGLE_API_DEADLINE:g}s",
+        }
     except httpx.RequestError as exc:
+        circuit_breaker.record_failure()
+        UPSTREAM_ERRORS.inc(endpoint, "request_error")
         logger.error(f"Request error occurred: {exc}")
         return {"status": "error", "message": f"An error occurred: {exc}"}
     except httpx.HTTPStatusError as exc:
+        UPSTREAM_ERRORS.inc(endpoint, "http_status_error")
         logger.error(
             f"HTTP error occurred: {exc.response.status_code}, "
             f"URL: {exc.request.url}, Response: {exc.response.text}"
@@ -48,7 +237,8 @@ async def request_to_eagle_api(
             "status": "error",
             "message": f"HTTP error occurred: {exc.response.status_code}",
         }
-    except json.JSONDecodeError as exc:
+    except fastjson.JSONDecodeError as exc:
+        UPSTREAM_ERRORS.inc(endpoint, "json_decode_error")
         logger.error(f"JSON decode error occurred: {exc}, Response: {response.text}")
         response_text = response.text
         if len(response_text) > 100:
@@ -58,19 +248,136 @@ async def request_to_eagle_api(
             "message": f"Invalid JSON response: {response_text}",
         }
     except Exception as exc:
+        UPSTREAM_ERRORS.inc(endpoint, "unexpected_error")
         logger.error(f"Unexpected error occurred: {exc}")
         return {
             "status": "error",
             "message": "An unexpected error occurred",
         }
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(endpoint)
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, method, endpoint)
 
 
-async def eagle_api_get(endpoint: str, params: dict = None, is_binary: bool = False):
-    return await request_to_eagle_api(
-        "GET", endpoint, params=params, is_binary=is_binary
+async def stream_from_eagle_api(
+    endpoint: str, params: dict = None
+) -> AsyncIterator[bytes]:
+    """
+    GET a binary `endpoint` chunk by chunk instead of reading it into memory.
+    Raises `httpx.HTTPError` when the request fails.
+    """
+    if not circuit_breaker.allow():
+        UPSTREAM_ERRORS.inc(endpoint, "circuit_open")
+        raise EagleUnavailableError(unavailable_message())
+
+    client = get_client()
+    UPSTREAM_IN_FLIGHT.inc(endpoint)
+    started = time.perf_counter()
+    try:
+        async with (
+            upstream_scheduler.slot(),
+            client.stream("GET", endpoint, params=params) as response,
+        ):
+            if response.status_code >= 500:
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                UPSTREAM_RESPONSE_BYTES.inc(endpoint, value=len(chunk))
+                yield chunk
+    except httpx.RequestError:
+        circuit_breaker.record_failure()
+        UPSTREAM_ERRORS.inc(endpoint, "request_error")
+        raise
+    except httpx.HTTPStatusError:
+        UPSTREAM_ERRORS.inc(endpoint, "http_status_error")
+        raise
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(endpoint)
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, "GET", endpoint)
+
+
+def collect_upstream_metrics() -> None:
+    CACHE_EVENTS.set("hit", value=response_cache.hits)
+    CACHE_EVENTS.set("miss", value=response_cache.misses)
+    CACHE_EVENTS.set("coalesced", value=response_cache.coalesced)
+    CACHE_ENTRIES.set(value=len(response_cache))
+    CIRCUIT_STATE.set(value=CIRCUIT_STATES[circuit_breaker.state])
+    for priority in PRIORITIES:
+        UPSTREAM_QUEUED.set(priority, value=upstream_scheduler.waiting(priority))
+
+
+registry.add_collector(collect_upstream_metrics)
+
+
+def is_success(result) -> bool:
+    return isinstance(result, dict) and result.get("status") == "success"
+
+
+def cache_ttl(endpoint: str) -> float | None:
+    # NOTE: 上書きの0はそのエンドポイントのキャッシュを無効にする
+    if endpoint in cache_ttl_overrides:
+        return cache_ttl_overrides[endpoint]
+    return CACHE_TTLS.get(endpoint)
+
+
+def invalidate_cache(endpoint: str, params: dict = None) -> None:
+    """
+    Drop cached responses of `endpoint`; all of them unless `params` is given.
+    """
+    response_cache.invalidate(endpoint, params)
+
+
+def _is_raw_success(result) -> bool:
+    return isinstance(result, RawJSON) and result.is_success()
+
+
+async def eagle_api_get_raw(endpoint: str, params: dict = None):
+    """
+    GET `endpoint` without decoding the body. Returns `RawJSON`, or a dict
+    for errors and for responses that were cached already decoded.
+
+    Cached endpoints keep the raw body, so pass-through routes forward the
+    same bytes without encoding them again.
+    """
+    ttl = cache_ttl(endpoint)
+    if not ttl:
+        return await request_to_eagle_api("GET", endpoint, params=params, raw=True)
+
+    return await response_cache.get_or_fetch(
+        make_cache_key(endpoint, params),
+        ttl,
+        lambda: request_to_eagle_api("GET", endpoint, params=params, raw=True),
+        should_store=_is_raw_success,
     )
 
 
+def get_cached(endpoint: str, params: dict = None):
+    """
+    Return the cached response of `endpoint` (decoded), or None on a miss.
+    Never calls Eagle.
+    """
+    value = response_cache.get(make_cache_key(endpoint, params))
+    if value is None:
+        return None
+    response_cache.hits += 1
+    return value.data if isinstance(value, RawJSON) else value
+
+
+async def eagle_api_get(endpoint: str, params: dict = None, is_binary: bool = False):
+    if is_binary:
+        return await request_to_eagle_api(
+            "GET", endpoint, params=params, is_binary=is_binary
+        )
+    if not cache_ttl(endpoint):
+        return await request_to_eagle_api("GET", endpoint, params=params)
+
+    result = await eagle_api_get_raw(endpoint, params)
+    # NOTE: RawJSONはパース結果を保持するため、キャッシュヒット時に再パースしない
+    return result.data if isinstance(result, RawJSON) else result
+
+
 async def eagle_api_post(endpoint: str, payload: dict, is_binary: bool = False):
     return await request_to_eagle_api(
         "POST", endpoint, payload=payload, is_binary=is_binary
@@ -0,0 +1,61 @@
+from typing import Any
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(content: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class RawJSON:
+    """
+    An upstream JSON body kept as bytes. It is only parsed when the data is
+    needed, so pass-through routes can forward it unchanged.
+    """
+
+    __slots__ = ("content", "_data")
+
+    _MISSING = object()
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self._data = self._MISSING
+
+    @property
+    def data(self) -> Any:
+        if self._data is self._MISSING:
+            self._data = loads(self.content)
+        return self._data
+
+    def is_success(self) -> bool:
+        # NOTE: Eagleのレスポンスは `{"status":"success",...}` で始まるため、全体をパースせずに判定する
+        head = self.content[:64].replace(b" ", b"")
+        if head.startswith(b'{"status":"success"'):
+            return True
+        data = self.data
+        return isinstance(data, dict) and data.get("status") == "success"
+
+
+def json_response(value: Any) -> Response:
+    """
+    Respond with `value` without running `jsonable_encoder` over it. Raw
+    upstream bodies are forwarded as they are.
+    """
+    if isinstance(value, RawJSON):
+        return Response(value.content, media_type="application/json")
+    return Response(dumps(value), media_type="application/json")
@@ -0,0 +1,58 @@
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+import os
+
+# Leading bytes of the image formats Eagle produces for thumbnails and icons
+MAGIC_NUMBERS = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"RIFF", "image/webp"),
+)
+
+FILE_CACHE_CONTROL = "private, max-age=60"
+
+
+def sniff_media_type(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            head = f.read(12)
+    except OSError:
+        return "application/octet-stream"
+    for magic, media_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return media_type
+    return "application/octet-stream"
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def file_etag(path: str, *parts) -> str:
+    """
+    ETag of `path` that changes with `parts` (e.g. the item ID), the mtime
+    and the size of the file.
+    """
+    stat = os.stat(path)
+    return make_etag(*parts, f"{stat.st_mtime_ns:x}", f"{stat.st_size:x}")
+
+
+def file_response(
+    request: Request, path: str, etag: str, media_type: str | None = None
+) -> Response:
+    """
+    Serve `path` from disk in chunks. Answers `If-None-Match` with 304 and
+    `Range` with 206 (handled by `FileResponse`).
+    """
+    headers = {"ETag": etag, "Cache-Control": FILE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path, media_type=media_type or sniff_media_type(path), headers=headers
+    )
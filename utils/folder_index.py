@@ -0,0 +1,136 @@
+from typing import Iterable, Iterator
+from utils.eagle_api import eagle_api_get, is_success
+
+PATH_SEPARATOR = "/"
+
+
+def iter_folders(folders: list[dict]) -> Iterator[dict]:
+    for folder in folders:
+        yield folder
+        yield from iter_folders(folder.get("children") or [])
+
+
+def normalize_path(path: str) -> str:
+    parts = (part.strip() for part in path.split(PATH_SEPARATOR))
+    return PATH_SEPARATOR.join(part for part in parts if part).casefold()
+
+
+class FolderNode:
+    __slots__ = ("id", "name", "parent", "path", "depth", "children")
+
+    def __init__(self, id: str, name: str, parent: str | None, path: str, depth: int):
+        self.id = id
+        self.name = name
+        self.parent = parent
+        self.path = path
+        self.depth = depth
+        self.children: list[str] = []
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "path": self.path,
+            "parent": self.parent,
+            "depth": self.depth,
+            "childCount": len(self.children),
+        }
+
+
+class FolderTree:
+    """
+    Flattened view of a folder tree from `/api/folder/list`: nodes by ID,
+    IDs by path (`Parent/Child`) and by name, and the set of descendants of
+    every folder, so lookups and subtree expansions are dictionary reads.
+    """
+
+    def __init__(self, folders: list[dict]):
+        self.nodes: dict[str, FolderNode] = {}
+        self.by_path: dict[str, str] = {}
+        self.by_name: dict[str, list[str]] = {}
+        # folder ID -> the folder and all of its descendants
+        self.descendants: dict[str, frozenset[str]] = {}
+
+        order: list[FolderNode] = []
+        stack = [(folder, None) for folder in reversed(folders)]
+        while stack:
+            folder, parent = stack.pop()
+            name = folder.get("name", "")
+            path = f"{parent.path}{PATH_SEPARATOR}{name}" if parent else name
+            node = FolderNode(
+                folder["id"],
+                name,
+                parent.id if parent else None,
+                path,
+                parent.depth + 1 if parent else 0,
+            )
+            self.nodes[node.id] = node
+            # NOTE: 同じパスのフォルダが複数ある場合は最初のものを使う
+            self.by_path.setdefault(normalize_path(path), node.id)
+            self.by_name.setdefault(name.strip().casefold(), []).append(node.id)
+            if parent:
+                parent.children.append(node.id)
+            order.append(node)
+            for child in reversed(folder.get("children") or []):
+                stack.append((child, node))
+
+        # NOTE: 子から親の順に集約する
+        for node in reversed(order):
+            self.descendants[node.id] = frozenset(
+                {node.id}.union(*(self.descendants[child] for child in node.children))
+            )
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def resolve(self, path: str) -> list[FolderNode]:
+        """
+        Folders matching `path`: the folder at a full path such as
+        `Design/Logos`, or every folder with that name for a bare name.
+        Case-insensitive.
+        """
+        key = normalize_path(path)
+        folder_id = self.by_path.get(key)
+        if folder_id is not None:
+            return [self.nodes[folder_id]]
+        if PATH_SEPARATOR in key:
+            return []
+        return [self.nodes[folder_id] for folder_id in self.by_name.get(key, ())]
+
+    def expand(self, folder_ids: Iterable[str]) -> set[str]:
+        """
+        The given folders and all of their descendants. Unknown IDs are kept.
+        """
+        expanded: set[str] = set()
+        for folder_id in folder_ids:
+            expanded |= self.descendants.get(folder_id, {folder_id})
+        return expanded
+
+
+class FolderIndex:
+    """
+    Keeps a `FolderTree` of the folder list of the current library. The
+    folder list comes from the response cache, and the tree is only rebuilt
+    when a different list is returned (after the TTL, or after a folder
+    route invalidated it).
+    """
+
+    def __init__(self):
+        self._source: list | None = None
+        self._tree: FolderTree | None = None
+
+    async def get(self) -> FolderTree | None:
+        result = await eagle_api_get("/api/folder/list")
+        if not is_success(result) or not isinstance(result.get("data"), list):
+            return None
+        if result["data"] is not self._source:
+            self._tree = FolderTree(result["data"])
+            self._source = result["data"]
+        return self._tree
+
+    def invalidate(self) -> None:
+        self._source = None
+        self._tree = None
+
+
+folder_index = FolderIndex()
@@ -0,0 +1,140 @@
+"""
+Image operations that run in worker processes. Only depends on Pillow so the
+workers stay light to start.
+"""
+
+import math
+
+from PIL import Image, ImageDraw, ImageOps
+
+SAVE_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def _open(candidates: list[str], min_size: int) -> Image.Image:
+    """
+    Open the first candidate that is at least `min_size` on its longer side
+    (e.g. the thumbnail before the original), or the largest one that opens.
+    """
+    fallback = None
+    for path in candidates:
+        try:
+            image = Image.open(path)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            continue
+        if max(image.size) >= min_size:
+            if fallback is not None:
+                fallback.close()
+            return image
+        if fallback is None or max(image.size) > max(fallback.size):
+            if fallback is not None:
+                fallback.close()
+            fallback = image
+        else:
+            image.close()
+    if fallback is None:
+        raise ValueError("No readable image")
+    return fallback
+
+
+def _downscale(image: Image.Image, max_size: int) -> Image.Image:
+    # NOTE: JPEGはデコード時に縮小できるため、先にdraftを指定する
+    image.draft("RGB", (max_size, max_size))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return image
+
+
+def _save(image: Image.Image, dest: str, format: str, quality: int) -> None:
+    image.save(dest, SAVE_FORMATS[format], quality=quality)
+
+
+def render_preview(
+    candidates: list[str], dest: str, max_size: int, format: str, quality: int
+) -> tuple[int, int]:
+    """
+    Write a preview of at most `max_size` pixels per side to `dest`.
+    """
+    with _open(candidates, max_size) as image:
+        preview = _downscale(image, max_size)
+    _save(preview, dest, format, quality)
+    return preview.size
+
+
+def render_contact_sheet(
+    tiles: list[tuple[list[str], str]],
+    dest: str,
+    tile_size: int,
+    columns: int,
+    format: str,
+    quality: int,
+) -> None:
+    """
+    Tile the images of `tiles` (candidates and label) into a grid of
+    `columns` columns. Images that cannot be decoded leave an empty tile.
+    """
+    label_height = 16
+    rows = max(1, math.ceil(len(tiles) / columns))
+    cell = (tile_size, tile_size + label_height)
+    sheet = Image.new("RGB", (cell[0] * columns, cell[1] * rows), (32, 32, 32))
+    draw = ImageDraw.Draw(sheet)
+
+    for index, (candidates, label) in enumerate(tiles):
+        left = (index % columns) * cell[0]
+        top = (index // columns) * cell[1]
+        try:
+            with _open(candidates, tile_size) as image:
+                tile = _downscale(image, tile_size)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            pass
+        else:
+            sheet.paste(
+                tile,
+                (
+                    left + (tile_size - tile.width) // 2,
+                    top + (tile_size - tile.height) // 2,
+                ),
+            )
+        draw.text(
+            (left + 4, top + tile_size + 2),
+            label[: max(1, tile_size // 7)],
+            fill=(220, 220, 220),
+        )
+
+    _save(sheet, dest, format, quality)
+
+
+def dhash(candidates: list[str], hash_size: int = 8) -> int | None:
+    """
+    Difference hash of the image: one bit per pair of horizontally adjacent
+    pixels of a `hash_size + 1` by `hash_size` grayscale version. Returns
+    None if no candidate can be decoded.
+    """
+    try:
+        with _open(candidates, hash_size + 1) as image:
+            image.draft("L", (hash_size * 4, hash_size * 4))
+            gray = image.convert("L").resize(
+                (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+            )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    pixels = gray.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            left = pixels[offset + column]
+            right = pixels[offset + column + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def dhash_many(candidates: list[list[str]]) -> list[int | None]:
+    return [dhash(paths) for paths in candidates]
@@ -0,0 +1,328 @@
+from collections import OrderedDict, defaultdict
+from fnmatch import fnmatch
+from itertools import islice
+from typing import Iterator, Literal
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from utils.batch import map_bounded
+from utils.cache import CACHE_BACKEND, CACHE_PATH
+from utils.eagle_api import eagle_api_post, is_success
+from utils.fastjson import dumps, loads
+from utils.item_index import item_index
+from utils.library import get_library_path
+from utils.scheduler import upstream_priority
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.environ.get("EAGLE_IMPORT_BATCH_SIZE", "100"))
+IMPORT_BATCH_BYTES = int(os.environ.get("EAGLE_IMPORT_BATCH_BYTES", "262144"))
+IMPORT_CONCURRENCY = int(os.environ.get("EAGLE_IMPORT_CONCURRENCY", "2"))
+IMPORT_MAX_JOBS = 20
+WALK_CHUNK_SIZE = 1000
+# Digests of existing items kept while checking for already imported files
+DIGEST_CACHE_SIZE = 10000
+
+
+def walk_files(root: str, pattern: str = "*", recursive: bool = True) -> Iterator:
+    """
+    Yield the `os.DirEntry` of every file under `root` whose name matches
+    `pattern`. Hidden files and directories are skipped.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file() and fnmatch(entry.name, pattern):
+                        yield entry
+        except OSError as exc:
+            logger.error(f"Failed to scan directory: {exc}")
+
+
+def file_digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+class ImportJob:
+    def __init__(
+        self,
+        root: str,
+        pattern: str,
+        recursive: bool,
+        folder_id: str | None,
+        tags: list[str] | None,
+        skip_existing: bool,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.root = root
+        self.pattern = pattern
+        self.recursive = recursive
+        self.folder_id = folder_id
+        self.tags = tags
+        self.skip_existing = skip_existing
+        self.status: Literal["running", "completed", "failed"] = "running"
+        self.scanned = 0
+        self.skipped = 0
+        self.submitted = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.errors: list[str] = []
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        # size -> source paths of existing items
+        self._existing: dict[int, list[str]] = {}
+        # source path -> digest, least recently added first
+        self._existing_digests: dict[str, str | None] = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "path": self.root,
+            "scanned": self.scanned,
+            "skipped": self.skipped,
+            "submitted": self.submitted,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "failedBatches": self.failed_batches,
+            "errors": self.errors[-10:],
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+    async def _load_existing(self) -> None:
+        await item_index.ensure_ready()
+        library_path = await get_library_path()
+        existing: defaultdict[int, list[str]] = defaultdict(list)
+        for record in item_index.records.values():
+            source = (
+                os.path.join(
+                    library_path,
+                    "images",
+                    f"{record.id}.info",
+                    f"{record.name}.{record.ext}",
+                )
+                if library_path
+                else None
+            )
+            existing[record.size].append(source)
+        self._existing = existing
+
+    def _is_imported(self, entry: os.DirEntry, size: int) -> bool:
+        """
+        A file is considered imported if an item has the same size and the
+        same content. Runs in a worker thread.
+        """
+        sources = self._existing.get(size)
+        if not sources:
+            return False
+        digest = file_digest(entry.path)
+        # NOTE: 読めないファイルは内容を比べられないため、取り込み済みとはみなさない
+        if digest is None:
+            return False
+        for source in sources:
+            if source is None:
+                continue
+            if source not in self._existing_digests:
+                if len(self._existing_digests) >= DIGEST_CACHE_SIZE:
+                    del self._existing_digests[next(iter(self._existing_digests))]
+                self._existing_digests[source] = file_digest(source)
+            existing = self._existing_digests[source]
+            if existing is not None and existing == digest:
+                return True
+        return False
+
+    def _filter_chunk(self, entries: list[os.DirEntry]) -> list[dict]:
+        items = []
+        for entry in entries:
+            self.scanned += 1
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            if self.skip_existing and self._is_imported(entry, size):
+                self.skipped += 1
+                continue
+            item = {"path": entry.path, "name": os.path.splitext(entry.name)[0]}
+            if self.tags:
+                item["tags"] = self.tags
+            items.append(item)
+        return items
+
+    def _batches(self, items: list[dict]) -> Iterator[list[dict]]:
+        batch: list[dict] = []
+        batch_bytes = 0
+        for item in items:
+            item_bytes = len(json.dumps(item, ensure_ascii=False).encode())
+            if batch and (
+                len(batch) >= IMPORT_BATCH_SIZE
+                or batch_bytes + item_bytes > IMPORT_BATCH_BYTES
+            ):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(item)
+            batch_bytes += item_bytes
+        if batch:
+            yield batch
+
+    async def _submit(self, batch: list[dict]) -> None:
+        payload = {"items": batch}
+        if self.folder_id:
+            payload["folderId"] = self.folder_id
+        self.submitted += len(batch)
+        result = await eagle_api_post("/api/item/addFromPaths", payload)
+        self.batches += 1
+        # NOTE: Eagleは一括追加の結果をバッチ単位でしか返さないため、件数もバッチ単位で数える
+        if is_success(result):
+            self.imported += len(batch)
+        else:
+            self.failed += len(batch)
+            self.failed_batches += 1
+            message = result.get("message") if isinstance(result, dict) else None
+            self.errors.append(message or "Failed to add items")
+        publish_job(self)
+
+    async def run(self) -> None:
+        # NOTE: 専用のタスクで動くため、このタスクのリクエストは全てbulkとして扱う
+        upstream_priority.set("bulk")
+        try:
+            if self.skip_existing:
+                await self._load_existing()
+
+            walker = walk_files(self.root, self.pattern, self.recursive)
+            while True:
+                entries = await asyncio.to_thread(
+                    lambda: list(islice(walker, WALK_CHUNK_SIZE))
+                )
+                if not entries:
+                    break
+                items = await asyncio.to_thread(self._filter_chunk, entries)
+                publish_job(self)
+                await map_bounded(
+                    self._submit, list(self._batches(items)), IMPORT_CONCURRENCY
+                )
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.errors.append("Import was cancelled")
+            self.status = "failed"
+            raise
+        except Exception as exc:
+            logger.error(f"Import job {self.id} failed: {exc}")
+            self.errors.append(str(exc))
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self._existing = {}
+            self._existing_digests = {}
+            publish_job(self)
+            if self.imported and item_index.synced_at is not None:
+                item_index.start_sync()
+
+
+class SharedJobStore:
+    """
+    Progress of the import jobs in the SQLite file of the response cache,
+    so that a job started by one worker process can be followed through
+    any other worker.
+
+    Like the response cache, a locked database is not waited on: a skipped
+    write is made up for by the next progress update of the job.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, busy_timeout: float = 0.05):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._connection: sqlite3.Connection | None = None
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor | None:
+        try:
+            if self._connection is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                connection = sqlite3.connect(
+                    self.path, isolation_level=None, timeout=self.busy_timeout
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS import_jobs ("
+                    " id TEXT PRIMARY KEY,"
+                    " started_at REAL NOT NULL,"
+                    " state BLOB NOT NULL"
+                    ")"
+                )
+                self._connection = connection
+            return self._connection.execute(sql, params)
+        except sqlite3.OperationalError as exc:
+            logger.debug(f"Import job store unavailable: {exc}")
+            return None
+
+    def put(self, job: ImportJob) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO import_jobs VALUES (?, ?, ?)",
+            (job.id, job.started_at, dumps(job.to_dict())),
+        )
+
+    def get(self, job_id: str) -> dict | None:
+        cursor = self._execute("SELECT state FROM import_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone() if cursor is not None else None
+        return loads(row[0]) if row is not None else None
+
+    def prune(self, keep: int) -> None:
+        self._execute(
+            "DELETE FROM import_jobs WHERE id NOT IN ("
+            " SELECT id FROM import_jobs ORDER BY started_at DESC LIMIT ?)",
+            (keep,),
+        )
+
+
+_jobs: OrderedDict[str, ImportJob] = OrderedDict()
+_tasks: set[asyncio.Task] = set()
+# NOTE: 複数ワーカーでは、ジョブを開始したワーカー以外にも進捗を問い合わせられる
+shared_jobs = SharedJobStore() if CACHE_BACKEND == "sqlite" else None
+
+
+def publish_job(job: ImportJob) -> None:
+    if shared_jobs is not None:
+        shared_jobs.put(job)
+
+
+def start_import(job: ImportJob) -> ImportJob:
+    finished = [job_id for job_id, job in _jobs.items() if job.status != "running"]
+    for job_id in finished[: max(0, len(_jobs) + 1 - IMPORT_MAX_JOBS)]:
+        del _jobs[job_id]
+    _jobs[job.id] = job
+    if shared_jobs is not None:
+        shared_jobs.prune(IMPORT_MAX_JOBS - 1)
+        shared_jobs.put(job)
+    task = asyncio.create_task(job.run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def get_import_job(job_id: str) -> dict | None:
+    """
+    Return the progress of the job, which may run in another worker.
+    """
+    job = _jobs.get(job_id)
+    if job is not None:
+        return job.to_dict()
+    if shared_jobs is not None:
+        return shared_jobs.get(job_id)
+    return None
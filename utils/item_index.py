@@ -0,0 +1,313 @@
+from collections import defaultdict
+from typing import Callable, Iterable, Literal
+import asyncio
+import logging
+import os
+import time
+from utils.library_reader import get_library_reader
+from utils.pagination import iter_items
+
+logger = logging.getLogger(__name__)
+
+ITEM_INDEX_SYNC_INTERVAL = float(os.environ.get("EAGLE_ITEM_INDEX_SYNC_INTERVAL", "60"))
+
+ItemListener = Callable[[list[dict], list[str]], None]
+
+
+class ItemRecord:
+    """
+    Compact, read-only view of the metadata of an Eagle item.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "ext",
+        "size",
+        "width",
+        "height",
+        "star",
+        "tags",
+        "folders",
+        "url",
+        "annotation",
+        "modificationTime",
+        "lastModified",
+    )
+
+    def __init__(self, item: dict):
+        self.id: str = item["id"]
+        self.name: str = item.get("name", "")
+        self.ext: str = item.get("ext", "")
+        self.size: int = item.get("size", 0)
+        self.width: int = item.get("width", 0)
+        self.height: int = item.get("height", 0)
+        self.star: int = item.get("star", 0)
+        self.tags: tuple[str, ...] = tuple(item.get("tags") or ())
+        self.folders: tuple[str, ...] = tuple(item.get("folders") or ())
+        self.url: str = item.get("url", "")
+        self.annotation: str = item.get("annotation", "")
+        self.modificationTime: int = item.get("modificationTime", 0)
+        self.lastModified: int = item.get("lastModified", 0)
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in self.__slots__}
+        data["tags"] = list(self.tags)
+        data["folders"] = list(self.folders)
+        return data
+
+
+ORDER_FIELDS = (
+    "name",
+    "ext",
+    "size",
+    "width",
+    "height",
+    "star",
+    "modificationTime",
+    "lastModified",
+)
+
+
+class ItemIndex:
+    """
+    In-memory index of the item metadata of the current library.
+
+    Items are kept as `ItemRecord`s with inverted indexes on tags, folders,
+    ext and star, so filtered queries are answered without calling Eagle.
+    The index is built by a full scan of `/api/item/list` (or of the library
+    on disk when the direct reader is enabled); later syncs only touch items
+    whose `lastModified` changed. Derived indexes subscribe to
+    changes with `add_listener`.
+    """
+
+    def __init__(self, sync_interval: float = ITEM_INDEX_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self.records: dict[str, ItemRecord] = {}
+        self.synced_at: float | None = None
+        self._by_tag: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_folder: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_ext: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_star: defaultdict[int, set[str]] = defaultdict(set)
+        self._listeners: list[ItemListener] = []
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: asyncio.Task | None = None
+        self.pending_restore: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add_listener(self, listener: ItemListener) -> None:
+        """
+        Register `listener(upserted_items, removed_ids)`, called after each change.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, upserted: list[dict], removed: list[str]) -> None:
+        if not upserted and not removed:
+            return
+        for listener in self._listeners:
+            try:
+                listener(upserted, removed)
+            except Exception as exc:
+                logger.error(f"Item index listener failed: {exc}")
+
+    def _postings(self, record: ItemRecord):
+        for tag in record.tags:
+            yield self._by_tag, tag
+        for folder in record.folders:
+            yield self._by_folder, folder
+        yield self._by_ext, record.ext.lower()
+        yield self._by_star, record.star
+
+    def _unlink(self, record: ItemRecord) -> None:
+        for postings, key in self._postings(record):
+            ids = postings.get(key)
+            if ids is None:
+                continue
+            ids.discard(record.id)
+            if not ids:
+                del postings[key]
+
+    def _link(self, record: ItemRecord) -> None:
+        for postings, key in self._postings(record):
+            postings[key].add(record.id)
+
+    def upsert(self, items: Iterable[dict]) -> None:
+        upserted = []
+        for item in items:
+            if not isinstance(item, dict) or "id" not in item:
+                continue
+            if item.get("isDeleted"):
+                self._remove(item["id"])
+                continue
+            previous = self.records.get(item["id"])
+            if previous is not None:
+                self._unlink(previous)
+            record = ItemRecord(item)
+            self.records[record.id] = record
+            self._link(record)
+            upserted.append(item)
+        self._notify(upserted, [])
+
+    def apply_write(self, items: Iterable[dict]) -> None:
+        """
+        Upsert items written through this server, unless the index has not
+        been built yet (a partial index must not look ready).
+        """
+        if self.synced_at is None and not self.records:
+            return
+        self.upsert(items)
+
+    def _remove(self, item_id: str) -> bool:
+        record = self.records.pop(item_id, None)
+        if record is None:
+            return False
+        self._unlink(record)
+        return True
+
+    def remove(self, item_ids: Iterable[str]) -> None:
+        removed = [item_id for item_id in item_ids if self._remove(item_id)]
+        self._notify([], removed)
+
+    def clear(self) -> None:
+        removed = list(self.records)
+        self.records.clear()
+        for postings in (self._by_tag, self._by_folder, self._by_ext, self._by_star):
+            postings.clear()
+        self.synced_at = None
+        self._notify([], removed)
+
+    async def sync(self) -> None:
+        """
+        Reconcile the index with a full scan of the library.
+        """
+        async with self._sync_lock:
+            seen: set[str] = set()
+            changed: list[dict] = []
+            async for item in self._iter_library():
+                seen.add(item["id"])
+                record = self.records.get(item["id"])
+                if record is None or record.lastModified != item.get("lastModified"):
+                    changed.append(item)
+            self.upsert(changed)
+            self.remove([item_id for item_id in self.records if item_id not in seen])
+            self.synced_at = time.monotonic()
+            logger.info(
+                f"Item index synced: {len(self.records)} items, {len(changed)} changed"
+            )
+
+    async def _iter_library(self):
+        reader = await get_library_reader()
+        if reader is None:
+            async for item in iter_items():
+                yield item
+            return
+
+        await reader.refresh()
+        for item in reader.items():
+            yield item
+
+    def _on_sync_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Item index sync failed: {task.exception()}")
+
+    def start_sync(self) -> asyncio.Task:
+        """
+        Start a sync in the background, unless one is already running.
+        """
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self.sync())
+            self._sync_task.add_done_callback(self._on_sync_done)
+        return self._sync_task
+
+    async def ensure_ready(self) -> None:
+        """
+        Build the index on first use; afterwards refresh it in the background
+        once it is older than `sync_interval`. An index restored from a
+        snapshot is served while it is being reconciled.
+        """
+        if self.pending_restore is not None:
+            await asyncio.shield(self.pending_restore)
+            self.pending_restore = None
+        if (
+            self.synced_at is not None
+            and time.monotonic() - self.synced_at < self.sync_interval
+        ):
+            return
+        task = self.start_sync()
+        if self.synced_at is None and not self.records:
+            await asyncio.shield(task)
+
+    def query(
+        self,
+        tags: list[str] | None = None,
+        tags_mode: Literal["and", "or"] = "and",
+        folders: list[str] | None = None,
+        ext: list[str] | None = None,
+        star_min: int | None = None,
+        star_max: int | None = None,
+        width_min: int | None = None,
+        width_max: int | None = None,
+        height_min: int | None = None,
+        height_max: int | None = None,
+        keyword: str | None = None,
+        order_by: str | None = None,
+    ) -> list[ItemRecord]:
+        candidates: set[str] | None = None
+
+        def narrow(ids: set[str]) -> None:
+            nonlocal candidates
+            candidates = ids if candidates is None else candidates & ids
+
+        if tags:
+            postings = [self._by_tag.get(tag, set()) for tag in tags]
+            narrow(
+                set.intersection(*postings)
+                if tags_mode == "and"
+                else set().union(*postings)
+            )
+        if folders:
+            narrow(
+                set().union(*(self._by_folder.get(folder, set()) for folder in folders))
+            )
+        if ext:
+            narrow(set().union(*(self._by_ext.get(e.lower(), set()) for e in ext)))
+        if star_min is not None or star_max is not None:
+            low = star_min if star_min is not None else 0
+            high = star_max if star_max is not None else 5
+            narrow(
+                set().union(
+                    *(self._by_star.get(s, set()) for s in range(low, high + 1))
+                )
+            )
+
+        records = (
+            self.records.values()
+            if candidates is None
+            else [self.records[item_id] for item_id in candidates]
+        )
+
+        keyword = keyword.lower() if keyword else None
+        results = [
+            record
+            for record in records
+            if (width_min is None or record.width >= width_min)
+            and (width_max is None or record.width <= width_max)
+            and (height_min is None or record.height >= height_min)
+            and (height_max is None or record.height <= height_max)
+            and (keyword is None or keyword in record.name.lower())
+        ]
+
+        if order_by:
+            field = order_by.lstrip("-")
+            if field not in ORDER_FIELDS:
+                raise ValueError(f"Unsupported order field: {field}")
+            results.sort(
+                key=lambda record: getattr(record, field),
+                reverse=order_by.startswith("-"),
+            )
+        return results
+
+
+item_index = ItemIndex()
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import time
+from utils.eagle_api import eagle_api_get, is_success
+
+LIBRARY_PATH_TTL = float(os.environ.get("EAGLE_LIBRARY_PATH_TTL", "3600"))
+
+
+class LibraryPathCache:
+    """
+    Caches the path of the current library.
+
+    `/api/library/info` returns the whole folder tree, so the path is fetched
+    once and only refreshed when the library changes: after `switch_library`,
+    when a locally visible library directory disappears, or after the TTL.
+    """
+
+    def __init__(self, ttl: float = LIBRARY_PATH_TTL):
+        self.ttl = ttl
+        self._path: str | None = None
+        self._is_local = False
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        if self._path is None:
+            return False
+        if time.monotonic() - self._fetched_at > self.ttl:
+            return False
+        # NOTE: 同一ホストで参照できていたライブラリが消えた場合は、切り替えられたとみなす
+        if self._is_local and not os.path.isdir(self._path):
+            return False
+        return True
+
+    async def get(self) -> str | None:
+        if self._is_fresh():
+            return self._path
+
+        async with self._lock:
+            if self._is_fresh():
+                return self._path
+
+            library = await eagle_api_get("/api/library/info")
+            if not is_success(library):
+                return None
+            try:
+                path = library["data"]["library"]["path"]
+            except (KeyError, TypeError):
+                return None
+
+            self._path = path
+            self._is_local = os.path.isdir(path)
+            self._fetched_at = time.monotonic()
+            return path
+
+    def invalidate(self) -> None:
+        self._path = None
+
+
+library_path_cache = LibraryPathCache()
+
+
+async def get_library_path() -> str | None:
+    return await library_path_cache.get()
@@ -0,0 +1,182 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import os
+import time
+from utils.fastjson import loads
+from utils.library import get_library_path
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_READER_ENABLED = os.environ.get("EAGLE_LIBRARY_READER", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+LIBRARY_READER_WORKERS = int(os.environ.get("EAGLE_LIBRARY_READER_WORKERS", "8"))
+LIBRARY_READER_MAX_AGE = float(os.environ.get("EAGLE_LIBRARY_READER_MAX_AGE", "5"))
+
+# `orderBy` of `/api/item/list` -> key of the item metadata
+ORDER_KEYS = {
+    "CREATEDATE": lambda item: item.get("btime", item.get("modificationTime", 0)),
+    "FILESIZE": lambda item: item.get("size", 0),
+    "NAME": lambda item: item.get("name", ""),
+    "RESOLUTION": lambda item: item.get("width", 0) * item.get("height", 0),
+}
+
+
+def matches_keyword(item: dict, keyword: str) -> bool:
+    """
+    Whether the lowercase `keyword` appears in the name, tags, annotation or
+    URL of `item`, like the keyword of `/api/item/list`.
+    """
+    return (
+        keyword in (item.get("name") or "").lower()
+        or any(keyword in tag.lower() for tag in item.get("tags") or ())
+        or keyword in (item.get("annotation") or "").lower()
+        or keyword in (item.get("url") or "").lower()
+    )
+
+
+class LibraryReader:
+    """
+    Reads item metadata directly from `images/<id>.info/metadata.json`.
+
+    Files are read with a thread pool, and a file is only parsed again when
+    its mtime changed since the previous scan.
+    """
+
+    def __init__(self, library_path: str, workers: int = LIBRARY_READER_WORKERS):
+        self.library_path = library_path
+        self.images_path = os.path.join(library_path, "images")
+        self.workers = workers
+        self.scanned_at: float | None = None
+        # item ID -> (mtime_ns of metadata.json, metadata)
+        self._entries: dict[str, tuple[int, dict]] = {}
+        self._lock = asyncio.Lock()
+
+    def metadata_path(self, item_id: str) -> str:
+        return os.path.join(self.images_path, f"{item_id}.info", "metadata.json")
+
+    def _load(self, item_id: str) -> tuple[int, dict] | None:
+        path = self.metadata_path(item_id)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            previous = self._entries.get(item_id)
+            if previous is not None and previous[0] == mtime:
+                return previous
+            with open(path, "rb") as f:
+                return mtime, loads(f.read())
+        except OSError as exc:
+            logger.debug(f"Failed to read {path}: {exc}")
+            return None
+        except ValueError as exc:
+            # NOTE: Eagleが書き込み中のファイルは読めないため、削除とはみなさず前回の内容を使う
+            logger.debug(f"Failed to parse {path}: {exc}")
+            return self._entries.get(item_id)
+
+    def _scan(self) -> tuple[dict[str, tuple[int, dict]], list[dict], list[str]]:
+        with os.scandir(self.images_path) as entries:
+            item_ids = [
+                entry.name[: -len(".info")]
+                for entry in entries
+                if entry.name.endswith(".info") and entry.is_dir()
+            ]
+
+        entries: dict[str, tuple[int, dict]] = {}
+        changed: list[dict] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            loaded = pool.map(self._load, item_ids, chunksize=256)
+            for item_id, entry in zip(item_ids, loaded):
+                if entry is None:
+                    continue
+                entries[item_id] = entry
+                if self._entries.get(item_id) is not entry:
+                    changed.append(entry[1])
+
+        removed = [item_id for item_id in self._entries if item_id not in entries]
+        return entries, changed, removed
+
+    async def refresh(self, max_age: float = 0) -> tuple[list[dict], list[str]]:
+        """
+        Rescan the library unless it was scanned less than `max_age` seconds ago.
+
+        Returns the metadata of new or changed items and the IDs of removed items.
+        """
+        async with self._lock:
+            if (
+                self.scanned_at is not None
+                and time.monotonic() - self.scanned_at < max_age
+            ):
+                return [], []
+            entries, changed, removed = await asyncio.to_thread(self._scan)
+            self._entries = entries
+            self.scanned_at = time.monotonic()
+            return changed, removed
+
+    def items(self) -> list[dict]:
+        return [
+            metadata
+            for _, metadata in self._entries.values()
+            if not metadata.get("isDeleted")
+        ]
+
+    async def get_item(self, item_id: str) -> dict | None:
+        entry = await asyncio.to_thread(self._load, item_id)
+        if entry is None or entry[1].get("isDeleted"):
+            return None
+        self._entries[item_id] = entry
+        return entry[1]
+
+    async def list_items(self, params: dict) -> list[dict]:
+        """
+        Emulate `/api/item/list` over the metadata read from disk.
+        """
+        await self.refresh(max_age=LIBRARY_READER_MAX_AGE)
+
+        keyword = (params.get("keyword") or "").lower()
+        ext = (params.get("ext") or "").lower()
+        tags = {tag.strip() for tag in (params.get("tags") or "").split(",")} - {""}
+        folders = {f.strip() for f in (params.get("folders") or "").split(",")} - {""}
+
+        items = [
+            item
+            for item in self.items()
+            if (not keyword or matches_keyword(item, keyword))
+            and (not ext or item.get("ext", "").lower() == ext)
+            and (not tags or tags.issubset(item.get("tags") or ()))
+            and (not folders or not folders.isdisjoint(item.get("folders") or ()))
+        ]
+
+        order_by = params.get("orderBy")
+        if order_by and order_by.lstrip("-") in ORDER_KEYS:
+            items.sort(
+                key=ORDER_KEYS[order_by.lstrip("-")],
+                reverse=order_by.startswith("-"),
+            )
+
+        limit = params.get("limit", 200)
+        # NOTE: `/api/item/list` と同様に `offset` はページ番号として扱う
+        offset = params.get("offset", 0) * limit
+        return items[offset : offset + limit]
+
+
+_reader: LibraryReader | None = None
+
+
+async def get_library_reader() -> LibraryReader | None:
+    """
+    Return the reader of the current library, or None if the direct reader
+    is disabled or the library is not reachable from this host.
+    """
+    global _reader
+    if not LIBRARY_READER_ENABLED:
+        return None
+
+    library_path = await get_library_path()
+    if library_path is None or not os.path.isdir(os.path.join(library_path, "images")):
+        return None
+
+    if _reader is None or _reader.library_path != library_path:
+        _reader = LibraryReader(library_path)
+    return _reader
@@ -0,0 +1,68 @@
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi_mcp import FastApiMCP
+from fastapi_mcp.transport.http import FastApiHttpSessionManager
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+
+class StatelessHttpSessionManager(FastApiHttpSessionManager):
+    """
+    Streamable HTTP transport that keeps no sessions between requests.
+
+    fastapi-mcp always creates stateful sessions, which only exist in the
+    process that created them. With several workers, the next request of a
+    client may be accepted by another worker that does not know its
+    `Mcp-Session-Id`. Without sessions, every request is self-contained and
+    any worker can serve it.
+
+    fastapi-mcp has no public option for this, so this overrides its private
+    startup method; `pyproject.toml` pins fastapi-mcp to 0.4.x accordingly.
+    """
+
+    async def _ensure_session_manager_started(self) -> None:
+        if self._manager_started:
+            return
+
+        async with self._startup_lock:
+            if self._manager_started:
+                return
+
+            self._session_manager = StreamableHTTPSessionManager(
+                app=self.mcp_server,
+                event_store=self.event_store,
+                json_response=self.json_response,
+                stateless=True,
+                security_settings=self.security_settings,
+            )
+            running = asyncio.Event()
+
+            async def run_session_manager():
+                async with self._session_manager.run():
+                    running.set()
+                    await asyncio.Event().wait()
+
+            self._manager_task = asyncio.create_task(run_session_manager())
+            # NOTE: 固定時間待つ代わりに、タスクグループの開始を待つ
+            await running.wait()
+            self._manager_started = True
+
+
+def mount_stateless_http(
+    mcp: FastApiMCP, app: FastAPI, mount_path: str = "/mcp"
+) -> StatelessHttpSessionManager:
+    """
+    Mount `mcp` at `mount_path` like `FastApiMCP.mount_http`, with a
+    stateless transport.
+    """
+    transport = StatelessHttpSessionManager(mcp_server=mcp.server)
+
+    @app.api_route(
+        mount_path,
+        methods=["GET", "POST", "DELETE"],
+        include_in_schema=False,
+        operation_id="mcp_http",
+    )
+    async def handle_mcp_streamable_http(request: Request):
+        return await transport.handle_fastapi_request(request)
+
+    return transport
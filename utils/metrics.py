@@ -0,0 +1,233 @@
+from bisect import bisect_left
+from typing import Callable, Iterable
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[str]:
+        return ()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def set(self, *labels, value: float) -> None:
+        # NOTE: 他で集計している値をcollectorから反映する用途
+        self._values[labels] = value
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, value: float = 1) -> None:
+        self.inc(*labels, value=-value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            formatted = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{formatted} {total[0]}"
+            yield f"{self.name}_count{formatted} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Register a callback that updates gauges right before rendering.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+UPSTREAM_LATENCY = registry.register(
+    Histogram(
+        "eagle_upstream_request_duration_seconds",
+        "Latency of requests to the Eagle API",
+        ["method", "endpoint"],
+    )
+)
+UPSTREAM_ERRORS = registry.register(
+    Counter(
+        "eagle_upstream_errors_total",
+        "Failed requests to the Eagle API by category",
+        ["endpoint", "category"],
+    )
+)
+UPSTREAM_RETRIES = registry.register(
+    Counter(
+        "eagle_upstream_retries_total",
+        "Requests to the Eagle API that were retried",
+        ["endpoint"],
+    )
+)
+CIRCUIT_STATE = registry.register(
+    Gauge(
+        "eagle_upstream_circuit_state",
+        "State of the circuit breaker of the Eagle API (0: closed, 1: half-open, 2: open)",
+    )
+)
+UPSTREAM_IN_FLIGHT = registry.register(
+    Gauge(
+        "eagle_upstream_requests_in_flight",
+        "Requests to the Eagle API currently in flight",
+        ["endpoint"],
+    )
+)
+UPSTREAM_QUEUED = registry.register(
+    Gauge(
+        "eagle_upstream_requests_queued",
+        "Requests waiting for a slot of the upstream scheduler",
+        ["priority"],
+    )
+)
+UPSTREAM_REQUEST_BYTES = registry.register(
+    Counter(
+        "eagle_upstream_request_bytes_total",
+        "Bytes sent to the Eagle API",
+        ["endpoint"],
+    )
+)
+UPSTREAM_RESPONSE_BYTES = registry.register(
+    Counter(
+        "eagle_upstream_response_bytes_total",
+        "Bytes received from the Eagle API",
+        ["endpoint"],
+    )
+)
+CACHE_EVENTS = registry.register(
+    Counter(
+        "eagle_cache_events_total",
+        "Lookups of the Eagle response cache by result",
+        ["result"],
+    )
+)
+CACHE_ENTRIES = registry.register(
+    Gauge("eagle_cache_entries", "Entries in the Eagle response cache")
+)
+TOOL_LATENCY = registry.register(
+    Histogram(
+        "eagle_mcp_request_duration_seconds",
+        "Latency of requests to this server by route",
+        ["method", "route"],
+    )
+)
+TOOL_REQUESTS = registry.register(
+    Counter(
+        "eagle_mcp_requests_total",
+        "Requests to this server by route and status code",
+        ["method", "route", "status"],
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records the latency and status of each request per
+    route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            TOOL_LATENCY.observe(time.perf_counter() - started, method, path)
+            TOOL_REQUESTS.inc(method, path, status)
@@ -0,0 +1,75 @@
+from collections import deque
+from typing import AsyncIterator
+import asyncio
+import os
+from utils.eagle_api import request_to_eagle_api, is_success
+
+ITEM_LIST_PAGE_SIZE = 200
+SCAN_PREFETCH = int(os.environ.get("EAGLE_API_SCAN_PREFETCH", "4"))
+
+
+class ScanError(Exception):
+    pass
+
+
+async def iter_item_pages(
+    filters: dict | None = None,
+    page_size: int = ITEM_LIST_PAGE_SIZE,
+    prefetch: int = SCAN_PREFETCH,
+) -> AsyncIterator[list[dict]]:
+    """
+    Yield every page of `/api/item/list` matching `filters`, in order.
+
+    Up to `prefetch` pages are requested ahead of the page being consumed.
+    Raises `ScanError` if a page cannot be fetched.
+    """
+    filters = {
+        key: value
+        for key, value in (filters or {}).items()
+        if key not in ("limit", "offset")
+    }
+    pending: deque[asyncio.Task] = deque()
+    next_offset = 0
+
+    def schedule() -> None:
+        nonlocal next_offset
+        # NOTE: Eagleは `offset` をページ番号として扱う（offset * limit 件目から）
+        params = {**filters, "limit": page_size, "offset": next_offset}
+        pending.append(
+            asyncio.ensure_future(
+                request_to_eagle_api(
+                    "GET", "/api/item/list", params=params, priority="bulk"
+                )
+            )
+        )
+        next_offset += 1
+
+    try:
+        for _ in range(max(1, prefetch)):
+            schedule()
+
+        while pending:
+            result = await pending.popleft()
+            if not is_success(result):
+                message = result.get("message") if isinstance(result, dict) else None
+                raise ScanError(message or "Failed to fetch item list")
+
+            page = result.get("data") or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                break
+            schedule()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def iter_items(
+    filters: dict | None = None,
+    page_size: int = ITEM_LIST_PAGE_SIZE,
+    prefetch: int = SCAN_PREFETCH,
+) -> AsyncIterator[dict]:
+    async for page in iter_item_pages(filters, page_size, prefetch):
+        for item in page:
+            yield item
@@ -0,0 +1,242 @@
+from typing import Iterable
+import os
+from utils.item_index import item_index
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+NUMPY_MISSING = "NumPy is not installed. Install it with `uv sync --extra colors`."
+
+# Spread of each palette color over the reference colors, in CIELAB units
+PALETTE_SIGMA = float(os.environ.get("EAGLE_PALETTE_SIGMA", "20"))
+
+# Palettes are embedded this many items at a time, to bound temporary arrays
+EMBED_BATCH_SIZE = 2048
+
+# Reference colors: a 4x4x4 grid of the RGB cube
+REFERENCE_LEVELS = (32, 96, 160, 224)
+
+
+def parse_color(color: str | list[int]) -> tuple[int, int, int]:
+    """
+    Parse `#RRGGBB`, `RRGGBB` or `[r, g, b]`. Raises ValueError.
+    """
+    if isinstance(color, str):
+        value = color.lstrip("#")
+        if len(value) != 6:
+            raise ValueError(f"Invalid color: {color}")
+        return tuple(int(value[i : i + 2], 16) for i in (0, 2, 4))
+    if len(color) != 3 or not all(0 <= c <= 255 for c in color):
+        raise ValueError(f"Invalid color: {color}")
+    return tuple(int(c) for c in color)
+
+
+def rgb_to_lab(rgb):
+    """
+    Convert sRGB colors (0-255, last axis RGB) to CIELAB (D65).
+    """
+    rgb = np.asarray(rgb, dtype=np.float32) / 255
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array(
+        [
+            [0.4124 / 0.95047, 0.2126, 0.0193 / 1.08883],
+            [0.3576 / 0.95047, 0.7152, 0.1192 / 1.08883],
+            [0.1805 / 0.95047, 0.0722, 0.9505 / 1.08883],
+        ],
+        dtype=np.float32,
+    )
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack(
+        [
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ],
+        axis=-1,
+    )
+
+
+def palette_of(item: dict) -> list[tuple[tuple[int, int, int], float]]:
+    palette = []
+    for entry in item.get("palettes") or ():
+        try:
+            color = parse_color(entry["color"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        palette.append((color, float(entry.get("ratio") or 1)))
+    return palette
+
+
+class PaletteIndex:
+    """
+    Color palettes of the items in `item_index`, embedded as rows of a
+    float32 matrix for vectorized nearest-neighbor queries.
+
+    Each palette becomes a soft histogram over a grid of reference colors:
+    every palette color adds its ratio to the reference colors near it in
+    CIELAB, so similar shades land in the same bins. Rows are normalized,
+    and the cosine similarity to a query palette is one matrix product.
+    Like the search index, changes of `item_index` are applied on the next
+    query.
+    """
+
+    def __init__(self, sigma: float = PALETTE_SIGMA):
+        self.sigma = sigma
+        self.matrix = None
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        # item ID -> palette to index, or None to remove it
+        self._pending: dict[str, list | None] = {}
+        self._references = None
+        if np is not None:
+            item_index.add_listener(self._on_items_changed)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _on_items_changed(self, upserted: list[dict], removed: list[str]) -> None:
+        for item in upserted:
+            if "palettes" in item:
+                self._pending[item["id"]] = palette_of(item) or None
+        for item_id in removed:
+            self._pending[item_id] = None
+
+    def embed(self, palettes: list[list[tuple[tuple[int, int, int], float]]]):
+        """
+        Return the normalized histograms of `palettes` as a float32 matrix.
+        """
+        if self._references is None:
+            grid = np.array(
+                [
+                    (r, g, b)
+                    for r in REFERENCE_LEVELS
+                    for g in REFERENCE_LEVELS
+                    for b in REFERENCE_LEVELS
+                ],
+                dtype=np.float32,
+            )
+            self._references = rgb_to_lab(grid)
+
+        # NOTE: パレットの色数を揃えるため、比率0の色で埋める
+        width = max(1, max((len(palette) for palette in palettes), default=0))
+        flat_colors = []
+        flat_ratios = []
+        for palette in palettes:
+            padding = width - len(palette)
+            flat_colors.extend(color for color, _ in palette)
+            flat_colors.extend([(0, 0, 0)] * padding)
+            flat_ratios.extend(ratio for _, ratio in palette)
+            flat_ratios.extend([0.0] * padding)
+        colors = np.array(flat_colors, dtype=np.float32).reshape(-1, width, 3)
+        ratios = np.array(flat_ratios, dtype=np.float32).reshape(-1, width)
+
+        vectors = np.empty((len(palettes), len(self._references)), dtype=np.float32)
+        for start in range(0, len(palettes), EMBED_BATCH_SIZE):
+            end = start + EMBED_BATCH_SIZE
+            lab = rgb_to_lab(colors[start:end])
+            # (items, palette colors, reference colors): |a|^2 + |b|^2 - 2ab
+            distances = (
+                (lab**2).sum(axis=-1)[:, :, None]
+                + (self._references**2).sum(axis=-1)
+                - 2 * lab @ self._references.T
+            )
+            weights = np.exp(distances / (-2 * self.sigma**2))
+            vectors[start:end] = np.einsum("ip,ipr->ir", ratios[start:end], weights)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _remove(self, item_id: str) -> None:
+        row = self.rows.pop(item_id, None)
+        if row is None:
+            return
+        # NOTE: 最終行を空いた行に移し、行列を詰めたままにする
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+    def apply_pending(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        upserted = {}
+        for item_id, palette in pending.items():
+            if palette is None:
+                self._remove(item_id)
+            else:
+                upserted[item_id] = palette
+        if not upserted:
+            return
+
+        vectors = self.embed(list(upserted.values()))
+        new = [item_id for item_id in upserted if item_id not in self.rows]
+        size = len(self.ids) + len(new)
+        if self.matrix is None or len(self.matrix) < size:
+            capacity = max(
+                size, 2 * (len(self.matrix) if self.matrix is not None else 0)
+            )
+            matrix = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            if self.matrix is not None:
+                matrix[: len(self.ids)] = self.matrix[: len(self.ids)]
+            self.matrix = matrix
+        for item_id in new:
+            self.rows[item_id] = len(self.ids)
+            self.ids.append(item_id)
+        rows = np.fromiter(
+            (self.rows[item_id] for item_id in upserted),
+            dtype=np.intp,
+            count=len(upserted),
+        )
+        self.matrix[rows] = vectors
+
+    def vector_of(self, item_id: str):
+        self.apply_pending()
+        row = self.rows.get(item_id)
+        return self.matrix[row].copy() if row is not None else None
+
+    def nearest(
+        self,
+        query,
+        limit: int,
+        candidates: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+    ) -> list[tuple[str, float]]:
+        """
+        Return `(item ID, similarity)` of the `limit` items whose palettes are
+        the most similar to the embedded `query`, most similar first.
+        """
+        self.apply_pending()
+        if not self.ids:
+            return []
+
+        similarities = self.matrix[: len(self.ids)] @ query
+        if candidates is None:
+            rows = np.arange(len(self.ids))
+        else:
+            rows = np.fromiter(
+                (self.rows[item_id] for item_id in candidates if item_id in self.rows),
+                dtype=np.intp,
+            )
+        excluded = [self.rows[item_id] for item_id in exclude if item_id in self.rows]
+        if excluded:
+            rows = rows[~np.isin(rows, excluded)]
+        if len(rows) == 0:
+            return []
+
+        scores = similarities[rows]
+        if len(rows) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.ids[rows[index]], float(scores[index])) for index in best]
+
+
+palette_index = PaletteIndex()
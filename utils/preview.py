@@ -0,0 +1,124 @@
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import base64
+import math
+import os
+from utils.disk_cache import binary_cache
+
+try:
+    from utils import image_ops
+except ImportError:  # pragma: no cover
+    image_ops = None
+
+PREVIEW_WORKERS = int(
+    os.environ.get("EAGLE_PREVIEW_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+PILLOW_MISSING = "Pillow is not installed. Install it with `uv sync --extra previews`."
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PREVIEW_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def image_candidates(library_path: str, item: dict) -> list[str]:
+    """
+    Files an image of `item` can be decoded from: the thumbnail, which is
+    cheap to decode, then the original.
+    """
+    base = os.path.join(library_path, "images", f"{item['id']}.info")
+    return [
+        os.path.join(base, f"{item['name']}_thumbnail.png"),
+        os.path.join(base, f"{item['name']}.{item['ext']}"),
+    ]
+
+
+def item_version(item: dict) -> int:
+    return item.get("lastModified") or item.get("modificationTime") or 0
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+
+def _read_image(path: str) -> tuple[str, int, int]:
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        content = f.read()
+    with Image.open(path) as image:
+        width, height = image.size
+    return base64.b64encode(content).decode(), width, height
+
+
+async def read_image(path: str) -> tuple[str, int, int]:
+    """
+    Return the base64 of the image at `path` and its size.
+    """
+    return await asyncio.to_thread(_read_image, path)
+
+
+async def render_item_preview(
+    library_path: str, item: dict, max_size: int, format: str, quality: int
+) -> str:
+    """
+    Return the path of the cached preview of `item`, rendering it in the
+    process pool on a miss.
+    """
+    key = f"preview:{item['id']}:{item_version(item)}:{max_size}:{format}:{quality}"
+    candidates = image_candidates(library_path, item)
+
+    async def write(path: str) -> None:
+        await _run(
+            image_ops.render_preview, candidates, path, max_size, format, quality
+        )
+
+    return await binary_cache.get_or_create(key, write)
+
+
+def sheet_columns(count: int, columns: int | None) -> int:
+    return columns or max(1, math.ceil(math.sqrt(count)))
+
+
+async def render_contact_sheet(
+    library_path: str,
+    items: list[dict],
+    tile_size: int,
+    columns: int,
+    format: str,
+    quality: int,
+) -> str:
+    """
+    Return the path of the cached contact sheet of `items`, rendering it in
+    the process pool on a miss.
+    """
+    versions = ",".join(f"{item['id']}@{item_version(item)}" for item in items)
+    key = f"contact-sheet:{versions}:{tile_size}:{columns}:{format}:{quality}"
+    tiles = [(image_candidates(library_path, item), item["name"]) for item in items]
+
+    async def write(path: str) -> None:
+        await _run(
+            image_ops.render_contact_sheet,
+            tiles,
+            path,
+            tile_size,
+            columns,
+            format,
+            quality,
+        )
+
+    return await binary_cache.get_or_create(key, write)
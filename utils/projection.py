@@ -0,0 +1,94 @@
+from typing import Iterable, Iterator
+from fastapi.responses import StreamingResponse
+from utils.fastjson import dumps
+
+# Bulky item fields that are left out of compact views
+COMPACT_ITEM_EXCLUDE = frozenset({"palettes"})
+
+STREAM_CHUNK_SIZE = 65536
+
+
+def project(item: dict, fields: Iterable[str] | None) -> dict:
+    """
+    Return a copy of `item` that only contains `fields` (all fields if None).
+    """
+    if fields is None:
+        return dict(item)
+    return {field: item[field] for field in fields if field in item}
+
+
+def compact_item(item: dict, fields: Iterable[str] | None = None) -> dict:
+    """
+    Project `item` to `fields`, or leave out the bulky fields if None.
+    """
+    if fields is not None:
+        return project(item, fields)
+    return {
+        key: value for key, value in item.items() if key not in COMPACT_ITEM_EXCLUDE
+    }
+
+
+def prune_tree(nodes: list, depth: int, key: str = "children") -> list:
+    """
+    Copy a folder tree, cutting it below `depth` levels. Cut nodes report
+    how many children they had in `childCount`.
+    """
+    pruned = []
+    for node in nodes:
+        if not isinstance(node, dict):
+            pruned.append(node)
+            continue
+        node = dict(node)
+        children = node.get(key)
+        if isinstance(children, list):
+            if depth > 0:
+                node[key] = prune_tree(children, depth - 1, key)
+            else:
+                del node[key]
+                node["childCount"] = len(children)
+        pruned.append(node)
+    return pruned
+
+
+def _iter_json(value, depth: int) -> Iterator[bytes]:
+    if depth <= 0 or not isinstance(value, (dict, list)) or not value:
+        yield dumps(value)
+    elif isinstance(value, dict):
+        separator = b"{"
+        for key, child in value.items():
+            yield separator + dumps(str(key)) + b":"
+            yield from _iter_json(child, depth - 1)
+            separator = b","
+        yield b"}"
+    else:
+        separator = b"["
+        for child in value:
+            yield separator
+            yield from _iter_json(child, depth - 1)
+            separator = b","
+        yield b"]"
+
+
+def iter_json(
+    value, depth: int = 3, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode `value` as JSON in chunks of about `chunk_size` bytes.
+
+    Containers in the first `depth` levels are encoded element by element so
+    a large response is never encoded as one string.
+    """
+    buffer: list[bytes] = []
+    size = 0
+    for part in _iter_json(value, depth):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def stream_json(value) -> StreamingResponse:
+    return StreamingResponse(iter_json(value), media_type="application/json")
@@ -0,0 +1,74 @@
+from typing import Literal
+import random
+import time
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the upstream is down.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests are rejected without being sent. Once `reset_timeout` seconds
+    have passed, a single probe request is let through (half-open): its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state: CircuitState = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+
+    def retry_in(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probe_started_at = None
+        # NOTE: プローブが結果を返さずに終わった場合に備え、一定時間後は次のプローブを許可する
+        if (
+            self._probe_started_at is None
+            or now - self._probe_started_at >= self.reset_timeout
+        ):
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probe_started_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retryIn": round(self.retry_in(), 3),
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Delay before retry number `attempt` (0-based): exponential backoff with
+    full jitter.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -0,0 +1,155 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Literal
+import asyncio
+import os
+
+Priority = Literal["interactive", "bulk"]
+
+PRIORITIES: tuple[Priority, ...] = ("interactive", "bulk")
+
+UPSTREAM_CONCURRENCY = int(os.environ.get("EAGLE_API_CONCURRENCY", "8"))
+UPSTREAM_BULK_CONCURRENCY = int(
+    os.environ.get("EAGLE_API_BULK_CONCURRENCY", str(max(1, UPSTREAM_CONCURRENCY - 2)))
+)
+
+# Priority class and fairness key of the requests made by the current task.
+# Tasks inherit them from the task that created them.
+upstream_priority: ContextVar[Priority] = ContextVar(
+    "upstream_priority", default="interactive"
+)
+upstream_session: ContextVar[str] = ContextVar("upstream_session", default="")
+
+
+@contextmanager
+def bulk_priority():
+    """
+    Run the requests made in this block (and in tasks created from it) in
+    the bulk class.
+    """
+    token = upstream_priority.set("bulk")
+    try:
+        yield
+    finally:
+        upstream_priority.reset(token)
+
+
+class UpstreamScheduler:
+    """
+    Caps the number of concurrent requests to Eagle.
+
+    Waiting requests are granted a slot by priority: interactive requests
+    always go before bulk ones, and bulk requests never hold more than
+    `bulk_limit` slots, so a free slot is soon available to interactive
+    lookups. Within a class, sessions take turns (round robin), so one
+    session queueing many requests does not starve the others.
+    """
+
+    def __init__(
+        self,
+        limit: int = UPSTREAM_CONCURRENCY,
+        bulk_limit: int = UPSTREAM_BULK_CONCURRENCY,
+    ):
+        self.limit = limit
+        self.bulk_limit = min(bulk_limit, limit)
+        self.active: dict[Priority, int] = {priority: 0 for priority in PRIORITIES}
+        # priority -> session -> waiters, sessions in the order of their turn
+        self._queues: dict[Priority, OrderedDict[str, deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    def waiting(self, priority: Priority) -> int:
+        return sum(len(waiters) for waiters in self._queues[priority].values())
+
+    def _can_grant(self, priority: Priority) -> bool:
+        if sum(self.active.values()) >= self.limit:
+            return False
+        return priority != "bulk" or self.active["bulk"] < self.bulk_limit
+
+    def _wake(self) -> None:
+        for priority in PRIORITIES:
+            sessions = self._queues[priority]
+            while sessions and self._can_grant(priority):
+                session, waiters = next(iter(sessions.items()))
+                waiter = waiters.popleft()
+                # NOTE: 順番が回ったセッションは末尾に回す
+                del sessions[session]
+                if waiters:
+                    sessions[session] = waiters
+                if waiter.done():
+                    continue
+                self.active[priority] += 1
+                waiter.set_result(None)
+
+    async def acquire(self, priority: Priority, session: str) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        sessions = self._queues[priority]
+        sessions.setdefault(session, deque()).append(waiter)
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(priority)
+            else:
+                waiters = sessions.get(session)
+                if waiters is not None and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del sessions[session]
+            raise
+
+    def release(self, priority: Priority) -> None:
+        self.active[priority] -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority | None = None):
+        """
+        Hold a slot for one request, using the session of the current context
+        and its priority unless `priority` is given.
+        """
+        priority = priority or upstream_priority.get()
+        await self.acquire(priority, upstream_session.get())
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+
+upstream_scheduler = UpstreamScheduler()
+
+
+class UpstreamSessionMiddleware:
+    """
+    ASGI middleware that keys the upstream requests of each HTTP request by
+    its MCP session (`Mcp-Session-Id`), or by the client address otherwise.
+    A request made from within another one (an MCP tool call forwarded to
+    its route) keeps the key of the outer request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = None
+        for name, value in scope.get("headers", ()):
+            if name == b"mcp-session-id":
+                session = value.decode("latin-1")
+                break
+        if session is None:
+            # NOTE: ステートレスなMCPではセッションIDがないため、ツール呼び出しの内部リクエストは
+            # 外側のリクエスト（MCPクライアントのアドレス）のキーを引き継ぐ
+            client = scope.get("client")
+            session = upstream_session.get() or (client[0] if client else "")
+
+        token = upstream_session.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            upstream_session.reset(token)
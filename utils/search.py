@@ -0,0 +1,409 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator
+import heapq
+import math
+import re
+import unicodedata
+from utils.folder_index import FolderTree
+from utils.item_index import item_index
+
+# Weight of a term occurrence in each field (BM25F)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.5,
+    "folders": 1.5,
+    "annotation": 1.0,
+    "url": 0.5,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms are also matched against indexed terms they are a prefix of,
+# and against terms with similar trigrams (typos); such matches score less.
+PREFIX_WEIGHT = 0.8
+PREFIX_MIN_LENGTH = 2
+MAX_EXPANSIONS = 32
+FUZZY_WEIGHT = 0.6
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.35
+
+# Up to this many items matching several query tokens are scored up front
+MULTIPLE_MATCH_LIMIT = 5000
+
+# Hiragana, katakana, CJK ideographs and Hangul, written without spaces
+CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+CJK_RE = re.compile(rf"[{CJK}]")
+WORD_RE = re.compile(r"[^\W_]+")
+CJK_WORD_RE = re.compile(rf"[{CJK}]+|[^\W_{CJK}]+")
+
+URL_STOPWORDS = frozenset({"http", "https", "www", "com", "html"})
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split `text` into normalized terms. Runs of CJK characters, which are
+    not separated by spaces, are split into overlapping bigrams.
+    """
+    if text.isascii():
+        return WORD_RE.findall(text.lower())
+
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if CJK_RE.search(text) is None:
+        return WORD_RE.findall(text)
+    terms = []
+    for token in CJK_WORD_RE.findall(text):
+        if len(token) > 1 and CJK_RE.match(token):
+            terms.extend(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"${term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def is_fuzzy_term(term: str) -> bool:
+    # NOTE: 数字のみの語や短い語は綴り間違いを補う意味がないため、トライグラムを作らない
+    return len(term) >= FUZZY_MIN_LENGTH - 1 and not term.isdigit()
+
+
+class SearchIndex:
+    """
+    Inverted index over the name, tags, annotation, URL and folder names of
+    the items in `item_index`, ranked with BM25F.
+
+    The index follows `item_index` through its listener. Changes are queued
+    and applied on the next search, so a full sync of the item index does
+    not tokenize the library until someone searches it.
+
+    The postings of a term are also kept sorted by their score (impact), so
+    the best results are found with the threshold algorithm instead of
+    scoring every item that contains a common term.
+    """
+
+    def __init__(self):
+        # term -> item ID -> weighted term frequency
+        self._postings: dict[str, dict[str, float]] = {}
+        # term -> [(-impact, item ID)] in order, built on first use
+        self._impacts: dict[str, list[tuple[float, str]]] = {}
+        # item ID -> (terms of the item, weighted length)
+        self._docs: dict[str, tuple[dict[str, float], float]] = {}
+        self._total_length = 0.0
+        # Average length used to normalize the impacts. It is only updated
+        # once it drifts, since that invalidates every sorted posting list.
+        self._average_length = 0.0
+        self._trigrams: defaultdict[str, set[str]] = defaultdict(set)
+        self._sorted_terms: list[str] | None = None
+        self._folder_names: dict[str, str] = {}
+        self._folder_tree: FolderTree | None = None
+        # item ID -> item to index, or None to remove it
+        self._pending: dict[str, dict | None] = {}
+        item_index.add_listener(self._on_items_changed)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _on_items_changed(self, upserted: list[dict], removed: list[str]) -> None:
+        for item in upserted:
+            self._pending[item["id"]] = item
+        for item_id in removed:
+            self._pending[item_id] = None
+
+    def set_folders(self, tree: FolderTree) -> None:
+        """
+        Update the folder names from `tree`, and reindex the items of renamed
+        folders.
+        """
+        if tree is self._folder_tree:
+            return
+        self._folder_tree = tree
+        names = {node.id: node.name for node in tree.nodes.values()}
+        changed = [
+            folder_id
+            for folder_id in names.keys() | self._folder_names.keys()
+            if names.get(folder_id) != self._folder_names.get(folder_id)
+        ]
+        self._folder_names = names
+        if changed:
+            for record in item_index.query(folders=changed):
+                self._pending.setdefault(record.id, record.to_dict())
+
+    def _terms(self, item: dict) -> dict[str, float]:
+        terms: Counter[str] = Counter()
+
+        def add(text: str, weight: float) -> None:
+            for term in tokenize(text):
+                terms[term] += weight
+
+        add(item.get("name") or "", FIELD_WEIGHTS["name"])
+        add("\n".join(item.get("tags") or ()), FIELD_WEIGHTS["tags"])
+        add(
+            "\n".join(
+                self._folder_names.get(folder_id, "")
+                for folder_id in item.get("folders") or ()
+            ),
+            FIELD_WEIGHTS["folders"],
+        )
+        add(item.get("annotation") or "", FIELD_WEIGHTS["annotation"])
+        for term in tokenize(item.get("url") or ""):
+            if term not in URL_STOPWORDS:
+                terms[term] += FIELD_WEIGHTS["url"]
+        return terms
+
+    def _impact(self, frequency: float, length: float) -> float:
+        """
+        BM25 score of a term in an item, without the IDF of the term.
+        """
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._average_length)
+        return frequency * (BM25_K1 + 1) / (frequency + norm)
+
+    def _remove(self, item_id: str) -> None:
+        doc = self._docs.pop(item_id, None)
+        if doc is None:
+            return
+        terms, length = doc
+        self._total_length -= length
+        for term, frequency in terms.items():
+            postings = self._postings[term]
+            del postings[item_id]
+            impacts = self._impacts.get(term)
+            if impacts is not None:
+                entry = (-self._impact(frequency, length), item_id)
+                index = bisect_left(impacts, entry)
+                if index < len(impacts) and impacts[index] == entry:
+                    del impacts[index]
+                else:
+                    del self._impacts[term]
+            if not postings:
+                del self._postings[term]
+                self._impacts.pop(term, None)
+                if is_fuzzy_term(term):
+                    for trigram in trigrams(term):
+                        self._trigrams[trigram].discard(term)
+                        if not self._trigrams[trigram]:
+                            del self._trigrams[trigram]
+                self._sorted_terms = None
+
+    def _add(self, item: dict) -> None:
+        item_id = item["id"]
+        terms = self._terms(item)
+        length = sum(terms.values())
+        self._docs[item_id] = (terms, length)
+        self._total_length += length
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if is_fuzzy_term(term):
+                    for trigram in trigrams(term):
+                        self._trigrams[trigram].add(term)
+                self._sorted_terms = None
+            postings[item_id] = frequency
+            impacts = self._impacts.get(term)
+            if impacts is not None:
+                insort(impacts, (-self._impact(frequency, length), item_id))
+
+    def apply_pending(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        for item_id, item in pending.items():
+            self._remove(item_id)
+            if item is not None:
+                self._add(item)
+
+        average = self._total_length / len(self._docs) if self._docs else 0.0
+        if abs(average - self._average_length) > 0.1 * self._average_length:
+            self._average_length = average
+            self._impacts.clear()
+
+    def _sorted_impacts(self, term: str) -> list[tuple[float, str]]:
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            docs = self._docs
+            impacts = sorted(
+                (-self._impact(frequency, docs[item_id][1]), item_id)
+                for item_id, frequency in self._postings[term].items()
+            )
+            self._impacts[term] = impacts
+        return impacts
+
+    def _scaled_impacts(self, term: str, factor: float) -> Iterator[tuple[float, str]]:
+        """
+        `(-score, item ID)` of the items with `term`, highest score first.
+        """
+        for negative, item_id in self._sorted_impacts(term):
+            yield negative * factor, item_id
+
+    def _prefix_matches(self, token: str) -> list[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        matches = []
+        index = bisect_left(terms, token)
+        while index < len(terms) and terms[index].startswith(token):
+            if terms[index] != token:
+                matches.append(terms[index])
+            index += 1
+        return heapq.nlargest(
+            MAX_EXPANSIONS, matches, key=lambda term: len(self._postings[term])
+        )
+
+    def _fuzzy_matches(self, token: str) -> list[tuple[str, float]]:
+        query = trigrams(token)
+        shared: Counter[str] = Counter()
+        for trigram in query:
+            shared.update(self._trigrams.get(trigram, ()))
+        matches = []
+        for term, count in shared.items():
+            similarity = count / (len(query) + len(trigrams(term)) - count)
+            if similarity >= FUZZY_MIN_SIMILARITY and term != token:
+                matches.append((term, similarity))
+        return heapq.nlargest(MAX_EXPANSIONS, matches, key=lambda match: match[1])
+
+    def expand(self, token: str, prefix: bool, fuzzy: bool) -> dict[str, float]:
+        """
+        Indexed terms matching the query `token`, with the weight of the match.
+        """
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        if prefix and len(token) >= PREFIX_MIN_LENGTH:
+            for term in self._prefix_matches(token):
+                expansions.setdefault(term, PREFIX_WEIGHT)
+        if fuzzy and len(token) >= FUZZY_MIN_LENGTH:
+            for term, similarity in self._fuzzy_matches(token):
+                expansions.setdefault(term, FUZZY_WEIGHT * similarity)
+        return expansions
+
+    def _idf(self, term: str) -> float:
+        frequency = len(self._postings[term])
+        return math.log(1 + (len(self._docs) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        candidates: Iterable[str] | None = None,
+        prefix: bool = True,
+        fuzzy: bool = True,
+    ) -> tuple[list[tuple[str, float]], int]:
+        """
+        Return the best `limit` `(item ID, score)` matching any term of
+        `query`, best first, and the number of matching items. Only items in
+        `candidates` are considered if it is given.
+        """
+        self.apply_pending()
+        allowed = set(candidates) if candidates is not None else None
+        # Per query token: matching term -> weight of the match times its IDF
+        tokens: list[dict[str, float]] = []
+        for token in dict.fromkeys(tokenize(query)):
+            expansions = self.expand(token, prefix, fuzzy)
+            if expansions:
+                tokens.append(
+                    {
+                        term: weight * self._idf(term)
+                        for term, weight in expansions.items()
+                    }
+                )
+        if not tokens:
+            return [], 0
+
+        # NOTE: 検索語ごとの一致集合はCレベルの集合演算で求める
+        token_items = [
+            set().union(*(self._postings[term].keys() for term in factors))
+            for factors in tokens
+        ]
+        matched = set().union(*token_items)
+        if allowed is not None:
+            matched &= allowed
+        # NOTE: アイテムインデックスにないものは結果にも件数にも含めない
+        records = item_index.records
+        matched = {item_id for item_id in matched if item_id in records}
+
+        def score(item_id: str) -> float:
+            length = self._docs[item_id][1]
+            total = 0.0
+            # NOTE: 1つの検索語が複数の語に展開された場合は、最も高いスコアのみを加算する
+            for factors in tokens:
+                best = 0.0
+                for term, factor in factors.items():
+                    frequency = self._postings[term].get(item_id)
+                    if frequency is not None:
+                        best = max(best, factor * self._impact(frequency, length))
+                total += best
+            return total
+
+        if len(matched) <= limit * 4:
+            top = [(score(item_id), item_id) for item_id in matched]
+        else:
+            # Items that match more than one query token
+            multiple = set()
+            for index, items in enumerate(token_items):
+                for other in token_items[index + 1 :]:
+                    multiple |= items & other
+            multiple &= matched
+            top = self._top_k(tokens, limit, matched, multiple, score)
+        top.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [(item_id, value) for value, item_id in top[:limit]], len(matched)
+
+    def _top_k(self, tokens, limit, matched, multiple, score):
+        """
+        Threshold algorithm: walk the postings of every query token from the
+        highest score down, score each new item fully, and stop once no
+        unseen item can beat the `limit`-th best score.
+
+        When few items match several tokens, they are scored up front; every
+        other item matches a single token, so the bound of an unseen item is
+        the largest bound of the tokens instead of their sum.
+        """
+        streams = [
+            # NOTE: 内側の生成器式は後から評価されループ変数を共有するため、係数は引数で束縛する
+            heapq.merge(
+                *(
+                    self._scaled_impacts(term, factor)
+                    for term, factor in factors.items()
+                )
+            )
+            for factors in tokens
+        ]
+        bounds = [math.inf] * len(streams)
+        top: list[tuple[float, str]] = []
+        seen: set[str] = set()
+
+        def push(item_id: str) -> None:
+            value = score(item_id)
+            if len(top) < limit:
+                heapq.heappush(top, (value, item_id))
+            elif value > top[0][0]:
+                heapq.heapreplace(top, (value, item_id))
+
+        bound = sum
+        if len(multiple) <= MULTIPLE_MATCH_LIMIT:
+            for item_id in multiple:
+                push(item_id)
+            seen = multiple
+            bound = max
+
+        while True:
+            for index, stream in enumerate(streams):
+                entry = next(stream, None)
+                if entry is None:
+                    bounds[index] = 0.0
+                    continue
+                bounds[index] = -entry[0]
+                item_id = entry[1]
+                if item_id in seen or item_id not in matched:
+                    continue
+                seen.add(item_id)
+                push(item_id)
+            threshold = bound(bounds)
+            if threshold == 0.0 or (len(top) >= limit and top[0][0] >= threshold):
+                return top
+
+
+search_index = SearchIndex()
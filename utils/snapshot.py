@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from utils.cache import make_cache_key
+from utils.eagle_api import (
+    CACHE_TTLS,
+    eagle_api_get,
+    invalidate_cache,
+    is_success,
+    response_cache,
+)
+from utils.fastjson import dumps, loads
+from utils.item_index import ItemIndex, item_index
+from utils.library import get_library_path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.environ.get(
+    "EAGLE_SNAPSHOT_PATH",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+        "eagle-mcp-server",
+        "snapshot.sqlite3",
+    ),
+)
+SNAPSHOT_FLUSH_INTERVAL = float(os.environ.get("EAGLE_SNAPSHOT_FLUSH_INTERVAL", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS items (
+    library TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (library, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS folders (library TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS hashes (
+    library TEXT NOT NULL,
+    id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    hash TEXT,
+    PRIMARY KEY (library, id)
+) WITHOUT ROWID;
+"""
+
+
+class MetadataSnapshot:
+    """
+    SQLite store of the item and folder metadata of each library.
+
+    Every method opens its own connection so it can run in a worker thread.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def last_library(self) -> str | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'library'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_items(self, library: str) -> list[dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT data FROM items WHERE library = ?", (library,)
+            ).fetchall()
+        return [loads(data) for (data,) in rows]
+
+    def load_folders(self, library: str) -> list | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT data FROM folders WHERE library = ?", (library,)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def save_items(self, library: str, upserted: list[dict], removed: list[str]):
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('library', ?)",
+                (library,),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO items (library, id, data) VALUES (?, ?, ?)",
+                ((library, item["id"], dumps(item)) for item in upserted),
+            )
+            connection.executemany(
+                "DELETE FROM items WHERE library = ? AND id = ?",
+                ((library, item_id) for item_id in removed),
+            )
+
+    def save_folders(self, library: str, folders: list) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO folders (library, data) VALUES (?, ?)",
+                (library, dumps(folders)),
+            )
+
+    def load_hashes(self, library: str) -> dict[str, tuple[int, int | None]]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, version, hash FROM hashes WHERE library = ?", (library,)
+            ).fetchall()
+        return {
+            item_id: (version, int(value, 16) if value is not None else None)
+            for item_id, version, value in rows
+        }
+
+    def save_hashes(
+        self,
+        library: str,
+        hashes: list[tuple[str, int, int | None]],
+        removed: list[str] = (),
+    ) -> None:
+        # NOTE: 64bitの符号なし整数はSQLiteのINTEGERに収まらないため16進数で保存する
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO hashes (library, id, version, hash) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        library,
+                        item_id,
+                        version,
+                        f"{value:016x}" if value is not None else None,
+                    )
+                    for item_id, version, value in hashes
+                ),
+            )
+            connection.executemany(
+                "DELETE FROM hashes WHERE library = ? AND id = ?",
+                ((library, item_id) for item_id in removed),
+            )
+
+    def clear(self, library: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM items WHERE library = ?", (library,))
+            connection.execute("DELETE FROM folders WHERE library = ?", (library,))
+            connection.execute("DELETE FROM hashes WHERE library = ?", (library,))
+
+
+class SnapshotSync:
+    """
+    Restores the item index from the snapshot at startup, reconciles it with
+    Eagle in the background and writes changes of the index back periodically.
+    """
+
+    def __init__(self, snapshot: MetadataSnapshot, index: ItemIndex):
+        self.snapshot = snapshot
+        self.index = index
+        self.library: str | None = None
+        self._upserted: dict[str, dict] = {}
+        self._removed: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        index.add_listener(self._on_change)
+
+    def _on_change(self, upserted: list[dict], removed: list[str]) -> None:
+        for item in upserted:
+            self._upserted[item["id"]] = item
+            self._removed.discard(item["id"])
+        for item_id in removed:
+            self._upserted.pop(item_id, None)
+            self._removed.add(item_id)
+
+    def reset(self) -> None:
+        """
+        Forget pending changes, e.g. after the library was switched.
+        """
+        self.library = None
+        self._upserted.clear()
+        self._removed.clear()
+
+    async def flush(self) -> None:
+        if not (self._upserted or self._removed):
+            return
+        if self.library is None:
+            self.library = await get_library_path()
+            if self.library is None:
+                return
+        upserted, self._upserted = list(self._upserted.values()), {}
+        removed, self._removed = list(self._removed), set()
+        await asyncio.to_thread(
+            self.snapshot.save_items, self.library, upserted, removed
+        )
+
+    async def restore(self) -> None:
+        library = await asyncio.to_thread(self.snapshot.last_library)
+        if library is None:
+            return
+
+        items, folders = await asyncio.gather(
+            asyncio.to_thread(self.snapshot.load_items, library),
+            asyncio.to_thread(self.snapshot.load_folders, library),
+        )
+        self.index.upsert(items)
+        # NOTE: 復元したデータは書き戻さない
+        self._upserted.clear()
+        if folders is not None:
+            response_cache.set(
+                make_cache_key("/api/folder/list"),
+                {"status": "success", "data": folders},
+                CACHE_TTLS["/api/folder/list"],
+            )
+        self.library = library
+        logger.info(f"Restored {len(items)} items from snapshot of {library}")
+
+    async def reconcile(self) -> None:
+        library = await get_library_path()
+        if library is None:
+            logger.error("Failed to reconcile snapshot: Eagle is not reachable")
+            return
+
+        if library != self.library:
+            # NOTE: 前回と別のライブラリが開かれている
+            self.index.clear()
+            self.reset()
+            self.library = library
+
+        invalidate_cache("/api/folder/list")
+        folders = await eagle_api_get("/api/folder/list")
+        if is_success(folders):
+            await asyncio.to_thread(
+                self.snapshot.save_folders, library, folders["data"]
+            )
+
+        await self.index.start_sync()
+        await self.flush()
+
+    async def _restore(self) -> None:
+        try:
+            await self.restore()
+        except (sqlite3.Error, ValueError) as exc:
+            logger.error(f"Failed to restore snapshot: {exc}")
+
+    async def _run(self, restoring: asyncio.Task) -> None:
+        await restoring
+        try:
+            await self.reconcile()
+        except Exception as exc:
+            logger.error(f"Failed to reconcile snapshot: {exc}")
+
+        while True:
+            await asyncio.sleep(SNAPSHOT_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except sqlite3.Error as exc:
+                logger.error(f"Failed to write snapshot: {exc}")
+
+    def start(self) -> None:
+        restoring = asyncio.create_task(self._restore())
+        # NOTE: 復元中に届いたクエリは、Eagleを走査せずに復元を待つ
+        self.index.pending_restore = restoring
+        self._tasks += [restoring, asyncio.create_task(self._run(restoring))]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        try:
+            await self.flush()
+        except sqlite3.Error as exc:
+            logger.error(f"Failed to write snapshot: {exc}")
+
+
+snapshot_sync = SnapshotSync(MetadataSnapshot(), item_index) if SNAPSHOT_PATH else None
@@ -0,0 +1,248 @@
+from collections import Counter, defaultdict
+from typing import Iterable
+import re
+import unicodedata
+from utils.item_index import item_index
+
+# Tags shorter than this are not compared by spelling (one edit apart is
+# too likely to be a different word)
+MIN_SPELLING_LENGTH = 4
+
+SEPARATORS_RE = re.compile(r"[\s\-_.・]+")
+
+
+def normalize_tag(tag: str) -> str:
+    """
+    Key under which tags that only differ by case, width or separators
+    (`Web Design`, `web-design`, `ＷｅｂＤｅｓｉｇｎ`) collide.
+    """
+    return SEPARATORS_RE.sub("", unicodedata.normalize("NFKC", tag).casefold())
+
+
+def deletions(value: str) -> set[str]:
+    return {value[:i] + value[i + 1 :] for i in range(len(value))}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """
+    Whether `a` and `b` are at most one insertion, deletion, substitution or
+    swap of two adjacent characters apart, other than in a digit.
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    index = 0
+    while index < len(a) and a[index] == b[index]:
+        index += 1
+    if index == len(b):
+        return True
+    # NOTE: 数字だけが違うタグ（`2023` と `2024` など）は別のタグとみなす
+    if b[index].isdigit() or (index < len(a) and a[index].isdigit()):
+        return False
+    if len(a) == len(b):
+        return a[index + 1 :] == b[index + 1 :] or (
+            a[index : index + 2] == b[index : index + 2][::-1]
+            and a[index + 2 :] == b[index + 2 :]
+        )
+    return a[index:] == b[index + 1 :]
+
+
+class TagIndex:
+    """
+    Tag counts and co-occurrences of the items in `item_index`.
+
+    Co-occurrences are kept as a sparse symmetric matrix in dictionary-of-
+    keys form (tag -> tag -> number of items with both), along with the tag
+    counts of every folder. Both follow `item_index` through its listener:
+    a change only touches the tags of the changed items. Changes are
+    applied on the next query.
+    """
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self.cooccurrences: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self.by_folder: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        # folder ID -> IDs of the items in the folder
+        self.folder_items: defaultdict[str, set[str]] = defaultdict(set)
+        # Incremented when a tag appears or disappears
+        self.vocabulary_version = 0
+        self._similar: tuple[int, list[list[str]]] | None = None
+        # item ID -> (tags, folders) as last indexed
+        self._items: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {}
+        # item ID -> (tags, folders) to index, or None to remove the item
+        self._pending: dict[str, tuple | None] = {}
+        item_index.add_listener(self._on_items_changed)
+
+    def _on_items_changed(self, upserted: list[dict], removed: list[str]) -> None:
+        for item in upserted:
+            self._pending[item["id"]] = (
+                tuple(dict.fromkeys(item.get("tags") or ())),
+                tuple(dict.fromkeys(item.get("folders") or ())),
+            )
+        for item_id in removed:
+            self._pending[item_id] = None
+
+    def _update(self, tags: tuple[str, ...], folders: tuple[str, ...], delta: int):
+        for index, tag in enumerate(tags):
+            if tag not in self.counts:
+                self.vocabulary_version += 1
+            self.counts[tag] += delta
+            for other in tags[index + 1 :]:
+                self.cooccurrences[tag][other] += delta
+                self.cooccurrences[other][tag] += delta
+        for folder in folders:
+            self.by_folder[folder].update({tag: delta for tag in tags})
+
+    def _prune(self, tags: Iterable[str], folders: Iterable[str]) -> None:
+        # NOTE: 0になったキーを消し、疎なまま保つ
+        for tag in tags:
+            if self.counts[tag] <= 0:
+                del self.counts[tag]
+                self.vocabulary_version += 1
+            row = self.cooccurrences.get(tag)
+            if row is not None:
+                for other in [other for other, count in row.items() if count <= 0]:
+                    del row[other]
+                if not row:
+                    del self.cooccurrences[tag]
+        for folder in folders:
+            counter = self.by_folder.get(folder)
+            if counter is not None:
+                for tag in [tag for tag, count in counter.items() if count <= 0]:
+                    del counter[tag]
+                if not counter:
+                    del self.by_folder[folder]
+            if not self.folder_items.get(folder, True):
+                del self.folder_items[folder]
+
+    def apply_pending(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        touched_tags: set[str] = set()
+        touched_folders: set[str] = set()
+        for item_id, entry in pending.items():
+            previous = self._items.pop(item_id, None)
+            if previous is not None:
+                if previous == entry:
+                    self._items[item_id] = previous
+                    continue
+                self._update(*previous, -1)
+                touched_tags.update(previous[0])
+                touched_folders.update(previous[1])
+                for folder in previous[1]:
+                    self.folder_items[folder].discard(item_id)
+            if entry is not None:
+                self._items[item_id] = entry
+                self._update(*entry, 1)
+                for folder in entry[1]:
+                    self.folder_items[folder].add(item_id)
+        self._prune(touched_tags, touched_folders)
+
+    def top_tags(
+        self, limit: int, folders: Iterable[str] | None = None
+    ) -> tuple[list[tuple[str, int]], int]:
+        """
+        Most used tags (in `folders` if given) and the number of distinct tags.
+        """
+        self.apply_pending()
+        folders = None if folders is None else set(folders)
+        if folders is None:
+            counts = self.counts
+        elif len(folders) == 1:
+            counts = self.by_folder.get(next(iter(folders)), Counter())
+        else:
+            # NOTE: 複数のフォルダに入っているアイテムを重複して数えないよう、アイテム単位で集計する
+            item_ids = set().union(
+                *(self.folder_items.get(folder, ()) for folder in folders)
+            )
+            counts = Counter(
+                tag for item_id in item_ids for tag in self._items[item_id][0]
+            )
+        return counts.most_common(limit), len(counts)
+
+    def suggest(self, tags: Iterable[str], limit: int) -> list[tuple[str, float, int]]:
+        """
+        Tags that often appear with `tags`: `(tag, score, count)`, where the
+        score is the average share of the items with each of `tags` that also
+        have the tag.
+        """
+        self.apply_pending()
+        given = [tag for tag in dict.fromkeys(tags) if self.counts.get(tag)]
+        if not given:
+            return []
+        scores: Counter[str] = Counter()
+        for tag in given:
+            total = self.counts[tag]
+            for other, count in self.cooccurrences.get(tag, {}).items():
+                scores[other] += count / total / len(given)
+        for tag in given:
+            scores.pop(tag, None)
+        return [
+            (tag, score, self.counts[tag]) for tag, score in scores.most_common(limit)
+        ]
+
+    def rare_tags(self, max_count: int) -> list[tuple[str, int]]:
+        self.apply_pending()
+        return sorted(
+            ((tag, count) for tag, count in self.counts.items() if count <= max_count),
+            key=lambda entry: (entry[1], entry[0]),
+        )
+
+    def similar_spellings(self) -> list[list[tuple[str, int]]]:
+        """
+        Groups of tags that are spelled alike: equal once case, width and
+        separators are ignored, or one typo apart. Most used tag first in
+        each group.
+        """
+        self.apply_pending()
+        # NOTE: グループはタグの種類が変わったときだけ作り直す
+        if self._similar is None or self._similar[0] != self.vocabulary_version:
+            self._similar = (self.vocabulary_version, self._group_spellings())
+        return sorted(
+            (
+                sorted(
+                    ((tag, self.counts[tag]) for tag in members),
+                    key=lambda entry: (-entry[1], entry[0]),
+                )
+                for members in self._similar[1]
+            ),
+            key=lambda group: (-sum(count for _, count in group), group[0][0]),
+        )
+
+    def _group_spellings(self) -> list[list[str]]:
+        parents = {tag: tag for tag in self.counts}
+
+        def find(tag: str) -> str:
+            while parents[tag] != tag:
+                parents[tag] = parents[parents[tag]]
+                tag = parents[tag]
+            return tag
+
+        def union(tag: str, other: str) -> None:
+            root, other_root = find(tag), find(other)
+            if root != other_root:
+                parents[other_root] = root
+
+        # NOTE: 1文字削除した形を共有する語だけを比較し、総当たりを避ける
+        normalized = {tag: normalize_tag(tag) for tag in self.counts}
+        buckets: defaultdict[str, list[str]] = defaultdict(list)
+        for tag, key in normalized.items():
+            buckets[key].append(tag)
+            if len(key) >= MIN_SPELLING_LENGTH:
+                for value in deletions(key):
+                    buckets[value].append(tag)
+        for members in buckets.values():
+            for index, tag in enumerate(members):
+                for other in members[index + 1 :]:
+                    if within_one_edit(normalized[tag], normalized[other]):
+                        union(tag, other)
+
+        groups: defaultdict[str, list[str]] = defaultdict(list)
+        for tag in self.counts:
+            groups[find(tag)].append(tag)
+        return [members for members in groups.values() if len(members) > 1]
+
+
+tag_index = TagIndex()
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+import time
+from utils.eagle_api import (
+    cache_ttl_overrides,
+    eagle_api_get,
+    invalidate_cache,
+    is_success,
+    response_cache,
+)
+from utils.fastjson import loads
+from utils.folder_index import folder_index
+from utils.item_index import item_index
+from utils.library import library_path_cache
+from utils.library_reader import LibraryReader, get_library_reader
+from utils.snapshot import snapshot_sync
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = float(os.environ.get("EAGLE_WATCH_INTERVAL", "2"))
+WATCH_LIBRARY_INTERVAL = float(os.environ.get("EAGLE_WATCH_LIBRARY_INTERVAL", "10"))
+WATCH_CACHE_TTL = float(os.environ.get("EAGLE_WATCH_CACHE_TTL", "3600"))
+
+# Changes of more items than this are applied with a sync of the item index
+PRECISE_CHANGE_LIMIT = 512
+
+FOLDER_ENDPOINTS = ("/api/library/info", "/api/folder/list")
+ITEM_ENDPOINTS = ("/api/item/info", "/api/item/thumbnail")
+
+
+def forget_library() -> None:
+    """
+    Drop everything cached about the current library, e.g. after a switch.
+    """
+    response_cache.clear()
+    library_path_cache.invalidate()
+    folder_index.invalidate()
+    item_index.clear()
+    if snapshot_sync is not None:
+        snapshot_sync.reset()
+    library_watcher.reset()
+
+
+def read_mtimes(path: str) -> dict[str, int]:
+    """
+    Read `mtime.json`, in which Eagle records the modification time of
+    every item of the library.
+    """
+    with open(path, "rb") as f:
+        mtimes = loads(f.read())
+    if not isinstance(mtimes, dict):
+        raise ValueError(f"Unexpected content of {path}")
+    mtimes.pop("all", None)
+    return mtimes
+
+
+class LibraryWatcher:
+    """
+    Notices changes made to the library outside this server (in the Eagle
+    app, by plugins or by other tools) and invalidates the cached responses
+    and indexes they affect.
+
+    When the library is on this host, the mtimes of its `metadata.json`
+    (folders) and `mtime.json` are polled, which costs two `stat` calls per
+    interval. A changed `mtime.json` is compared with the previous one, so
+    only the changed items are invalidated and read again into the item
+    index. Otherwise the `modificationTime` of `/api/library/info` is
+    polled, which is also how a library switch is noticed.
+
+    While changes are watched, the affected endpoints are cached for
+    `WATCH_CACHE_TTL` instead of their short TTLs.
+    """
+
+    def __init__(
+        self,
+        interval: float = WATCH_INTERVAL,
+        library_interval: float = WATCH_LIBRARY_INTERVAL,
+    ):
+        self.interval = interval
+        self.library_interval = library_interval
+        self.library: str | None = None
+        self.modification_time: int | None = None
+        self._library_checked_at: float | None = None
+        # file name -> mtime_ns (None if missing) at the previous poll
+        self._stamps: dict[str, int | None] = {}
+        # item ID -> modification time, from `mtime.json`
+        self._mtimes: dict[str, int] | None = None
+        self._reader: LibraryReader | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_local(self) -> bool:
+        return self.library is not None and os.path.isdir(
+            os.path.join(self.library, "images")
+        )
+
+    def reset(self, library: str | None = None) -> None:
+        self.library = library
+        self.modification_time = None
+        self._stamps = {}
+        self._mtimes = None
+        self._reader = None
+        cache_ttl_overrides.clear()
+
+    def _stat(self, name: str) -> int | None:
+        try:
+            return os.stat(os.path.join(self.library, name)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _changed(self, name: str) -> bool:
+        stamp = self._stat(name)
+        previous = self._stamps.get(name, stamp)
+        self._stamps[name] = stamp
+        return stamp != previous
+
+    async def check_library(self) -> None:
+        # NOTE: 取得し直した情報はそのままキャッシュされ、他の呼び出し元にも使われる
+        invalidate_cache("/api/library/info")
+        info = await eagle_api_get("/api/library/info")
+        if not is_success(info):
+            return
+        try:
+            library = info["data"]["library"]["path"]
+            modification_time = info["data"].get("modificationTime")
+        except (KeyError, TypeError):
+            return
+        self._library_checked_at = time.monotonic()
+
+        if library != self.library:
+            if self.library is not None:
+                logger.info(f"Library switched to {library}")
+                forget_library()
+            self.reset(library)
+        elif modification_time != self.modification_time:
+            self._on_folders_changed()
+            if not self.is_local and item_index.synced_at is not None:
+                invalidate_cache("/api/item/info")
+                item_index.start_sync()
+        self.modification_time = modification_time
+
+    def _on_folders_changed(self) -> None:
+        for endpoint in FOLDER_ENDPOINTS:
+            invalidate_cache(endpoint)
+        folder_index.invalidate()
+
+    async def _get_reader(self) -> LibraryReader:
+        reader = await get_library_reader()
+        if reader is not None and reader.library_path == self.library:
+            return reader
+        if self._reader is None:
+            self._reader = LibraryReader(self.library)
+        return self._reader
+
+    async def _on_items_changed(self, changed: list[str], removed: list[str]) -> None:
+        if len(changed) + len(removed) > PRECISE_CHANGE_LIMIT:
+            for endpoint in ITEM_ENDPOINTS:
+                invalidate_cache(endpoint)
+            if item_index.synced_at is not None:
+                item_index.start_sync()
+            return
+
+        for item_id in (*changed, *removed):
+            for endpoint in ITEM_ENDPOINTS:
+                invalidate_cache(endpoint, {"id": item_id})
+        if item_index.synced_at is None:
+            return
+
+        # NOTE: 変更されたアイテムのメタデータだけを読み直してインデックスに反映する
+        reader = await self._get_reader()
+        items = await asyncio.gather(*(reader.get_item(item_id) for item_id in changed))
+        item_index.upsert(item for item in items if item is not None)
+        item_index.remove(
+            [*removed, *(i for i, item in zip(changed, items) if item is None)]
+        )
+
+    async def _poll_files(self) -> None:
+        if self._changed("metadata.json"):
+            self._on_folders_changed()
+
+        if not self._changed("mtime.json") and self._mtimes is not None:
+            return
+        try:
+            mtimes = await asyncio.to_thread(
+                read_mtimes, os.path.join(self.library, "mtime.json")
+            )
+        except ValueError:
+            # NOTE: 書き込み途中のファイルを読んだ可能性があるため、次回読み直す
+            self._stamps["mtime.json"] = None
+            return
+        except OSError as exc:
+            if self._mtimes is not None:
+                logger.warning(f"Stopped watching items: {exc}")
+                for endpoint in ITEM_ENDPOINTS:
+                    invalidate_cache(endpoint)
+            self._mtimes = None
+            return
+
+        previous, self._mtimes = self._mtimes, mtimes
+        if previous is None:
+            return
+        changed = [
+            item_id
+            for item_id, mtime in mtimes.items()
+            if previous.get(item_id) != mtime
+        ]
+        removed = [item_id for item_id in previous if item_id not in mtimes]
+        if changed or removed:
+            logger.debug(
+                f"Library changed: {len(changed)} items, {len(removed)} removed"
+            )
+            await self._on_items_changed(changed, removed)
+
+    def _update_ttls(self) -> None:
+        cache_ttl_overrides.clear()
+        if self.library is None:
+            return
+        for endpoint in FOLDER_ENDPOINTS:
+            cache_ttl_overrides[endpoint] = WATCH_CACHE_TTL
+        if self._mtimes is not None:
+            for endpoint in ITEM_ENDPOINTS:
+                cache_ttl_overrides[endpoint] = WATCH_CACHE_TTL
+
+    async def poll(self) -> None:
+        """
+        Check the library for changes once.
+        """
+        if (
+            self._library_checked_at is None
+            or time.monotonic() - self._library_checked_at >= self.library_interval
+        ):
+            await self.check_library()
+        if self.is_local:
+            await self._poll_files()
+        self._update_ttls()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as exc:
+                logger.error(f"Failed to watch the library: {exc}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.reset()
+
+
+library_watcher = LibraryWatcher()